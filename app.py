@@ -1,5 +1,8 @@
-from flask import Flask, send_from_directory, current_app, jsonify, render_template
+from flask import Flask, send_from_directory, current_app, jsonify, render_template, request
 from flask_cors import CORS
+from werkzeug.security import safe_join
+from urllib.parse import quote
+import mimetypes
 import os
 from datetime import timedelta
 from dotenv import load_dotenv
@@ -8,14 +11,27 @@ from dotenv import load_dotenv
 load_dotenv()
 
 app = Flask(__name__)
+
+# orjson-backed jsonify(): datetime -> ISO 8601, Decimal -> number, no per-route conversion
+from utils.json_provider import FastJSONProvider
+app.json = FastJSONProvider(app)
+
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 app.config['UPLOAD_FOLDER'] = os.path.join(os.path.dirname(__file__), 'uploads')
+# Per-file limit, enforced while multipart parts are streamed to disk
+app.config['MAX_UPLOAD_FILE_SIZE'] = int(os.getenv('UPLOAD_MAX_FILE_MB', 10)) * 1024 * 1024
 
 # Session configuration
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production-2025')
 app.config['SESSION_PERMANENT'] = True
 app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(hours=24)
 
+# gzip / brotli for JSON and HTML (COMPRESSION_*). Flask runs after_request
+# hooks in reverse registration order, so registering it before CORS and the
+# routes makes it run last and compress the final body
+from utils.compression import init_compression
+init_compression(app)
+
 # Enable CORS with credentials
 # Enable CORS with credentials
 CORS(app, resources={
@@ -30,7 +46,30 @@ CORS(app, resources={
 # Ensure uploads directory exists
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
+# Upload caching / delivery
+# - content-addressed files (ab/cd/<sha256>.<ext>) and their variants never change:
+#   Cache-Control: public, max-age=UPLOADS_IMMUTABLE_MAX_AGE, immutable + strong ETag
+# - legacy names get a short max-age and are revalidated with ETag / If-None-Match
+# - UPLOADS_OFFLOAD=nginx answers with X-Accel-Redirect to UPLOADS_ACCEL_PREFIX
+#   (nginx: location /_protected_uploads/ { internal; alias /path/to/uploads/; }),
+#   UPLOADS_OFFLOAD=sendfile uses X-Sendfile (Apache mod_xsendfile / lighttpd)
+UPLOADS_IMMUTABLE_MAX_AGE = int(os.getenv('UPLOADS_IMMUTABLE_MAX_AGE', 31536000))
+UPLOADS_MAX_AGE = int(os.getenv('UPLOADS_MAX_AGE', 3600))
+UPLOADS_OFFLOAD = os.getenv('UPLOADS_OFFLOAD', 'none').lower()
+UPLOADS_ACCEL_PREFIX = os.getenv('UPLOADS_ACCEL_PREFIX', '/_protected_uploads/')
+app.config['USE_X_SENDFILE'] = UPLOADS_OFFLOAD == 'sendfile'
+
 # Import routes
+from utils import image_variants, image_jobs
+from utils.entity_cache import get_entity_cache
+from utils.listing_cache import get_campaign_listing_cache
+from utils.notification_outbox import get_dispatcher
+from utils.notification_events import stream_stats
+from utils.upload_storage import content_digest
+from utils.upload_stream import StreamingUploadRequest
+
+# Stream uploaded files straight into uploads/.incoming (hashed + sniffed on the fly)
+app.request_class = StreamingUploadRequest
 from routes.auth_routes import auth_bp
 from routes.post_routes import post_bp
 from routes.comment_routes import comment_bp
@@ -39,9 +78,10 @@ from routes.donation_routes import donation_bp
 from routes.volunteer_routes import volunteer_bp
 from routes.chatbot_routes import chatbot_bp
 from routes.google_auth_routes import google_auth_bp
-from routes.admin_routes import admin_bp
+from routes.admin_routes import admin_api_required, admin_bp
 from routes.feedback_routes import feedback_bp
 from routes.waste_detection_routes import waste_detection_bp
+from routes.notification_routes import notification_bp
 
 # Register Blueprints
 app.register_blueprint(auth_bp, url_prefix='/api/auth')
@@ -55,18 +95,98 @@ app.register_blueprint(chatbot_bp, url_prefix='/api/chatbot')
 app.register_blueprint(admin_bp, url_prefix='/admin')
 app.register_blueprint(feedback_bp, url_prefix='/api/feedback')
 app.register_blueprint(waste_detection_bp, url_prefix='/api/waste')
+app.register_blueprint(notification_bp, url_prefix='/api/notifications')
+
+# ML warm-up mode:
+# - lazy (default): TensorFlow / sentence-transformers are imported on first use,
+#   so worker boot stays fast for rolling restarts and max_requests recycling
+# - background: start loading the waste model in a thread right after boot
+if os.getenv('ML_WARMUP', 'lazy').lower() == 'background':
+    from routes.waste_detection_routes import warmup_model_async
+    warmup_model_async()
+
+
+def _send_upload(relative_path, etag=None, mimetype=None):
+    """
+    Send a file from the uploads folder with cache headers.
+    etag: strong validator for immutable files; None = mutable (short max-age, weak ETag)
+    """
+    upload_dir = app.config['UPLOAD_FOLDER']
+    full_path = safe_join(upload_dir, relative_path)
+    # Temp files (.incoming/...) are never served
+    if not full_path or any(part.startswith('.') for part in relative_path.split('/')) \
+            or not os.path.isfile(full_path):
+        return jsonify({"error": "File not found", "filename": relative_path}), 404
+
+    max_age = UPLOADS_IMMUTABLE_MAX_AGE if etag else UPLOADS_MAX_AGE
+    if UPLOADS_OFFLOAD == 'nginx':
+        # nginx serves the bytes (Range, sendfile) and keeps our Cache-Control / ETag
+        response = app.response_class(
+            mimetype=mimetype or mimetypes.guess_type(relative_path)[0] or 'application/octet-stream'
+        )
+        response.headers['X-Accel-Redirect'] = UPLOADS_ACCEL_PREFIX.rstrip('/') + '/' + quote(relative_path)
+        if etag:
+            response.set_etag(etag)
+            response.make_conditional(request)
+            if response.status_code == 304:
+                del response.headers['X-Accel-Redirect']
+    else:
+        # conditional=True (default) handles If-None-Match -> 304 and Range -> 206
+        response = send_from_directory(upload_dir, relative_path, mimetype=mimetype,
+                                       etag=etag or True, max_age=max_age)
+
+    response.cache_control.public = True
+    response.cache_control.max_age = max_age
+    if etag:
+        response.cache_control.immutable = True
+    response.headers['Access-Control-Allow-Origin'] = '*'
+    response.headers['Access-Control-Allow-Methods'] = 'GET, OPTIONS'
+    response.headers['Access-Control-Allow-Headers'] = 'Content-Type'
+    return response
+
+
+@app.route('/uploads/<any(thumb, medium, large):variant>/<path:filename>')
+def uploaded_variant(variant, filename):
+    """
+    Serve a resized variant of an uploaded image, generating it on first request.
+    - /uploads/thumb/<file>.webp or .jpg -> that exact format
+    - /uploads/thumb/<file>              -> WebP if the client accepts it, else JPEG
+    """
+    upload_dir = app.config['UPLOAD_FOLDER']
+    original = image_variants.original_name(filename)
+    original_path = safe_join(upload_dir, original) if original else None
+    negotiated = not (original_path and os.path.isfile(original_path))
+    if negotiated:
+        original = filename
+        fmt = 'webp' if 'webp' in image_variants.FORMATS and request.accept_mimetypes['image/webp'] else 'jpg'
+    else:
+        fmt = filename.rsplit('.', 1)[1]
+
+    if not safe_join(upload_dir, original):
+        return jsonify({"error": "File not found", "filename": filename}), 404
+
+    try:
+        path = image_variants.ensure_variant(upload_dir, variant, original, fmt)
+    except Exception as e:
+        print(f"DEBUG: Error generating {variant} variant for {original}: {str(e)}")
+        path = None
+    if not path:
+        return jsonify({"error": "File not found", "filename": filename}), 404
+
+    digest = content_digest(original)
+    response = _send_upload(image_variants.variant_name(original, variant, fmt),
+                            etag=f"{digest}-{variant}-{fmt}" if digest else None,
+                            mimetype=image_variants.MIMETYPES[fmt])
+    if negotiated and not isinstance(response, tuple):
+        response.vary.add('Accept')
+    return response
 
 
 @app.route('/uploads/<path:filename>')
 def uploaded_file(filename):
-    """Serve uploaded files with CORS headers"""
+    """Serve uploaded files with CORS and cache headers"""
     try:
-        response = send_from_directory(app.config['UPLOAD_FOLDER'], filename)
-        # Ensure CORS headers are set
-        response.headers['Access-Control-Allow-Origin'] = '*'
-        response.headers['Access-Control-Allow-Methods'] = 'GET, OPTIONS'
-        response.headers['Access-Control-Allow-Headers'] = 'Content-Type'
-        return response
+        return _send_upload(filename, etag=content_digest(filename))
     except Exception as e:
         print(f"DEBUG: Error serving file {filename}: {str(e)}")
         return jsonify({
@@ -86,6 +206,66 @@ def handle_uploads_options(filename):
     return response, 200
 
 
+@app.route('/api/uploads/<path:filename>/status')
+def uploaded_file_status(filename):
+    """Background processing status of an uploaded image (pending/processing/retrying/done/failed)"""
+    upload_dir = app.config['UPLOAD_FOLDER']
+    job = image_jobs.image_status(upload_dir, filename) if safe_join(upload_dir, filename) else None
+    if not job:
+        return jsonify({
+            "status": "error",
+            "message": "File not found"
+        }), 404
+
+    job['variants'] = image_variants.variant_urls(filename)
+    return jsonify({
+        "status": "success",
+        "data": job
+    }), 200
+
+
+@app.route('/api/uploads/jobs')
+@admin_api_required
+def upload_jobs_stats():
+    """Image processing queue stats for this worker process (admin only: file names, errors)"""
+    queue = image_jobs.get_image_queue()
+    return jsonify({
+        "status": "success",
+        "data": queue.stats()
+    }), 200
+
+
+@app.route('/api/cache/stats')
+@admin_api_required
+def cache_stats():
+    """Entity / listing cache hit/miss stats for this worker process (admin only)"""
+    return jsonify({
+        "status": "success",
+        "data": {
+            "entities": get_entity_cache().stats(),
+            "campaign_listings": get_campaign_listing_cache().stats()
+        }
+    }), 200
+
+
+@app.before_request
+def start_outbox_dispatcher():
+    """Start draining notification_outbox once this worker serves traffic (rows left by a restart included)"""
+    get_dispatcher()
+
+
+@app.route('/api/notifications/outbox')
+@admin_api_required
+def notification_outbox_stats():
+    """Notification outbox dispatcher / stream stats for this worker process (admin only)"""
+    dispatcher = get_dispatcher()
+    return jsonify({
+        "status": "success",
+        "data": dispatcher.stats() if dispatcher is not None else None,
+        "stream": stream_stats()
+    }), 200
+
+
 @app.route("/api")
 @app.route("/api/")
 def api_index():
@@ -102,7 +282,8 @@ def api_index():
             "volunteers": "/api/volunteers",
             "chatbot": "/api/chatbot",
             "feedback": "/api/feedback",
-            "waste": "/api/waste"
+            "waste": "/api/waste",
+            "notifications": "/api/notifications"
         }
     }), 200
 
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Notification retention job
+
+Moves read notifications older than the retention period from notifications
+into notifications_archive in bounded batches, prunes processed
+notification_outbox rows, and expires old archive data. Unread notifications
+are never touched. Requires migrations/add_notifications_archive.sql
+(and optionally migrations/partition_notifications_archive.sql).
+
+Each batch is its own short transaction; --pause spaces them out so the job
+doesn't compete with live traffic. Progress is written to
+logs/notification_retention.json (NOTIFICATION_RETENTION_STATUS_FILE) after
+every batch and shown at GET /admin/notifications/retention.
+
+Usage:
+    python archive_notifications.py                       # dry run: report only
+    python archive_notifications.py --apply
+    python archive_notifications.py --apply --days 60 --batch-size 2000 --pause 0.2
+    python archive_notifications.py --apply --archive-days 730   # also expire the archive
+
+Cron (daily, 03:45):
+    45 3 * * * cd /path/to/backend && venv/bin/python archive_notifications.py --apply >> archive_notifications.log 2>&1
+"""
+import argparse
+import os
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from db import get_db
+from utils.notification_retention import RetentionJob, table_sizes
+
+
+def print_sizes(db, label):
+    cursor = db.cursor()
+    try:
+        sizes = table_sizes(cursor)
+    finally:
+        cursor.close()
+    print(f"\n{label}:")
+    for table, size in sorted(sizes.items()):
+        print(f"  {table:<22} ~{size['rows']:>10} rows  data {size['data_bytes'] / 1e6:8.1f} MB"
+              f"  index {size['index_bytes'] / 1e6:8.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--apply', action='store_true', help='move / delete rows (default: dry run)')
+    parser.add_argument('--days', type=int, default=int(os.getenv('NOTIFICATION_RETENTION_DAYS', 90)),
+                        help='archive read notifications older than this')
+    parser.add_argument('--outbox-days', type=int, default=int(os.getenv('NOTIFICATION_OUTBOX_RETENTION_DAYS', 7)),
+                        help='delete sent/failed outbox rows older than this (0 = keep)')
+    parser.add_argument('--archive-days', type=int, default=int(os.getenv('NOTIFICATION_ARCHIVE_RETENTION_DAYS', 0)),
+                        help='expire archived rows older than this (0 = keep forever)')
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--pause', type=float, default=0.1, help='seconds to sleep between batches')
+    parser.add_argument('--max-batches', type=int, default=None, help='stop after this many batches')
+    parser.add_argument('--months-ahead', type=int, default=3, help='archive partitions to create ahead')
+    args = parser.parse_args()
+
+    now = datetime.now()
+    print("=" * 70)
+    print("NOTIFICATION RETENTION" + ("" if args.apply else " (DRY RUN)"))
+    print(f"Archive read notifications older than {args.days} days "
+          f"(before {now - timedelta(days=args.days):%Y-%m-%d}), batch size {args.batch_size}")
+    print("=" * 70)
+
+    db = get_db()
+    job = RetentionJob(db, retention_days=args.days, batch_size=args.batch_size, pause=args.pause,
+                       max_batches=args.max_batches, apply=args.apply)
+    error = None
+    try:
+        print_sizes(db, "Before")
+
+        job.prepare_partitions(args.months_ahead)
+        if job.metrics['partitions_created']:
+            print(f"\n🗂️  Created archive partitions: {', '.join(job.metrics['partitions_created'])}")
+
+        print("\n1. Archiving read notifications...")
+        job.archive_read(now - timedelta(days=args.days))
+
+        if args.outbox_days > 0:
+            print("\n2. Pruning processed outbox rows...")
+            job.prune_outbox(now - timedelta(days=args.outbox_days))
+
+        if args.archive_days > 0:
+            print("\n3. Expiring archived notifications...")
+            job.purge_archive(now - timedelta(days=args.archive_days))
+
+        if args.apply:
+            print_sizes(db, "After (estimates refresh after ANALYZE TABLE)")
+    except Exception as e:
+        error = e
+        print(f"❌ Retention failed: {e}")
+    finally:
+        metrics = job.finish(error)
+        db.close()
+
+    print("\n" + "-" * 70)
+    verb = "" if args.apply else "would be "
+    print(f"  Notifications {verb}archived: {metrics['archived']}")
+    print(f"  Outbox rows {verb}pruned: {metrics['outbox_pruned']}")
+    print(f"  Archive rows {verb}expired: {metrics['archive_purged']}")
+    if metrics['partitions_dropped']:
+        print(f"  Archive partitions {verb}dropped: {', '.join(metrics['partitions_dropped'])}")
+    print(f"  Batches: {metrics['batches']}, {metrics['rows_per_second']} rows/s, "
+          f"{metrics['elapsed_seconds']}s")
+    if not args.apply:
+        print("\nDry run only. Re-run with --apply to archive.")
+    return 1 if error else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark worker startup time
+Measures how long `import app` takes in a fresh interpreter (what every
+gunicorn worker pays on boot / max_requests recycling) and summarizes
+`python -X importtime` output: slowest top-level packages and whether
+ML-heavy modules were imported at startup.
+
+Usage:
+    python benchmark_startup.py [--runs 5] [--top 15] [--mode local|pool|both]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).parent
+HEAVY_MODULES = ('tensorflow', 'keras', 'tf_keras', 'torch', 'sentence_transformers', 'transformers')
+
+
+def run_import(env, importtime=False):
+    """Import app in a fresh interpreter; return (wall_seconds, stderr)"""
+    cmd = [sys.executable]
+    if importtime:
+        cmd += ['-X', 'importtime']
+    cmd += ['-c', 'import app']
+
+    started = time.perf_counter()
+    proc = subprocess.run(cmd, cwd=PROJECT_DIR, env=env, capture_output=True, text=True)
+    elapsed = time.perf_counter() - started
+    if proc.returncode != 0:
+        print(proc.stderr[-2000:])
+        raise SystemExit(f"❌ 'import app' failed (exit {proc.returncode})")
+    return elapsed, proc.stderr
+
+
+def parse_importtime(stderr):
+    """
+    Return {top-level package: cumulative microseconds} from -X importtime output.
+    Each package is counted at its outermost import only, so nested submodules
+    (e.g. flask.json inside flask) aren't double counted.
+    """
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        try:
+            _, cumulative_us, raw_name = line.split(':', 1)[1].split('|')
+        except ValueError:
+            continue
+        depth = (len(raw_name) - len(raw_name.lstrip()) - 1) // 2
+        entries.append((depth, raw_name.strip().split('.')[0], int(cumulative_us)))
+
+    # importtime prints children before their parent; walk it backwards so
+    # every module is seen after its ancestors
+    totals = defaultdict(int)
+    ancestors = []
+    for depth, package, cumulative_us in reversed(entries):
+        while ancestors and ancestors[-1][0] >= depth:
+            ancestors.pop()
+        if all(package != parent for _, parent in ancestors):
+            totals[package] += cumulative_us
+        ancestors.append((depth, package))
+    return totals
+
+
+def bench_mode(mode, runs, top):
+    env = dict(os.environ)
+    env['WASTE_ML_MODE'] = mode
+    env['ML_WARMUP'] = 'lazy'
+    env['PYTHONDONTWRITEBYTECODE'] = '1'
+
+    print(f"\n[WASTE_ML_MODE={mode}]")
+    run_import(env)  # warm the OS file cache / .pyc
+    timings = [run_import(env)[0] for _ in range(runs)]
+    print(f"  import app: median {statistics.median(timings) * 1000:.0f} ms, "
+          f"min {min(timings) * 1000:.0f} ms, max {max(timings) * 1000:.0f} ms ({runs} runs)")
+
+    _, stderr = run_import(env, importtime=True)
+    totals = parse_importtime(stderr)
+    heavy = sorted(name for name in totals if name in HEAVY_MODULES)
+    if heavy:
+        print(f"  ⚠️ ML-heavy modules imported at startup: {', '.join(heavy)}")
+    else:
+        print("  ✓ No ML-heavy modules imported at startup")
+
+    print(f"  Top {top} top-level imports (cumulative):")
+    for name, us in sorted(totals.items(), key=lambda item: item[1], reverse=True)[:top]:
+        print(f"    {us / 1000:9.1f} ms  {name}")
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--mode', choices=['local', 'pool', 'both'], default='both')
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("WORKER STARTUP BENCHMARK")
+    print("=" * 70)
+
+    modes = ['local', 'pool'] if args.mode == 'both' else [args.mode]
+    results = {mode: bench_mode(mode, args.runs, args.top) for mode in modes}
+
+    print("\n" + "=" * 70)
+    for mode, median in results.items():
+        print(f"  {mode:<6} median import app: {median * 1000:.0f} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
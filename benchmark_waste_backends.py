@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Benchmark waste detection inference backends
+Compares latency (per batch size) and accuracy against the Keras reference:
+- top-1 ImageNet class agreement
+- waste category agreement (same lookup table as the API)
+- max absolute probability difference
+
+Usage:
+    python benchmark_waste_backends.py [--backends keras,graph,tflite,tflite_int8]
+                                       [--images uploads] [--batch-sizes 1,8,32] [--runs 20]
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from utils.waste_backends import TF_AVAILABLE, BACKEND_NAMES, load_backend, imagenet_labels, INPUT_SHAPE
+
+
+def load_images(image_dir, limit=64):
+    """Load and preprocess images; pad with random data if there are too few"""
+    from tensorflow.keras.applications.mobilenet_v2 import preprocess_input
+
+    paths = []
+    for pattern in ('*.jpg', '*.jpeg', '*.png', '*.JPG', '*.PNG'):
+        paths.extend(glob.glob(os.path.join(image_dir, pattern)))
+    paths = sorted(paths)[:limit]
+
+    arrays = []
+    for path in paths:
+        try:
+            img = Image.open(path).convert('RGB').resize(INPUT_SHAPE[:2])
+            arrays.append(preprocess_input(np.asarray(img, dtype=np.float32)))
+        except Exception as e:
+            print(f"  ⚠️ Skipping {path}: {e}")
+
+    print(f"  Loaded {len(arrays)} images from {image_dir}")
+    rng = np.random.default_rng(0)
+    while len(arrays) < limit:
+        arrays.append(rng.uniform(-1.0, 1.0, size=INPUT_SHAPE).astype(np.float32))
+    return np.stack(arrays)
+
+
+def percentile_ms(samples, q):
+    return float(np.percentile(samples, q) * 1000)
+
+
+def bench_latency(backend, images, batch_size, runs):
+    """Return (p50_ms, p95_ms, images_per_sec) for one batch size"""
+    batch = images[:batch_size]
+    backend.predict(batch)  # warm-up
+
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        backend.predict(batch)
+        timings.append(time.perf_counter() - started)
+
+    p50 = percentile_ms(timings, 50)
+    return p50, percentile_ms(timings, 95), batch_size / (p50 / 1000)
+
+
+def category_of(predictions):
+    from routes.waste_detection_routes import build_category_lookup
+
+    _, matrix = build_category_lookup(imagenet_labels())
+    return (predictions @ matrix).argmax(axis=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--backends', default=','.join(BACKEND_NAMES))
+    parser.add_argument('--images', default=os.path.join(os.path.dirname(__file__), 'uploads'))
+    parser.add_argument('--batch-sizes', default='1,8,32')
+    parser.add_argument('--runs', type=int, default=20)
+    args = parser.parse_args()
+
+    if not TF_AVAILABLE:
+        print("❌ TensorFlow is not installed. Fix: pip install tensorflow")
+        return 1
+
+    backends = [b.strip() for b in args.backends.split(',') if b.strip()]
+    batch_sizes = [int(b) for b in args.batch_sizes.split(',')]
+
+    print("=" * 70)
+    print("WASTE DETECTION BACKEND BENCHMARK")
+    print("=" * 70)
+    images = load_images(args.images, limit=max(batch_sizes + [32]))
+
+    reference = None
+    reference_categories = None
+    rows = []
+
+    for name in ['keras'] + [b for b in backends if b != 'keras']:
+        print(f"\n[{name}]")
+        started = time.perf_counter()
+        backend = load_backend(name)
+        print(f"  Load time: {time.perf_counter() - started:.1f}s")
+
+        predictions = backend.predict(images)
+        categories = category_of(predictions)
+        if reference is None:
+            reference, reference_categories = predictions, categories
+
+        top1 = float((predictions.argmax(axis=1) == reference.argmax(axis=1)).mean())
+        category_match = float((categories == reference_categories).mean())
+        max_diff = float(np.abs(predictions - reference).max())
+
+        for batch_size in batch_sizes:
+            p50, p95, throughput = bench_latency(backend, images, batch_size, args.runs)
+            print(f"  batch={batch_size:<3} p50={p50:8.1f}ms  p95={p95:8.1f}ms  {throughput:7.1f} img/s")
+            rows.append((name, batch_size, p50, p95, throughput, top1, category_match, max_diff))
+
+        print(f"  top-1 agreement vs keras:    {top1:.1%}")
+        print(f"  category agreement vs keras: {category_match:.1%}")
+        print(f"  max |prob diff| vs keras:    {max_diff:.4f}")
+
+    print("\n" + "=" * 70)
+    print(f"{'backend':<12} {'batch':>5} {'p50 ms':>9} {'p95 ms':>9} {'img/s':>8} {'top1':>7} {'categ':>7}")
+    print("-" * 70)
+    for name, batch_size, p50, p95, throughput, top1, category_match, _ in rows:
+        print(f"{name:<12} {batch_size:>5} {p50:>9.1f} {p95:>9.1f} {throughput:>8.1f} {top1:>7.1%} {category_match:>7.1%}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
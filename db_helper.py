@@ -377,18 +377,38 @@ def update_volunteer_status(campaign_id, user_id, status):
 
 
 def create_notification(user_id, title, message, notification_type=None, related_id=None, related_type=None):
-    """Create a notification"""
-    query = """
-    INSERT INTO notifications 
-    (user_id, title, message, notification_type, related_id, related_type) 
-    VALUES (%s, %s, %s, %s, %s, %s)
+    """Create a notification (and bump the user's unread counter)"""
+    return create_notifications_bulk([user_id], title, message, notification_type,
+                                     related_id, related_type) > 0
+
+
+def create_notifications_bulk(user_ids, title, message, notification_type=None, related_id=None,
+                              related_type=None, chunk_size=1000):
     """
-    params = (user_id, title, message, notification_type, related_id, related_type)
-    return execute_update(query, params) > 0
+    Create the same notification for many users
+    Args:
+        user_ids (iterable): Recipient ids; any iterable (generator, cursor) is consumed in chunks
+        chunk_size (int): Recipients per multi-row INSERT / commit
+    Returns:
+        int: Number of notifications created, -1 if error
+    """
+    from utils.notification_broadcast import bulk_create_notifications, chunked
+
+    db = None
+    try:
+        db = get_db()
+        return bulk_create_notifications(db, chunked(user_ids, chunk_size), title, message,
+                                         notification_type, related_id, related_type)
+    except Error as err:
+        print(f"✗ Bulk notification error: {err}")
+        return -1
+    finally:
+        if db:
+            close_db(db)
 
 
 def get_user_notifications(user_id, unread_only=False):
-    """Get user's notifications"""
+    """Get user's notifications (served by the (user_id, is_read, created_at) index)"""
     if unread_only:
         query = "SELECT * FROM notifications WHERE user_id = %s AND is_read = FALSE ORDER BY created_at DESC"
     else:
@@ -396,10 +416,52 @@ def get_user_notifications(user_id, unread_only=False):
     return execute_query(query, (user_id,))
 
 
+def get_unread_notification_count(user_id):
+    """Get user's unread count from the counter table"""
+    from utils.notification_counters import get_unread_count
+
+    db = None
+    try:
+        db = get_db()
+        return get_unread_count(db, user_id)
+    except Error as err:
+        print(f"✗ Query execution error: {err}")
+        return None
+    finally:
+        if db:
+            close_db(db)
+
+
 def mark_notification_as_read(notification_id):
-    """Mark notification as read"""
-    query = "UPDATE notifications SET is_read = TRUE WHERE id = %s"
-    return execute_update(query, (notification_id,)) > 0
+    """Mark notification as read (and decrement the user's unread counter)"""
+    from utils.notification_counters import mark_read
+
+    db = None
+    try:
+        db = get_db()
+        return mark_read(db, notification_id)
+    except Error as err:
+        print(f"✗ Update execution error: {err}")
+        return False
+    finally:
+        if db:
+            close_db(db)
+
+
+def mark_all_notifications_as_read(user_id):
+    """Mark all of a user's notifications as read; returns how many changed, -1 if error"""
+    from utils.notification_counters import mark_all_read
+
+    db = None
+    try:
+        db = get_db()
+        return mark_all_read(db, user_id)
+    except Error as err:
+        print(f"✗ Update execution error: {err}")
+        return -1
+    finally:
+        if db:
+            close_db(db)
 
 
 if __name__ == "__main__":
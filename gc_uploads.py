@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Orphaned upload garbage collector
+
+Deletes files in uploads/ that no row references any more:
+- originals not referenced by posts.image, campaigns.image or users.profile_photo
+  (deleted posts/campaigns, replaced campaign images, failed inserts)
+- variants (thumb/medium/large) whose original is gone
+- abandoned temp files in uploads/.incoming and waste-detection temp files
+
+The directory is scanned with os.scandir (no full listing in memory) and
+references are checked in batches with one IN (...) query per batch.
+Files modified within the grace period are never touched, so uploads whose
+INSERT hasn't committed yet are safe. A duplicate upload can reuse an old
+file while the GC runs, so each batch locks its upload_files rows and checks
+references, ref_count and mtime again right before deleting.
+
+Usage:
+    python gc_uploads.py                    # dry run: report only
+    python gc_uploads.py --apply            # delete orphans
+    python gc_uploads.py --apply --grace-hours 48 --batch-size 500
+
+Cron (daily, 03:30):
+    30 3 * * * cd /path/to/backend && venv/bin/python gc_uploads.py --apply >> gc_uploads.log 2>&1
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from db import get_db
+from utils.image_variants import VARIANTS, original_name
+from utils.upload_storage import INCOMING_DIR, forget_files, lock_ref_counts
+
+UPLOAD_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads')
+
+
+def scan_files(root, rel_prefix='', skip_top_level=()):
+    """Yield (relative path, stat) for every file below root, depth-first, streaming"""
+    stack = ['']
+    while stack:
+        rel_dir = stack.pop()
+        try:
+            entries = os.scandir(os.path.join(root, rel_dir))
+        except FileNotFoundError:
+            continue
+        with entries:
+            for entry in entries:
+                rel = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    if not rel_dir and entry.name in skip_top_level:
+                        continue
+                    stack.append(rel)
+                elif entry.is_file(follow_symlinks=False):
+                    yield rel_prefix + rel, entry.stat(follow_symlinks=False)
+
+
+def batches(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def referenced_paths(cursor, paths):
+    """Subset of paths referenced by any row (one query per batch)"""
+    placeholders = ', '.join(['%s'] * len(paths))
+    cursor.execute(f"""
+        SELECT image FROM posts WHERE image IN ({placeholders})
+        UNION
+        SELECT image FROM campaigns WHERE image IN ({placeholders})
+        UNION
+        SELECT profile_photo FROM users WHERE profile_photo IN ({placeholders})
+    """, tuple(paths) * 3)
+    return {row[0] for row in cursor.fetchall()}
+
+
+class Collector:
+    def __init__(self, upload_dir, apply, cutoff):
+        self.upload_dir = upload_dir
+        self.apply = apply
+        self.cutoff = cutoff
+        self.counts = {}
+        self.bytes = 0
+        self.errors = 0
+        self.skipped = 0
+
+    def remove(self, rel_path, size, reason):
+        path = os.path.join(self.upload_dir, rel_path)
+        try:
+            # Re-stat: a duplicate upload touches the file it reuses (_commit_temp)
+            if os.stat(path).st_mtime >= self.cutoff:
+                self.skipped += 1
+                return False
+        except FileNotFoundError:
+            return True
+        self.counts[reason] = self.counts.get(reason, 0) + 1
+        self.bytes += size
+        if not self.apply:
+            print(f"  [dry-run] {reason}: {rel_path}")
+            return True
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return True
+        except OSError as e:
+            self.errors += 1
+            print(f"  ⚠️ Failed to delete {rel_path}: {e}")
+            return False
+
+    def remove_empty_dirs(self, root):
+        """Prune shard directories left empty (bottom-up)"""
+        if not self.apply:
+            return
+        for dirpath, _, _ in sorted(os.walk(root), key=lambda item: -len(item[0])):
+            # .incoming is in use by live uploads
+            if dirpath != root and INCOMING_DIR not in dirpath.split(os.sep):
+                try:
+                    os.rmdir(dirpath)
+                except OSError:
+                    pass  # not empty
+
+
+def collect_originals(db, cursor, collector, old):
+    """
+    Delete the unreferenced files of one batch. Their upload_files rows stay
+    locked until the commit, so a concurrent add_reference waits and then
+    recreates the row instead of losing it to forget_files.
+    """
+    paths = [rel for rel, _ in old]
+    ref_counts = lock_ref_counts(cursor, paths)
+    # Read after the lock, so it includes references committed meanwhile
+    in_use = referenced_paths(cursor, paths)
+    deleted = [
+        rel for rel, st in old
+        if rel not in in_use and not (ref_counts or {}).get(rel)
+        and collector.remove(rel, st.st_size, 'unreferenced')
+    ]
+    if collector.apply and ref_counts:
+        forget_files(cursor, [rel for rel in deleted if rel in ref_counts])
+    db.commit()  # releases the row locks and starts a fresh snapshot
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--apply', action='store_true', help='delete orphans (default: dry run)')
+    parser.add_argument('--grace-hours', type=float, default=float(os.getenv('UPLOAD_GC_GRACE_HOURS', 24)))
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--uploads', default=UPLOAD_DIR)
+    args = parser.parse_args()
+
+    cutoff = time.time() - args.grace_hours * 3600
+    collector = Collector(args.uploads, args.apply, cutoff)
+
+    print("=" * 70)
+    print("UPLOADS GARBAGE COLLECTOR" + ("" if args.apply else " (DRY RUN)"))
+    print(f"Grace period: {args.grace_hours:g}h, batch size: {args.batch_size}")
+    print("=" * 70)
+
+    db = get_db()
+    cursor = db.cursor()
+    scanned = 0
+    try:
+        # 1. Originals: everything outside variant / temp directories
+        skip = set(VARIANTS) | {INCOMING_DIR}
+        candidates = (
+            (rel, st) for rel, st in scan_files(args.uploads, skip_top_level=skip)
+            if not rel.startswith('.')
+        )
+        for batch in batches(candidates, args.batch_size):
+            scanned += len(batch)
+            old = [(rel, st) for rel, st in batch if st.st_mtime < cutoff]
+            if old:
+                collect_originals(db, cursor, collector, old)
+
+        # 2. Variants whose original no longer exists
+        for variant in VARIANTS:
+            for rel, st in scan_files(os.path.join(args.uploads, variant), rel_prefix=f"{variant}/"):
+                scanned += 1
+                original = original_name(rel.split('/', 1)[1])
+                if st.st_mtime >= cutoff:
+                    continue
+                if original is None or not os.path.exists(os.path.join(args.uploads, original)):
+                    collector.remove(rel, st.st_size, 'orphan variant')
+            collector.remove_empty_dirs(os.path.join(args.uploads, variant))
+
+        # 3. Abandoned temp files
+        for rel, st in scan_files(os.path.join(args.uploads, INCOMING_DIR), rel_prefix=f"{INCOMING_DIR}/"):
+            scanned += 1
+            if st.st_mtime < cutoff:
+                collector.remove(rel, st.st_size, 'stale temp file')
+
+        collector.remove_empty_dirs(args.uploads)
+    except Exception as e:
+        db.rollback()
+        print(f"❌ GC failed: {e}")
+        return 1
+    finally:
+        cursor.close()
+        db.close()
+
+    print("\n" + "-" * 70)
+    print(f"  Files scanned: {scanned}")
+    for reason, count in sorted(collector.counts.items()):
+        print(f"  {reason}: {count}")
+    verb = "Freed" if args.apply else "Would free"
+    print(f"  {verb}: {collector.bytes / 1e6:.1f} MB")
+    if collector.skipped:
+        print(f"  Skipped (used again during the run): {collector.skipped}")
+    if collector.errors:
+        print(f"  ⚠️ {collector.errors} file(s) could not be deleted")
+    if not args.apply:
+        print("\nDry run only. Re-run with --apply to delete.")
+    return 1 if collector.errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,5 +1,14 @@
 # Gunicorn configuration file for Ruang Hijau Backend
 import os
+import subprocess
+import sys
+
+from dotenv import load_dotenv
+
+# Read .env here too so the modes below match what the app will see
+load_dotenv()
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from utils.local_ipc import ensure_authkey
 
 # Server socket
 bind = "0.0.0.0:8000"
@@ -7,7 +16,10 @@ backlog = 2048
 
 # Worker processes
 workers = 2
-worker_class = "sync"
+# gthread lets concurrent waste-detection requests share one batched
+# model.predict call inside a worker (see utils/inference_batcher.py)
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
 
 # Timeouts - CRITICAL for chatbot!
 # First request may take 30-60 seconds while loading embedder model
@@ -42,4 +54,55 @@ max_requests_jitter = 50
 # Graceful timeout
 graceful_timeout = 30
 
+# ML service (waste detection inference in a separate process pool)
+# With WASTE_ML_MODE=pool web workers don't load TensorFlow; the master starts
+# ml_service.py once and every worker talks to it over a local socket.
+ML_MODE = os.environ.get("WASTE_ML_MODE", "local").lower()
+ML_POOL_AUTOSTART = os.environ.get("WASTE_ML_POOL_AUTOSTART", "true").lower() in ("true", "1", "t")
+_ml_service = None
+
+# Notification stream (SSE connections held by one asyncio process)
+# With NOTIFICATION_STREAM_MODE=broker workers publish to notification_stream.py,
+# which serves /api/notifications/stream (route it there in nginx). That is the
+# default here: in local mode each client holds a gthread thread and only sees
+# notifications created by its own worker.
+os.environ.setdefault("NOTIFICATION_STREAM_MODE", "broker")
+STREAM_MODE = os.environ["NOTIFICATION_STREAM_MODE"].lower()
+STREAM_AUTOSTART = os.environ.get("NOTIFICATION_STREAM_AUTOSTART", "true").lower() in ("true", "1", "t")
+_notification_stream = None
+
+
+def on_starting(server):
+    global _ml_service, _notification_stream, STREAM_MODE
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    if STREAM_MODE == "local" and server.cfg.workers > 1:
+        # Set before the workers fork, so they all publish to the broker
+        server.log.warning("NOTIFICATION_STREAM_MODE=local needs a single worker (%s configured), using broker",
+                           server.cfg.workers)
+        STREAM_MODE = os.environ["NOTIFICATION_STREAM_MODE"] = "broker"
+    if ML_MODE == "pool" and ML_POOL_AUTOSTART:
+        # Inherited by the service and by every forked worker
+        if ensure_authkey("WASTE_ML_POOL_AUTHKEY"):
+            server.log.info("Generated a random WASTE_ML_POOL_AUTHKEY for this run")
+        script = os.path.join(base_dir, "ml_service.py")
+        _ml_service = subprocess.Popen([sys.executable, script])
+        server.log.info("Started ML service (pid %s)", _ml_service.pid)
+    if STREAM_MODE == "broker" and STREAM_AUTOSTART:
+        if ensure_authkey("NOTIFICATION_BROKER_AUTHKEY"):
+            server.log.info("Generated a random NOTIFICATION_BROKER_AUTHKEY for this run")
+        script = os.path.join(base_dir, "notification_stream.py")
+        _notification_stream = subprocess.Popen([sys.executable, script])
+        server.log.info("Started notification stream (pid %s)", _notification_stream.pid)
+
+
+def on_exit(server):
+    for process in (_ml_service, _notification_stream):
+        if process is not None and process.poll() is None:
+            process.terminate()
+            try:
+                process.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
 print("[gunicorn] Configuration loaded - timeout set to 120 seconds for chatbot support")
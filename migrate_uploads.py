@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Migrate legacy uploads (uploads/<timestamp>_<name>) to content-addressed
+storage (uploads/ab/cd/<sha256>.<ext>).
+
+For every legacy file:
+1. copy it to its content address (duplicates collapse into one file)
+2. point posts.image / campaigns.image at the new path
+3. after the DB commit, delete the legacy file and its old variants
+
+Finally every upload_files.ref_count is rebuilt from posts/campaigns.
+Run migrations/add_upload_files.sql first.
+
+Usage:
+    python migrate_uploads.py            # dry run: print the plan only
+    python migrate_uploads.py --apply    # migrate
+    python migrate_uploads.py --apply --keep-originals
+"""
+import argparse
+import os
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from db import get_db
+from utils.image_variants import VARIANTS, FORMATS, variant_name
+from utils.upload_storage import (
+    cas_name, existing_file_ext, file_digest, is_content_addressed,
+    recount_references, store_existing_file,
+)
+
+UPLOAD_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads')
+
+
+def legacy_files(upload_dir):
+    """Top-level files only: shard and variant directories are already migrated"""
+    with os.scandir(upload_dir) as entries:
+        for entry in entries:
+            if not entry.is_file() or entry.name.startswith('.'):
+                continue
+            if entry.name.startswith('waste_'):
+                continue  # temp files of /api/waste/detect
+            yield entry.name
+
+
+def remove_legacy(upload_dir, name):
+    paths = [os.path.join(upload_dir, name)]
+    paths += [os.path.join(upload_dir, variant_name(name, v, fmt)) for v in VARIANTS for fmt in FORMATS]
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--apply', action='store_true', help='perform the migration (default: dry run)')
+    parser.add_argument('--keep-originals', action='store_true', help='do not delete legacy files')
+    parser.add_argument('--uploads', default=UPLOAD_DIR)
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("UPLOADS -> CONTENT-ADDRESSED STORAGE" + ("" if args.apply else " (DRY RUN)"))
+    print("=" * 70)
+
+    mapping = {}
+    by_digest = defaultdict(list)
+    total_bytes = 0
+    for name in sorted(legacy_files(args.uploads)):
+        path = os.path.join(args.uploads, name)
+        digest = file_digest(path)
+        # Sniffed type first, like new uploads: a PNG named .jpg dedups with the same PNG
+        mapping[name] = cas_name(digest, existing_file_ext(path))
+        by_digest[mapping[name]].append(name)
+        total_bytes += os.path.getsize(path)
+
+    unique_bytes = sum(os.path.getsize(os.path.join(args.uploads, names[0])) for names in by_digest.values())
+    print(f"  Legacy files:  {len(mapping)} ({total_bytes / 1e6:.1f} MB)")
+    print(f"  Unique files:  {len(by_digest)} ({unique_bytes / 1e6:.1f} MB)")
+    print(f"  Space saved:   {(total_bytes - unique_bytes) / 1e6:.1f} MB")
+    for target, names in sorted(by_digest.items(), key=lambda item: -len(item[1]))[:10]:
+        if len(names) > 1:
+            print(f"    {len(names)} copies -> {target} ({', '.join(names[:3])}{', ...' if len(names) > 3 else ''})")
+
+    db = get_db()
+    cursor = db.cursor()
+    missing = []
+    for table in ('posts', 'campaigns'):
+        cursor.execute(f"SELECT DISTINCT image FROM {table} WHERE image IS NOT NULL AND image <> ''")
+        for (image,) in cursor.fetchall():
+            if image not in mapping and not is_content_addressed(image):
+                missing.append((table, image))
+    if missing:
+        print(f"  ⚠️ {len(missing)} referenced image(s) not found in uploads/ (left unchanged):")
+        for table, image in missing[:10]:
+            print(f"    {table}: {image}")
+
+    if not args.apply:
+        print("\nDry run only. Re-run with --apply to migrate.")
+        cursor.close()
+        db.close()
+        return 0
+
+    try:
+        for name in mapping:
+            stored, _ = store_existing_file(os.path.join(args.uploads, name), args.uploads)
+            mapping[name] = stored
+
+        updated = 0
+        for name, stored in mapping.items():
+            for table in ('posts', 'campaigns'):
+                cursor.execute(f"UPDATE {table} SET image = %s WHERE image = %s", (stored, name))
+                updated += cursor.rowcount
+        recount_references(cursor)
+        db.commit()
+        print(f"\n✅ Stored {len(by_digest)} file(s), updated {updated} row(s), rebuilt reference counts")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Migration failed, database unchanged: {e}")
+        return 1
+    finally:
+        cursor.close()
+        db.close()
+
+    if not args.keep_originals:
+        for name in mapping:
+            remove_legacy(args.uploads, name)
+        print(f"✅ Removed {len(mapping)} legacy file(s) and their variants")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
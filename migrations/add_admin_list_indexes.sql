@@ -0,0 +1,60 @@
+-- ============================================================================
+-- RUANG HIJAU APP - Admin List Indexes Migration
+-- Composite (filter, created_at) indexes for the cursor-paginated admin lists
+-- (utils/pagination.py). InnoDB appends the primary key to every secondary
+-- index, so each one also serves ORDER BY created_at, id and the cursor
+-- condition without a filesort.
+-- ============================================================================
+
+USE ruang_hijau;
+
+DROP PROCEDURE IF EXISTS add_index_if_missing;
+
+DELIMITER //
+CREATE PROCEDURE add_index_if_missing(IN p_table VARCHAR(64), IN p_index VARCHAR(64), IN p_columns VARCHAR(255))
+BEGIN
+    IF (SELECT COUNT(*) FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = p_table AND index_name = p_index) = 0 THEN
+        SET @ddl := CONCAT('ALTER TABLE ', p_table, ' ADD INDEX ', p_index, ' (', p_columns, ')');
+        PREPARE stmt FROM @ddl;
+        EXECUTE stmt;
+        DEALLOCATE PREPARE stmt;
+    END IF;
+END //
+DELIMITER ;
+
+CALL add_index_if_missing('users', 'idx_users_role_created', 'role, created_at');
+CALL add_index_if_missing('posts', 'idx_posts_user_created', 'user_id, created_at');
+CALL add_index_if_missing('comments', 'idx_comments_post_created', 'post_id, created_at');
+CALL add_index_if_missing('comments', 'idx_comments_user_created', 'user_id, created_at');
+CALL add_index_if_missing('campaigns', 'idx_campaigns_status_created', 'campaign_status, created_at');
+CALL add_index_if_missing('campaigns', 'idx_campaigns_category_created', 'category, created_at');
+CALL add_index_if_missing('campaigns', 'idx_campaigns_creator_created', 'creator_id, created_at');
+CALL add_index_if_missing('donations', 'idx_donations_status_created', 'donation_status, created_at');
+CALL add_index_if_missing('donations', 'idx_donations_campaign_created', 'campaign_id, created_at');
+CALL add_index_if_missing('donations', 'idx_donations_donor_created', 'donor_id, created_at');
+CALL add_index_if_missing('volunteers', 'idx_volunteers_status_created', 'volunteer_status, created_at');
+CALL add_index_if_missing('volunteers', 'idx_volunteers_campaign_created', 'campaign_id, created_at');
+CALL add_index_if_missing('volunteers', 'idx_volunteers_user_created', 'user_id, created_at');
+CALL add_index_if_missing('notifications', 'idx_notifications_type_created', 'notification_type, created_at');
+CALL add_index_if_missing('notifications', 'idx_notifications_user_created', 'user_id, created_at');
+
+DROP PROCEDURE IF EXISTS add_index_if_missing;
+
+-- ============================================================================
+-- ROLLBACK
+-- ============================================================================
+-- ALTER TABLE users DROP INDEX idx_users_role_created;
+-- ALTER TABLE posts DROP INDEX idx_posts_user_created;
+-- ALTER TABLE comments DROP INDEX idx_comments_post_created, DROP INDEX idx_comments_user_created;
+-- ALTER TABLE campaigns DROP INDEX idx_campaigns_status_created, DROP INDEX idx_campaigns_category_created,
+--     DROP INDEX idx_campaigns_creator_created;
+-- ALTER TABLE donations DROP INDEX idx_donations_status_created, DROP INDEX idx_donations_campaign_created,
+--     DROP INDEX idx_donations_donor_created;
+-- ALTER TABLE volunteers DROP INDEX idx_volunteers_status_created, DROP INDEX idx_volunteers_campaign_created,
+--     DROP INDEX idx_volunteers_user_created;
+-- ALTER TABLE notifications DROP INDEX idx_notifications_type_created, DROP INDEX idx_notifications_user_created;
+
+-- ============================================================================
+-- END OF MIGRATION
+-- ============================================================================
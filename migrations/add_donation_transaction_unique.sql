@@ -0,0 +1,33 @@
+-- ============================================================================
+-- RUANG HIJAU APP - Unique Donation Transaction Migration
+-- create_donation relies on this index instead of a SELECT-then-INSERT check:
+-- a re-sent transaction_id fails the INSERT (duplicate key -> HTTP 400)
+-- ============================================================================
+
+USE ruang_hijau;
+
+-- Duplicates must be resolved before the index can be created:
+-- SELECT transaction_id, COUNT(*) FROM donations
+-- WHERE transaction_id IS NOT NULL GROUP BY transaction_id HAVING COUNT(*) > 1;
+
+-- Skipped when the schema already has it (ruang_hijau.sql / ruang_hijau_database.sql)
+SET @has_unique := (
+    SELECT COUNT(*) FROM information_schema.statistics
+    WHERE table_schema = DATABASE() AND table_name = 'donations'
+      AND column_name = 'transaction_id' AND non_unique = 0
+);
+SET @ddl := IF(@has_unique = 0,
+    'ALTER TABLE donations ADD UNIQUE KEY uq_donations_transaction_id (transaction_id)',
+    'SELECT ''donations.transaction_id is already unique'' AS info');
+PREPARE stmt FROM @ddl;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+-- ============================================================================
+-- ROLLBACK
+-- ============================================================================
+-- ALTER TABLE donations DROP INDEX uq_donations_transaction_id;
+
+-- ============================================================================
+-- END OF MIGRATION
+-- ============================================================================
@@ -0,0 +1,31 @@
+-- ============================================================================
+-- RUANG HIJAU APP - Notification Broadcasts Migration
+-- Progress of admin broadcasts (utils/notification_broadcast.py), written by
+-- the worker running the job and readable from every worker
+-- ============================================================================
+
+USE ruang_hijau;
+
+CREATE TABLE IF NOT EXISTS notification_broadcasts (
+  id CHAR(16) PRIMARY KEY,
+  audience VARCHAR(50) NOT NULL,
+  campaign_id INT NULL,
+  title VARCHAR(200) NOT NULL,
+  created_by INT NULL,
+  status ENUM('queued', 'running', 'done', 'failed') NOT NULL DEFAULT 'queued',
+  sent INT NOT NULL DEFAULT 0,
+  error VARCHAR(1000) NULL,
+  duration_ms DECIMAL(12, 1) NULL,
+  created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  INDEX idx_notification_broadcasts_created (created_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- ============================================================================
+-- ROLLBACK
+-- ============================================================================
+-- DROP TABLE IF EXISTS notification_broadcasts;
+
+-- ============================================================================
+-- END OF MIGRATION
+-- ============================================================================
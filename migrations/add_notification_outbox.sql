@@ -0,0 +1,41 @@
+-- ============================================================================
+-- RUANG HIJAU APP - Notification Outbox Migration
+-- Request handlers queue notifications here in their own transaction;
+-- utils/notification_outbox.py dispatches them into notifications in batches
+-- ============================================================================
+
+USE ruang_hijau;
+
+CREATE TABLE IF NOT EXISTS notification_outbox (
+  id BIGINT AUTO_INCREMENT PRIMARY KEY,
+  dedup_key VARCHAR(191) NULL,
+  user_id INT NOT NULL,
+  notification_type VARCHAR(50),
+  title VARCHAR(200) NOT NULL,
+  message TEXT,
+  related_id INT,
+  related_type VARCHAR(50),
+  status ENUM('pending', 'processing', 'sent', 'failed') NOT NULL DEFAULT 'pending',
+  attempts INT NOT NULL DEFAULT 0,
+  available_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  claim_token CHAR(32) NULL,
+  claimed_at TIMESTAMP NULL,
+  last_error VARCHAR(1000) NULL,
+  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  processed_at TIMESTAMP NULL,
+  UNIQUE KEY uq_notification_outbox_dedup (dedup_key),
+  INDEX idx_notification_outbox_status (status, available_at),
+  INDEX idx_notification_outbox_claim (claim_token)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Sent rows are only needed for deduplication; archive_notifications.py prunes them:
+-- DELETE FROM notification_outbox WHERE status = 'sent' AND processed_at < NOW() - INTERVAL 7 DAY;
+
+-- ============================================================================
+-- ROLLBACK
+-- ============================================================================
+-- DROP TABLE IF EXISTS notification_outbox;
+
+-- ============================================================================
+-- END OF MIGRATION
+-- ============================================================================
@@ -0,0 +1,44 @@
+-- ============================================================================
+-- RUANG HIJAU APP - Notification Unread Counters Migration
+-- Per-user unread counts (utils/notification_counters.py) and the index
+-- behind "a user's (unread) notifications, newest first"
+-- ============================================================================
+
+USE ruang_hijau;
+
+CREATE TABLE IF NOT EXISTS user_notification_counters (
+  user_id INT PRIMARY KEY,
+  unread_count INT NOT NULL DEFAULT 0,
+  updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Composite index; skipped when it already exists
+SET @has_index := (
+    SELECT COUNT(*) FROM information_schema.statistics
+    WHERE table_schema = DATABASE() AND table_name = 'notifications'
+      AND index_name = 'idx_notifications_user_read_created'
+);
+SET @ddl := IF(@has_index = 0,
+    'ALTER TABLE notifications ADD INDEX idx_notifications_user_read_created (user_id, is_read, created_at)',
+    'SELECT ''idx_notifications_user_read_created already exists'' AS info');
+PREPARE stmt FROM @ddl;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+-- Backfill (also the way to resync if counters ever drift)
+INSERT INTO user_notification_counters (user_id, unread_count)
+SELECT user_id, COUNT(*) FROM notifications
+WHERE is_read = FALSE
+GROUP BY user_id
+ON DUPLICATE KEY UPDATE unread_count = VALUES(unread_count);
+
+-- ============================================================================
+-- ROLLBACK
+-- ============================================================================
+-- ALTER TABLE notifications DROP INDEX idx_notifications_user_read_created;
+-- DROP TABLE IF EXISTS user_notification_counters;
+
+-- ============================================================================
+-- END OF MIGRATION
+-- ============================================================================
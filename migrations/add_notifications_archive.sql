@@ -0,0 +1,42 @@
+-- ============================================================================
+-- RUANG HIJAU APP - Notifications Archive Migration
+-- archive_notifications.py moves read notifications older than
+-- NOTIFICATION_RETENTION_DAYS here, keeping the live table (and its
+-- indexes) small
+-- ============================================================================
+
+USE ruang_hijau;
+
+-- Compact: no is_read (always read), no foreign keys, compressed pages.
+-- created_at is part of the primary key so the table can be partitioned by
+-- month (migrations/partition_notifications_archive.sql).
+CREATE TABLE IF NOT EXISTS notifications_archive (
+  id INT NOT NULL,
+  user_id INT NOT NULL,
+  title VARCHAR(200) NOT NULL,
+  message TEXT,
+  notification_type VARCHAR(50),
+  related_id INT,
+  related_type VARCHAR(50),
+  created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  archived_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (id, created_at),
+  INDEX idx_notifications_archive_user (user_id, created_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+  ROW_FORMAT=COMPRESSED KEY_BLOCK_SIZE=8;
+
+-- The live notifications table is not partitioned: InnoDB doesn't allow
+-- foreign keys on partitioned tables (notifications.user_id -> users.id).
+
+-- ============================================================================
+-- ROLLBACK
+-- ============================================================================
+-- Move archived rows back first if they are still needed:
+-- INSERT INTO notifications (id, user_id, title, message, notification_type, is_read, related_id, related_type, created_at)
+-- SELECT id, user_id, title, message, notification_type, TRUE, related_id, related_type, created_at
+-- FROM notifications_archive a WHERE EXISTS (SELECT 1 FROM users u WHERE u.id = a.user_id);
+-- DROP TABLE IF EXISTS notifications_archive;
+
+-- ============================================================================
+-- END OF MIGRATION
+-- ============================================================================
@@ -0,0 +1,31 @@
+-- ============================================================================
+-- RUANG HIJAU APP - Content-Addressed Upload Storage Migration
+-- Reference counts for files in uploads/ (stored as ab/cd/<sha256>.<ext>)
+-- ============================================================================
+
+USE ruang_hijau;
+
+-- One row per stored file; ref_count = rows in posts/campaigns using it
+CREATE TABLE IF NOT EXISTS upload_files (
+    path VARCHAR(255) NOT NULL,
+    size_bytes BIGINT DEFAULT NULL,
+    ref_count INT NOT NULL DEFAULT 0,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (path)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Orphan GC looks up unreferenced files by age
+CREATE INDEX idx_upload_files_refs ON upload_files(ref_count, updated_at);
+
+-- Existing files: run `python migrate_uploads.py --apply` afterwards to move
+-- them into content-addressed storage and fill in the reference counts.
+
+-- ============================================================================
+-- ROLLBACK
+-- ============================================================================
+-- DROP TABLE upload_files;
+
+-- ============================================================================
+-- END OF MIGRATION
+-- ============================================================================
@@ -0,0 +1,30 @@
+-- ============================================================================
+-- RUANG HIJAU APP - Monthly Partitions for notifications_archive (optional)
+-- With partitions, archive_notifications.py adds upcoming months by splitting
+-- pmax and expires old months with DROP PARTITION (instant, no DELETE scan).
+-- Run after add_notifications_archive.sql; rebuilds the table once.
+-- ============================================================================
+
+USE ruang_hijau;
+
+-- Everything before November 2026 in one partition; the job creates
+-- p202611, p202612, ... ahead of time (--months-ahead)
+ALTER TABLE notifications_archive
+PARTITION BY RANGE (UNIX_TIMESTAMP(created_at)) (
+  PARTITION p_old VALUES LESS THAN (UNIX_TIMESTAMP('2026-11-01 00:00:00')),
+  PARTITION pmax VALUES LESS THAN MAXVALUE
+);
+
+-- Check:
+-- SELECT partition_name, partition_description, table_rows
+-- FROM information_schema.partitions
+-- WHERE table_schema = DATABASE() AND table_name = 'notifications_archive';
+
+-- ============================================================================
+-- ROLLBACK
+-- ============================================================================
+-- ALTER TABLE notifications_archive REMOVE PARTITIONING;
+
+-- ============================================================================
+-- END OF MIGRATION
+-- ============================================================================
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Ruang Hijau ML Service
+Dedicated process pool for waste-detection inference.
+
+Web workers connect to it when WASTE_ML_MODE=pool, so TensorFlow and the
+MobileNetV2 weights live only here instead of in every gunicorn worker.
+
+Configuration (env):
+    WASTE_ML_POOL_ADDRESS       Unix socket path or loopback host:port
+                                (default <tmp>/ruang_hijau-<uid>/ml.sock)
+    WASTE_ML_POOL_AUTHKEY       shared secret for the socket (required; gunicorn
+                                generates one when it starts this service)
+    WASTE_ML_POOL_TIMEOUT       seconds per inference batch (default 60)
+    WASTE_ML_POOL_WORKERS       number of inference processes (default 2)
+    WASTE_ML_INTRA_OP_THREADS   TF intra-op threads per process (default 2)
+    WASTE_ML_INTER_OP_THREADS   TF inter-op threads per process (default 1)
+    WASTE_ML_PIN_CORES          pin each process to its own CPU slice (default false)
+    WASTE_ML_BACKEND            keras | graph | tflite | tflite_int8
+
+Usage:
+    python ml_service.py
+"""
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from utils.ml_worker_pool import MLWorkerPool, MLService, get_authkey
+
+
+def main():
+    load_dotenv()
+
+    try:
+        authkey = get_authkey()
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return 1
+
+    pool = MLWorkerPool()
+    print(f"⏳ Starting {pool.num_workers} ML worker(s) "
+          f"(backend={pool.backend}, intra_op={pool.intra_op_threads}, inter_op={pool.inter_op_threads})...")
+    pool.start()
+    print(f"✅ ML workers ready (backend: {pool.backend_name})")
+
+    try:
+        MLService(pool, authkey=authkey).serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pool.shutdown()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
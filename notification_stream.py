@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Ruang Hijau Notification Stream
+Serves GET /api/notifications/stream?user_id=<id> (Server-Sent Events) for
+every web worker when NOTIFICATION_STREAM_MODE=broker.
+
+Web workers publish committed notifications to it over a local socket; it
+holds all SSE connections in one asyncio loop, so idle clients don't occupy
+gunicorn threads. Route /api/notifications/stream to it in nginx (with
+proxy_buffering off) or point clients at NOTIFICATION_STREAM_URL.
+
+Configuration (env):
+    NOTIFICATION_STREAM_HOST        bind host (default 127.0.0.1)
+    NOTIFICATION_STREAM_PORT        bind port (default 8001)
+    NOTIFICATION_BROKER_ADDRESS     Unix socket path or loopback host:port
+                                    (default <tmp>/ruang_hijau-<uid>/notify.sock)
+    NOTIFICATION_BROKER_AUTHKEY     shared secret for the socket (required; gunicorn
+                                    generates one when it starts this service)
+    NOTIFICATION_STREAM_HEARTBEAT   seconds between keep-alive comments (default 15)
+
+Usage:
+    python notification_stream.py
+"""
+import os
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from utils.notification_events import NotificationStreamServer, get_authkey
+
+
+def main():
+    load_dotenv()
+
+    try:
+        authkey = get_authkey()
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return 1
+
+    server = NotificationStreamServer(
+        host=os.getenv('NOTIFICATION_STREAM_HOST', '127.0.0.1'),
+        port=int(os.getenv('NOTIFICATION_STREAM_PORT', 8001)),
+        authkey=authkey,
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,5 +1,12 @@
 from flask import Blueprint, request, jsonify, render_template, session, redirect, url_for
 from db import get_db
+from utils.upload_storage import release_reference
+from utils.entity_cache import get_campaign, invalidate
+from utils.listing_cache import invalidate_campaign_listings
+from utils.notification_broadcast import AUDIENCES, broadcasts_shared, get_broadcast, start_broadcast
+from utils.notification_counters import delete_notification as delete_notification_row, get_total_unread
+from utils.notification_retention import read_status as retention_status, table_sizes
+from utils.pagination import KeysetList, PaginationError, as_bool, as_int, one_of
 from werkzeug.security import check_password_hash
 from functools import wraps
 from datetime import datetime, timedelta
@@ -46,6 +53,41 @@ def admin_api_required(f):
     return decorated_function
 
 
+def paginated_list(listing, key, row_hook=None):
+    """Serve one page of an admin list (?limit, ?sort, ?order, ?cursor, ?q and filters)"""
+    db = None
+    cursor = None
+    try:
+        db = get_db()
+        cursor = db.cursor(dictionary=True)
+        rows, pagination = listing.fetch(cursor, request.args)
+        if row_hook:
+            for row in rows:
+                row_hook(row)
+        return jsonify({
+            "status": "success",
+            key: rows,
+            "pagination": pagination
+        }), 200
+    except PaginationError as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 500
+    finally:
+        try:
+            if cursor:
+                cursor.close()
+        finally:
+            if db:
+                db.close()
+
+
 # LOGIN PAGE
 @admin_bp.route("/login", methods=["GET"])
 def login():
@@ -282,7 +324,7 @@ def recent_activity():
             activities.append({
                 "type": "user",
                 "title": f"Pengguna baru: {user['name']}",
-                "created_at": user['created_at'].isoformat() if user['created_at'] else None
+                "created_at": user['created_at']
             })
         
         # Get recent posts
@@ -299,11 +341,11 @@ def recent_activity():
             activities.append({
                 "type": "post",
                 "title": f"Postingan baru dari {post['user_name']}",
-                "created_at": post['created_at'].isoformat() if post['created_at'] else None
+                "created_at": post['created_at']
             })
         
         # Sort by created_at descending
-        activities.sort(key=lambda x: x['created_at'] or '', reverse=True)
+        activities.sort(key=lambda x: x['created_at'] or datetime.min, reverse=True)
         activities = activities[:10]  # Limit to 10 most recent
         
         cursor.close()
@@ -381,40 +423,21 @@ def monthly_stats():
 
 
 # USERS MANAGEMENT
+USERS_LIST = KeysetList(
+    "SELECT u.id, u.name, u.email, u.role, u.created_at FROM users u",
+    id_column="u.id",
+    sorts={"created_at": ("u.created_at", "created_at"), "id": ("u.id", "id")},
+    filters={"role": ("u.role = %s", one_of('user', 'admin'))},
+    search=("u.name", "u.email"),
+    created_column="u.created_at",
+)
+
+
 @admin_bp.route("/users", methods=["GET"])
 @admin_api_required
 def get_users():
-    """Get all users"""
-    try:
-        db = get_db()
-        cursor = db.cursor(dictionary=True)
-        
-        cursor.execute("""
-            SELECT id, name, email, role, created_at
-            FROM users
-            ORDER BY created_at DESC
-            LIMIT 100
-        """)
-        
-        users = cursor.fetchall()
-        
-        # Convert datetime to string
-        for user in users:
-            if user['created_at']:
-                user['created_at'] = user['created_at'].isoformat()
-        
-        cursor.close()
-        db.close()
-        
-        return jsonify({
-            "status": "success",
-            "users": users
-        }), 200
-    except Exception as e:
-        return jsonify({
-            "status": "error",
-            "message": str(e)
-        }), 500
+    """Get users (cursor paginated; filter: role, q = name / email)"""
+    return paginated_list(USERS_LIST, "users")
 
 
 @admin_bp.route("/users/<int:user_id>", methods=["PATCH"])
@@ -461,6 +484,11 @@ def delete_user(user_id):
         cursor = db.cursor()
         cursor.execute("DELETE FROM users WHERE id = %s", (user_id,))
         db.commit()
+        # Their posts / campaigns are gone too (ON DELETE CASCADE)
+        invalidate('user', user_id)
+        invalidate('post')
+        invalidate('campaign')
+        invalidate_campaign_listings()
         return jsonify({"status": "success", "message": "Pengguna berhasil dihapus"}), 200
     except Exception as e:
         if db:
@@ -476,41 +504,23 @@ def delete_user(user_id):
 
 
 # POSTS MANAGEMENT
+POSTS_LIST = KeysetList(
+    """SELECT p.id, p.user_id, p.text, p.likes, p.created_at, u.name as user_name
+       FROM posts p
+       JOIN users u ON p.user_id = u.id""",
+    id_column="p.id",
+    sorts={"created_at": ("p.created_at", "created_at"), "id": ("p.id", "id")},
+    filters={"user_id": ("p.user_id = %s", as_int)},
+    search=("p.text",),
+    created_column="p.created_at",
+)
+
+
 @admin_bp.route("/posts", methods=["GET"])
 @admin_api_required
 def get_posts():
-    """Get all posts"""
-    try:
-        db = get_db()
-        cursor = db.cursor(dictionary=True)
-        
-        cursor.execute("""
-            SELECT p.id, p.text, p.likes, p.created_at, u.name as user_name
-            FROM posts p
-            JOIN users u ON p.user_id = u.id
-            ORDER BY p.created_at DESC
-            LIMIT 100
-        """)
-        
-        posts = cursor.fetchall()
-        
-        # Convert datetime to string
-        for post in posts:
-            if post['created_at']:
-                post['created_at'] = post['created_at'].isoformat()
-        
-        cursor.close()
-        db.close()
-        
-        return jsonify({
-            "status": "success",
-            "posts": posts
-        }), 200
-    except Exception as e:
-        return jsonify({
-            "status": "error",
-            "message": str(e)
-        }), 500
+    """Get posts (cursor paginated; filter: user_id, q = text)"""
+    return paginated_list(POSTS_LIST, "posts")
 
 
 @admin_bp.route("/posts/<int:post_id>", methods=["DELETE"])
@@ -521,8 +531,13 @@ def delete_post(post_id):
         db = get_db()
         cursor = db.cursor()
         
+        cursor.execute("SELECT image FROM posts WHERE id = %s", (post_id,))
+        row = cursor.fetchone()
         cursor.execute("DELETE FROM posts WHERE id = %s", (post_id,))
+        if cursor.rowcount:
+            release_reference(cursor, row[0] if row else None)
         db.commit()
+        invalidate('post', post_id)
         
         cursor.close()
         db.close()
@@ -542,46 +557,31 @@ def delete_post(post_id):
 
 
 # CAMPAIGNS MANAGEMENT
+# Raised amount per row of the page only (idx_campaign_id), instead of
+# grouping the whole donations table before LIMIT
+CAMPAIGNS_LIST = KeysetList(
+    """SELECT c.id, c.title, c.category, c.target_amount,
+              c.campaign_status, c.created_at,
+              (SELECT COALESCE(SUM(d.amount), 0) FROM donations d
+               WHERE d.campaign_id = c.id AND d.donation_status = 'completed') as current_amount
+       FROM campaigns c""",
+    id_column="c.id",
+    sorts={"created_at": ("c.created_at", "created_at"), "id": ("c.id", "id")},
+    filters={
+        "status": ("c.campaign_status = %s", one_of('active', 'completed', 'cancelled')),
+        "category": ("c.category = %s", str),
+        "creator_id": ("c.creator_id = %s", as_int),
+    },
+    search=("c.title",),
+    created_column="c.created_at",
+)
+
+
 @admin_bp.route("/campaigns", methods=["GET"])
 @admin_api_required
 def get_campaigns():
-    """Get all campaigns"""
-    try:
-        db = get_db()
-        cursor = db.cursor(dictionary=True)
-        
-        cursor.execute("""
-            SELECT c.id, c.title, c.category, c.target_amount, 
-                   c.campaign_status, c.created_at,
-                   COALESCE(SUM(d.amount), 0) as current_amount
-            FROM campaigns c
-            LEFT JOIN donations d ON c.id = d.campaign_id AND d.donation_status = 'completed'
-            GROUP BY c.id
-            ORDER BY c.created_at DESC
-            LIMIT 100
-        """)
-        
-        campaigns = cursor.fetchall()
-        
-        # Convert datetime and amounts
-        for campaign in campaigns:
-            if campaign['created_at']:
-                campaign['created_at'] = campaign['created_at'].isoformat()
-            campaign['current_amount'] = float(campaign['current_amount'])
-            campaign['target_amount'] = float(campaign['target_amount'])
-        
-        cursor.close()
-        db.close()
-        
-        return jsonify({
-            "status": "success",
-            "campaigns": campaigns
-        }), 200
-    except Exception as e:
-        return jsonify({
-            "status": "error",
-            "message": str(e)
-        }), 500
+    """Get campaigns (cursor paginated; filter: status, category, creator_id, q = title)"""
+    return paginated_list(CAMPAIGNS_LIST, "campaigns")
 
 
 @admin_bp.route("/campaigns/<int:campaign_id>", methods=["PATCH"])
@@ -604,6 +604,7 @@ def update_campaign(campaign_id):
             WHERE id = %s
         """, (campaign_status, campaign_id))
         db.commit()
+        invalidate_campaign_listings()
         return jsonify({"status": "success", "message": "Status kampanye berhasil diupdate"}), 200
     except Exception as e:
         if db:
@@ -619,50 +620,40 @@ def update_campaign(campaign_id):
 
 
 # DONATIONS MANAGEMENT
+DONATIONS_LIST = KeysetList(
+    """SELECT d.id,
+              d.campaign_id,
+              d.amount,
+              d.donation_status as status,
+              d.is_anonymous,
+              d.donor_name,
+              d.created_at,
+              COALESCE(u.name, d.donor_name, IF(d.is_anonymous, 'Anonim', 'Guest')) as user_name,
+              c.title as campaign_title
+       FROM donations d
+       LEFT JOIN users u ON d.donor_id = u.id
+       JOIN campaigns c ON d.campaign_id = c.id""",
+    id_column="d.id",
+    sorts={
+        "created_at": ("d.created_at", "created_at"),
+        "id": ("d.id", "id"),
+        "amount": ("d.amount", "amount"),
+    },
+    filters={
+        "status": ("d.donation_status = %s", one_of('pending', 'completed', 'failed', 'refunded')),
+        "campaign_id": ("d.campaign_id = %s", as_int),
+        "donor_id": ("d.donor_id = %s", as_int),
+    },
+    search=("d.donor_name", "d.transaction_id"),
+    created_column="d.created_at",
+)
+
+
 @admin_bp.route("/donations", methods=["GET"])
 @admin_api_required
 def get_donations():
-    """Get all donations"""
-    try:
-        db = get_db()
-        cursor = db.cursor(dictionary=True)
-        
-        cursor.execute("""
-            SELECT d.id,
-                   d.amount,
-                   d.donation_status as status,
-                   d.is_anonymous,
-                   d.donor_name,
-                   d.created_at,
-                   COALESCE(u.name, d.donor_name, IF(d.is_anonymous, 'Anonim', 'Guest')) as user_name,
-                   c.title as campaign_title
-            FROM donations d
-            LEFT JOIN users u ON d.donor_id = u.id
-            JOIN campaigns c ON d.campaign_id = c.id
-            ORDER BY d.created_at DESC
-            LIMIT 100
-        """)
-        
-        donations = cursor.fetchall()
-        
-        # Convert datetime and amounts
-        for donation in donations:
-            if donation['created_at']:
-                donation['created_at'] = donation['created_at'].isoformat()
-            donation['amount'] = float(donation['amount'])
-        
-        cursor.close()
-        db.close()
-        
-        return jsonify({
-            "status": "success",
-            "donations": donations
-        }), 200
-    except Exception as e:
-        return jsonify({
-            "status": "error",
-            "message": str(e)
-        }), 500
+    """Get donations (cursor paginated; filter: status, campaign_id, donor_id, q = donor / transaction)"""
+    return paginated_list(DONATIONS_LIST, "donations")
 
 
 @admin_bp.route("/donations/<int:donation_id>", methods=["PATCH"])
@@ -754,12 +745,9 @@ def stats_notifications_unread():
     """Get total unread notifications count"""
     try:
         db = get_db()
-        cursor = db.cursor(dictionary=True)
-        cursor.execute("SELECT COUNT(*) as count FROM notifications WHERE is_read = FALSE")
-        result = cursor.fetchone()
-        cursor.close()
+        count = get_total_unread(db)
         db.close()
-        return jsonify({"status": "success", "count": result["count"]}), 200
+        return jsonify({"status": "success", "count": count}), 200
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
@@ -786,7 +774,7 @@ def recent_activity_v2():
             activities.append({
                 "type": "user",
                 "title": f"Pengguna baru: {u['name']}",
-                "created_at": u["created_at"].isoformat() if u.get("created_at") else None
+                "created_at": u["created_at"]
             })
 
         # Recent posts
@@ -801,7 +789,7 @@ def recent_activity_v2():
             activities.append({
                 "type": "post",
                 "title": f"Postingan baru dari {p['user_name']}",
-                "created_at": p["created_at"].isoformat() if p.get("created_at") else None
+                "created_at": p["created_at"]
             })
 
         # Recent donations (include anonymous)
@@ -819,7 +807,7 @@ def recent_activity_v2():
             activities.append({
                 "type": "donation",
                 "title": f"Donasi baru dari {d['donor_display']} untuk \"{d['campaign_title']}\"",
-                "created_at": d["created_at"].isoformat() if d.get("created_at") else None
+                "created_at": d["created_at"]
             })
 
         # Recent comments
@@ -834,7 +822,7 @@ def recent_activity_v2():
             activities.append({
                 "type": "comment",
                 "title": f"Komentar baru dari {cmt['user_name']}",
-                "created_at": cmt["created_at"].isoformat() if cmt.get("created_at") else None
+                "created_at": cmt["created_at"]
             })
 
         # Recent volunteers
@@ -850,7 +838,7 @@ def recent_activity_v2():
             activities.append({
                 "type": "volunteer",
                 "title": f"Aplikasi relawan: {v['user_name']} ({v['campaign_title']})",
-                "created_at": v["created_at"].isoformat() if v.get("created_at") else None
+                "created_at": v["created_at"]
             })
 
         # Recent events
@@ -864,10 +852,10 @@ def recent_activity_v2():
             activities.append({
                 "type": "event",
                 "title": f"Event baru: {ev['title']}",
-                "created_at": ev["created_at"].isoformat() if ev.get("created_at") else None
+                "created_at": ev["created_at"]
             })
 
-        activities.sort(key=lambda x: x["created_at"] or "", reverse=True)
+        activities.sort(key=lambda x: x["created_at"] or datetime.min, reverse=True)
         activities = activities[:10]
 
         cursor.close()
@@ -958,29 +946,26 @@ def monthly_stats_v2():
 
 
 # COMMENTS MANAGEMENT
+COMMENTS_LIST = KeysetList(
+    """SELECT c.id, c.post_id, c.user_id, c.text, c.created_at, u.name as user_name
+       FROM comments c
+       JOIN users u ON c.user_id = u.id""",
+    id_column="c.id",
+    sorts={"created_at": ("c.created_at", "created_at"), "id": ("c.id", "id")},
+    filters={
+        "post_id": ("c.post_id = %s", as_int),
+        "user_id": ("c.user_id = %s", as_int),
+    },
+    search=("c.text",),
+    created_column="c.created_at",
+)
+
+
 @admin_bp.route("/comments", methods=["GET"])
 @admin_api_required
 def get_comments():
-    """Get all comments"""
-    try:
-        db = get_db()
-        cursor = db.cursor(dictionary=True)
-        cursor.execute("""
-            SELECT c.id, c.post_id, c.text, c.created_at, u.name as user_name
-            FROM comments c
-            JOIN users u ON c.user_id = u.id
-            ORDER BY c.created_at DESC
-            LIMIT 100
-        """)
-        comments = cursor.fetchall()
-        for c in comments:
-            if c.get("created_at"):
-                c["created_at"] = c["created_at"].isoformat()
-        cursor.close()
-        db.close()
-        return jsonify({"status": "success", "comments": comments}), 200
-    except Exception as e:
-        return jsonify({"status": "error", "message": str(e)}), 500
+    """Get comments (cursor paginated; filter: post_id, user_id, q = text)"""
+    return paginated_list(COMMENTS_LIST, "comments")
 
 
 @admin_bp.route("/comments/<int:comment_id>", methods=["DELETE"])
@@ -1009,33 +994,33 @@ def delete_comment(comment_id):
 
 
 # VOLUNTEERS MANAGEMENT
+VOLUNTEERS_LIST = KeysetList(
+    """SELECT v.id, v.campaign_id, v.user_id, v.volunteer_status, v.hours_contributed, v.created_at,
+              u.name as user_name,
+              c.title as campaign_title
+       FROM volunteers v
+       JOIN users u ON v.user_id = u.id
+       JOIN campaigns c ON v.campaign_id = c.id""",
+    id_column="v.id",
+    sorts={"created_at": ("v.created_at", "created_at"), "id": ("v.id", "id")},
+    filters={
+        "status": ("v.volunteer_status = %s", one_of('applied', 'accepted', 'rejected', 'completed')),
+        "campaign_id": ("v.campaign_id = %s", as_int),
+        "user_id": ("v.user_id = %s", as_int),
+    },
+    created_column="v.created_at",
+)
+
+
+def _volunteer_row(v):
+    v["hours_contributed"] = v.get("hours_contributed") or 0
+
+
 @admin_bp.route("/volunteers", methods=["GET"])
 @admin_api_required
 def get_volunteers():
-    """Get volunteers"""
-    try:
-        db = get_db()
-        cursor = db.cursor(dictionary=True)
-        cursor.execute("""
-            SELECT v.id, v.volunteer_status, v.hours_contributed, v.created_at,
-                   u.name as user_name,
-                   c.title as campaign_title
-            FROM volunteers v
-            JOIN users u ON v.user_id = u.id
-            JOIN campaigns c ON v.campaign_id = c.id
-            ORDER BY v.created_at DESC
-            LIMIT 100
-        """)
-        volunteers = cursor.fetchall()
-        for v in volunteers:
-            if v.get("created_at"):
-                v["created_at"] = v["created_at"].isoformat()
-            v["hours_contributed"] = float(v.get("hours_contributed") or 0)
-        cursor.close()
-        db.close()
-        return jsonify({"status": "success", "volunteers": volunteers}), 200
-    except Exception as e:
-        return jsonify({"status": "error", "message": str(e)}), 500
+    """Get volunteers (cursor paginated; filter: status, campaign_id, user_id)"""
+    return paginated_list(VOLUNTEERS_LIST, "volunteers", _volunteer_row)
 
 
 @admin_bp.route("/volunteers/<int:volunteer_id>", methods=["PATCH"])
@@ -1067,6 +1052,8 @@ def update_volunteer(volunteer_id):
             WHERE id = %s
         """, (volunteer_status, hours_val, volunteer_id))
         db.commit()
+        # volunteer_count on the campaign cards counts accepted volunteers
+        invalidate_campaign_listings()
         return jsonify({"status": "success", "message": "Relawan berhasil diupdate"}), 200
     except Exception as e:
         if db:
@@ -1098,11 +1085,6 @@ def get_events():
             LIMIT 100
         """)
         events = cursor.fetchall()
-        for ev in events:
-            if ev.get("date"):
-                ev["date"] = ev["date"].isoformat()
-            if ev.get("created_at"):
-                ev["created_at"] = ev["created_at"].isoformat()
         cursor.close()
         db.close()
         return jsonify({"status": "success", "events": events}), 200
@@ -1171,7 +1153,6 @@ def get_event(event_id):
         # Provide both formatted and raw (for prompt default)
         if ev.get("date"):
             ev["date_raw"] = ev["date"].strftime("%Y-%m-%d %H:%M:%S")
-            ev["date"] = ev["date"].isoformat()
         return jsonify({"status": "success", "event": ev}), 200
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
@@ -1249,29 +1230,104 @@ def delete_event(event_id):
 
 
 # NOTIFICATIONS MANAGEMENT
+NOTIFICATIONS_LIST = KeysetList(
+    """SELECT n.id, n.user_id, n.title, n.notification_type, n.is_read, n.created_at,
+              u.name as user_name
+       FROM notifications n
+       JOIN users u ON n.user_id = u.id""",
+    id_column="n.id",
+    sorts={"created_at": ("n.created_at", "created_at"), "id": ("n.id", "id")},
+    filters={
+        "user_id": ("n.user_id = %s", as_int),
+        "type": ("n.notification_type = %s", str),
+        "is_read": ("n.is_read = %s", as_bool),
+    },
+    search=("n.title",),
+    created_column="n.created_at",
+)
+
+
+def _notification_row(n):
+    n["is_read"] = bool(n.get("is_read"))
+
+
 @admin_bp.route("/notifications", methods=["GET"])
 @admin_api_required
 def get_notifications():
-    """Get notifications"""
+    """Get notifications (cursor paginated; filter: user_id, type, is_read, q = title)"""
+    return paginated_list(NOTIFICATIONS_LIST, "notifications", _notification_row)
+
+
+@admin_bp.route("/notifications/broadcast", methods=["POST"])
+@admin_api_required
+def broadcast_notification():
+    """Send a notification to an audience (runs in the background, poll the returned id)"""
+    data = request.get_json(silent=True) or {}
+    audience = data.get("audience")
+    title = (data.get("title") or "").strip()
+    message = (data.get("message") or "").strip()
+    campaign_id = data.get("campaign_id")
+
+    if audience not in AUDIENCES:
+        return jsonify({
+            "status": "error",
+            "message": f"Audience tidak valid. Pilihan: {', '.join(AUDIENCES)}"
+        }), 400
+    if not title or not message:
+        return jsonify({"status": "error", "message": "Judul dan pesan wajib diisi"}), 400
+    if len(title) > 200:
+        return jsonify({"status": "error", "message": "Judul maksimal 200 karakter"}), 400
+
+    if AUDIENCES[audience][1]:
+        db = get_db()
+        try:
+            campaign = get_campaign(db, campaign_id)
+        finally:
+            db.close()
+        if not campaign:
+            return jsonify({"status": "error", "message": "Kampanye tidak ditemukan"}), 404
+        campaign_id = campaign["id"]
+    else:
+        campaign_id = None
+
+    job = start_broadcast(audience, title, message,
+                          notification_type=data.get("notification_type") or "broadcast",
+                          campaign_id=campaign_id, created_by=session.get("admin_id"))
+    return jsonify({"status": "success", "message": "Broadcast dimulai", "broadcast": job}), 202
+
+
+@admin_bp.route("/notifications/broadcast/<job_id>", methods=["GET"])
+@admin_api_required
+def broadcast_status(job_id):
+    """Progress of a broadcast (shared through notification_broadcasts)"""
     try:
         db = get_db()
-        cursor = db.cursor(dictionary=True)
-        cursor.execute("""
-            SELECT n.id, n.title, n.notification_type, n.is_read, n.created_at,
-                   u.name as user_name
-            FROM notifications n
-            JOIN users u ON n.user_id = u.id
-            ORDER BY n.created_at DESC
-            LIMIT 100
-        """)
-        notifications = cursor.fetchall()
-        for n in notifications:
-            if n.get("created_at"):
-                n["created_at"] = n["created_at"].isoformat()
-            n["is_read"] = bool(n.get("is_read"))
+        try:
+            job = get_broadcast(job_id, db)
+        finally:
+            db.close()
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+    if not job:
+        message = "Broadcast tidak ditemukan"
+        if not broadcasts_shared():
+            message += (" di worker ini. Status broadcast hanya tersimpan di worker yang menjalankannya; "
+                        "jalankan migrations/add_notification_broadcasts.sql agar terlihat dari semua worker")
+        return jsonify({"status": "error", "message": message}), 404
+    return jsonify({"status": "success", "broadcast": job}), 200
+
+
+@admin_bp.route("/notifications/retention", methods=["GET"])
+@admin_api_required
+def notification_retention():
+    """Last / running archive_notifications.py progress and notification table sizes"""
+    try:
+        db = get_db()
+        cursor = db.cursor()
+        sizes = table_sizes(cursor)
         cursor.close()
         db.close()
-        return jsonify({"status": "success", "notifications": notifications}), 200
+        return jsonify({"status": "success", "last_run": retention_status(), "tables": sizes}), 200
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
@@ -1281,24 +1337,15 @@ def get_notifications():
 def delete_notification(notification_id):
     """Delete notification"""
     db = None
-    cursor = None
     try:
         db = get_db()
-        cursor = db.cursor()
-        cursor.execute("DELETE FROM notifications WHERE id = %s", (notification_id,))
-        db.commit()
+        delete_notification_row(db, notification_id)
         return jsonify({"status": "success", "message": "Notifikasi berhasil dihapus"}), 200
     except Exception as e:
-        if db:
-            db.rollback()
         return jsonify({"status": "error", "message": str(e)}), 500
     finally:
-        try:
-            if cursor:
-                cursor.close()
-        finally:
-            if db:
-                db.close()
+        if db:
+            db.close()
 
 
 # LIKES ANALYTICS
@@ -1,6 +1,8 @@
 from flask import Blueprint, request, jsonify
 from db import get_db
 from werkzeug.security import generate_password_hash, check_password_hash
+from utils.conditional import make_etag, last_modified_of, not_modified, conditional_json
+from utils.entity_cache import invalidate
 import re
 
 auth_bp = Blueprint("auth", __name__)
@@ -253,7 +255,7 @@ def get_profile(user_id):
         cursor = db.cursor(dictionary=True)
         
         cursor.execute("""
-            SELECT id, name, email, phone, bio, profile_photo, role, created_at 
+            SELECT id, name, email, phone, bio, profile_photo, role, created_at, updated_at
             FROM users WHERE id = %s
         """, (user_id,))
         
@@ -267,10 +269,18 @@ def get_profile(user_id):
                 "message": "User not found"
             }), 404
         
-        return jsonify({
+        updated_at = user.pop('updated_at')
+        etag = make_etag('user', user_id, updated_at)
+        last_modified = last_modified_of(updated_at)
+        # private: email / phone must not end up in shared caches
+        cached = not_modified(etag, last_modified, private=True)
+        if cached:
+            return cached
+        
+        return conditional_json({
             "status": "success",
             "user": user
-        }), 200
+        }, etag=etag, last_modified=last_modified, private=True)
     
     except Exception as e:
         return jsonify({
@@ -329,6 +339,7 @@ def update_profile(user_id):
         
         cursor.execute(query, update_values)
         db.commit()
+        invalidate('user', user_id)
         cursor.close()
         db.close()
         
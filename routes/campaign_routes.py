@@ -1,8 +1,13 @@
 from flask import Blueprint, request, jsonify, current_app
 import os
-from werkzeug.utils import secure_filename
 from db import get_db
-import time
+from utils.image_variants import attach_variants, variant_urls
+from utils.image_jobs import enqueue_image_processing
+from utils.upload_storage import store_upload, add_reference, release_reference
+from utils.upload_stream import upload_error, UPLOAD_ERROR_RESPONSES
+from utils.conditional import make_etag, not_modified, conditional_json
+from utils.entity_cache import get_user, invalidate
+from utils.listing_cache import CAMPAIGN_LISTINGS, get_campaign_listing_cache, invalidate_campaign_listings
 
 campaign_bp = Blueprint("campaign", __name__)
 
@@ -21,6 +26,15 @@ def _ensure_uploads_dir():
     return uploads
 
 
+def _process_in_background(uploads, filename):
+    """Queue variant generation; if queueing fails they are generated on first request"""
+    try:
+        return enqueue_image_processing(uploads, filename)['status']
+    except Exception as e:
+        print(f"  Failed to queue image processing for {filename}: {str(e)}")
+        return None
+
+
 # GET ALL CAMPAIGNS
 @campaign_bp.route("/", methods=["GET"])
 def get_campaigns():
@@ -28,12 +42,31 @@ def get_campaigns():
     try:
         limit = int(request.args.get('limit', 20))
         page = int(request.args.get('page', 1))
-        offset = (page - 1) * limit
         category = request.args.get('category', None)  # Optional filter
         
-        db = get_db()
-        cursor = db.cursor(dictionary=True)
+        # Landing page: served from the listing cache (stale-while-revalidate),
+        # so the COUNT + page query only run when the page is (re)built
+        payload = get_campaign_listing_cache().get(
+            (CAMPAIGN_LISTINGS, category or '', page, limit),
+            lambda: _load_campaign_page(category, page, limit),
+        )
         
+        # Page spans many rows (and counts from other tables): ETag = payload hash
+        return conditional_json(payload)
+    
+    except Exception as e:
+        return jsonify({
+            "status": "error",
+            "message": f"Failed to get campaigns: {str(e)}"
+        }), 500
+
+
+def _load_campaign_page(category, page, limit):
+    """Build one page of active campaigns (also runs on listing cache refresh threads)"""
+    offset = (page - 1) * limit
+    db = get_db()
+    cursor = db.cursor(dictionary=True)
+    try:
         # Build WHERE clause
         where_clause = "WHERE c.campaign_status = 'active'"
         params = []
@@ -66,26 +99,21 @@ def get_campaigns():
             LIMIT %s OFFSET %s
         """, pagination_params)
         
-        campaigns = cursor.fetchall()
+        campaigns = [attach_variants(campaign) for campaign in cursor.fetchall()]
+    finally:
         cursor.close()
         db.close()
-        
-        return jsonify({
-            "status": "success",
-            "data": campaigns,
-            "pagination": {
-                "total": total,
-                "page": page,
-                "limit": limit,
-                "pages": (total + limit - 1) // limit
-            }
-        }), 200
     
-    except Exception as e:
-        return jsonify({
-            "status": "error",
-            "message": f"Failed to get campaigns: {str(e)}"
-        }), 500
+    return {
+        "status": "success",
+        "data": campaigns,
+        "pagination": {
+            "total": total,
+            "page": page,
+            "limit": limit,
+            "pages": (total + limit - 1) // limit
+        }
+    }
 
 
 # GET CAMPAIGN BY ID
@@ -101,6 +129,7 @@ def get_campaign(campaign_id):
                    c.title, c.description, c.category, c.location, c.contact,
                    c.target_amount, c.current_amount, c.duration_days, 
                    c.need_volunteers, c.image, c.campaign_status, c.created_at,
+                   c.updated_at, u.updated_at as creator_updated_at,
                    (SELECT COUNT(*) FROM donations WHERE campaign_id = c.id) as donor_count,
                    (SELECT COUNT(*) FROM volunteers WHERE campaign_id = c.id AND volunteer_status = 'accepted') as volunteer_count
             FROM campaigns c
@@ -118,10 +147,18 @@ def get_campaign(campaign_id):
                 "message": "Campaign not found"
             }), 404
         
-        return jsonify({
+        # Campaign + creator row versions and the counters from other tables.
+        # No Last-Modified: an accepted volunteer doesn't touch campaigns.updated_at
+        etag = make_etag('campaign', campaign_id, campaign.pop('updated_at'), campaign.pop('creator_updated_at'),
+                         campaign['current_amount'], campaign['donor_count'], campaign['volunteer_count'])
+        cached = not_modified(etag)
+        if cached:
+            return cached
+        
+        return conditional_json({
             "status": "success",
-            "data": campaign
-        }), 200
+            "data": attach_variants(campaign)
+        }, etag=etag)
     
     except Exception as e:
         return jsonify({
@@ -146,6 +183,7 @@ def create_campaign():
         print(f"Content-Type: {request.content_type}")
         print(f"Is JSON: {request.is_json}")
         
+        image_status = None
         # Get data from either JSON or form
         if request.is_json:
             data = request.json
@@ -178,14 +216,21 @@ def create_campaign():
             # Handle image upload
             if 'image' in request.files:
                 file = request.files['image']
+                # Streamed uploads are sniffed/size-checked while the request is parsed
+                rejected = upload_error(file) if file and file.filename else None
+                if rejected:
+                    message, status_code = UPLOAD_ERROR_RESPONSES[rejected]
+                    return jsonify({
+                        "status": "error",
+                        "message": message
+                    }), status_code
                 if file and file.filename and allowed_file(file.filename):
                     uploads = _ensure_uploads_dir()
-                    # Generate unique filename
-                    filename = f"{int(time.time())}_{secure_filename(file.filename)}"
-                    save_path = os.path.join(uploads, filename)
-                    file.save(save_path)
+                    # Content-addressed name (ab/cd/<sha256>.<ext>): identical uploads share one file
+                    filename, created = store_upload(file, uploads)
                     image_filename = filename
-                    print(f"  Image saved: {filename}")
+                    print(f"  Image saved: {filename}" + ("" if created else " (duplicate)"))
+                    image_status = _process_in_background(uploads, filename)
         
         print(f"Parsed Data:")
         print(f"  creator_id: {creator_id} (type: {type(creator_id).__name__})")
@@ -244,8 +289,7 @@ def create_campaign():
         cursor = db.cursor()
         
         # Verify creator exists
-        cursor.execute("SELECT id FROM users WHERE id = %s", (creator_id,))
-        user = cursor.fetchone()
+        user = get_user(db, creator_id)
         if not user:
             cursor.close()
             db.close()
@@ -263,9 +307,11 @@ def create_campaign():
             (creator_id, title, description, target_amount, category, location, contact, duration_days, need_volunteers, image, campaign_status)
             VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 'active')
         """, (creator_id, title, description, target_amount, category, location, contact, duration_days, need_volunteers, image_filename))
+        campaign_id = cursor.lastrowid
+        add_reference(cursor, image_filename, current_app.config.get('UPLOAD_FOLDER'))
         
         db.commit()
-        campaign_id = cursor.lastrowid
+        invalidate_campaign_listings()
         cursor.close()
         db.close()
         
@@ -275,7 +321,10 @@ def create_campaign():
         return jsonify({
             "status": "success",
             "message": "Campaign created successfully",
-            "campaign_id": campaign_id
+            "campaign_id": campaign_id,
+            "image": image_filename,
+            "image_variants": variant_urls(image_filename),
+            "image_status": image_status
         }), 201
     
     except Exception as e:
@@ -306,6 +355,7 @@ def update_campaign(campaign_id):
         
         data = {}
         image_filename = None
+        image_status = None
         
         # Handle data source (JSON vs Form)
         if request.is_json:
@@ -317,13 +367,20 @@ def update_campaign(campaign_id):
             # Handle Image Upload
             if 'image' in request.files:
                 file = request.files['image']
+                # Streamed uploads are sniffed/size-checked while the request is parsed
+                rejected = upload_error(file) if file and file.filename else None
+                if rejected:
+                    message, status_code = UPLOAD_ERROR_RESPONSES[rejected]
+                    return jsonify({
+                        "status": "error",
+                        "message": message
+                    }), status_code
                 if file and file.filename and allowed_file(file.filename):
                     uploads = _ensure_uploads_dir()
-                    filename = f"{int(time.time())}_{secure_filename(file.filename)}"
-                    save_path = os.path.join(uploads, filename)
-                    file.save(save_path)
+                    filename, created = store_upload(file, uploads)
                     image_filename = filename
-                    print(f"  New image saved: {filename}")
+                    print(f"  New image saved: {filename}" + ("" if created else " (duplicate)"))
+                    image_status = _process_in_background(uploads, filename)
 
         if not data and not image_filename:
             return jsonify({
@@ -337,7 +394,7 @@ def update_campaign(campaign_id):
         cursor = db.cursor()
         
         # Verify campaign exists
-        cursor.execute("SELECT * FROM campaigns WHERE id = %s", (campaign_id,))
+        cursor.execute("SELECT id, image FROM campaigns WHERE id = %s", (campaign_id,))
         campaign = cursor.fetchone()
         
         if not campaign:
@@ -387,14 +444,26 @@ def update_campaign(campaign_id):
         query = f"UPDATE campaigns SET {', '.join(updates)} WHERE id = %s"
         cursor.execute(query, values)
         
+        # Replaced image: move the reference from the old file to the new one
+        if image_filename and image_filename != campaign[1]:
+            release_reference(cursor, campaign[1])
+            add_reference(cursor, image_filename, current_app.config.get('UPLOAD_FOLDER'))
+        
         db.commit()
+        invalidate('campaign', campaign_id)
+        invalidate_campaign_listings()
         cursor.close()
         db.close()
         
-        return jsonify({
+        response = {
             "status": "success",
             "message": "Campaign updated successfully"
-        }), 200
+        }
+        if image_filename:
+            response["image"] = image_filename
+            response["image_variants"] = variant_urls(image_filename)
+            response["image_status"] = image_status
+        return jsonify(response), 200
     
     except Exception as e:
         print(f"EXCEPTION: {str(e)}")
@@ -414,6 +483,8 @@ def delete_campaign(campaign_id):
         db = get_db()
         cursor = db.cursor()
         
+        cursor.execute("SELECT image FROM campaigns WHERE id = %s", (campaign_id,))
+        row = cursor.fetchone()
         cursor.execute("DELETE FROM campaigns WHERE id = %s", (campaign_id,))
         
         if cursor.rowcount == 0:
@@ -422,7 +493,10 @@ def delete_campaign(campaign_id):
                 "message": "Campaign not found"
             }), 404
         
+        release_reference(cursor, row[0] if row else None)
         db.commit()
+        invalidate('campaign', campaign_id)
+        invalidate_campaign_listings()
         cursor.close()
         db.close()
         
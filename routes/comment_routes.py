@@ -1,20 +1,11 @@
 from flask import Blueprint, request, jsonify
+import mysql.connector
+from mysql.connector import errorcode
 from db import get_db
+from utils.entity_cache import get_post, get_user, invalidate
 
 comment_bp = Blueprint("comment", __name__)
 
-def _serialize_comment_row(row: dict) -> dict:
-    """Ensure JSON-safe values (e.g., datetime -> string)."""
-    if not row:
-        return row
-    out = dict(row)
-    for k in ("created_at", "updated_at"):
-        v = out.get(k)
-        if hasattr(v, "isoformat"):
-            out[k] = v.isoformat(sep=" ", timespec="seconds")
-    return out
-
-
 # GET COMMENTS FOR A POST
 @comment_bp.route("/<int:post_id>", methods=["GET"])
 def get_comments(post_id):
@@ -28,8 +19,7 @@ def get_comments(post_id):
         cursor = db.cursor(dictionary=True)
         
         # Verify post exists
-        cursor.execute("SELECT id FROM posts WHERE id = %s", (post_id,))
-        if not cursor.fetchone():
+        if not get_post(db, post_id):
             cursor.close()
             db.close()
             return jsonify({
@@ -53,7 +43,6 @@ def get_comments(post_id):
         """, (post_id, limit, offset))
         
         comments = cursor.fetchall()
-        comments = [_serialize_comment_row(c) for c in comments]
         cursor.close()
         db.close()
         
@@ -97,8 +86,7 @@ def add_comment():
         cursor = db.cursor()
         
         # Verify post exists
-        cursor.execute("SELECT id FROM posts WHERE id = %s", (post_id,))
-        if not cursor.fetchone():
+        if not get_post(db, post_id):
             cursor.close()
             db.close()
             return jsonify({
@@ -107,8 +95,7 @@ def add_comment():
             }), 404
         
         # Verify user exists
-        cursor.execute("SELECT id FROM users WHERE id = %s", (user_id,))
-        if not cursor.fetchone():
+        if not get_user(db, user_id):
             cursor.close()
             db.close()
             return jsonify({
@@ -116,10 +103,24 @@ def add_comment():
                 "message": "User not found"
             }), 404
         
-        cursor.execute("""
-            INSERT INTO comments (post_id, user_id, text)
-            VALUES (%s, %s, %s)
-        """, (post_id, user_id, text))
+        try:
+            cursor.execute("""
+                INSERT INTO comments (post_id, user_id, text)
+                VALUES (%s, %s, %s)
+            """, (post_id, user_id, text))
+        except mysql.connector.IntegrityError as e:
+            db.rollback()
+            cursor.close()
+            db.close()
+            if e.errno != errorcode.ER_NO_REFERENCED_ROW_2:
+                raise
+            # Post or user deleted after this worker cached it
+            invalidate('post', post_id)
+            invalidate('user', user_id)
+            return jsonify({
+                "status": "error",
+                "message": "Post or user not found"
+            }), 404
         
         db.commit()
         comment_id = cursor.lastrowid
@@ -142,7 +143,7 @@ def add_comment():
             "status": "success",
             "message": "Comment created successfully",
             "comment_id": comment_id,
-            "data": _serialize_comment_row(created) if created else None
+            "data": created
         }), 201
     
     except Exception as e:
@@ -1,5 +1,10 @@
 from flask import Blueprint, request, jsonify
+import mysql.connector
+from mysql.connector import errorcode
 from db import get_db
+from utils.entity_cache import get_campaign, get_user, invalidate
+from utils.listing_cache import record_campaign_donation
+from utils.notification_outbox import enqueue_notification, notify_outbox
 from datetime import datetime
 
 donation_bp = Blueprint("donation", __name__)
@@ -45,79 +50,77 @@ def create_donation():
                 "message": "Amount must be a valid number"
             }), 400
         
+        # Donor: entity cache, no query on a hit
         db = get_db()
-        cursor = db.cursor()
-        
-        # Verify campaign exists
-        cursor.execute("SELECT id, current_amount, target_amount FROM campaigns WHERE id = %s", (campaign_id,))
-        campaign = cursor.fetchone()
-        
-        if not campaign:
-            cursor.close()
-            db.close()
-            return jsonify({
-                "status": "error",
-                "message": "Campaign not found"
-            }), 404
-        
-        # Verify donor exists
-        cursor.execute("SELECT id, name FROM users WHERE id = %s", (donor_id,))
-        donor = cursor.fetchone()
-        
+        donor = get_user(db, donor_id)
         if not donor:
-            cursor.close()
             db.close()
             return jsonify({
                 "status": "error",
                 "message": "Donor not found"
             }), 404
         
-        # Check if transaction already exists
-        cursor.execute("""
-            SELECT id FROM donations WHERE transaction_id = %s
-        """, (transaction_id,))
-        
-        if cursor.fetchone():
-            cursor.close()
-            db.close()
-            return jsonify({
-                "status": "error",
-                "message": "Transaction already exists"
-            }), 400
-        
-        # Insert donation
-        cursor.execute("""
-            INSERT INTO donations (campaign_id, donor_id, amount, payment_method, transaction_id, is_anonymous, donation_status)
-            VALUES (%s, %s, %s, %s, %s, %s, 'completed')
-        """, (campaign_id, donor_id, amount, payment_method, transaction_id, is_anonymous))
-        
-        donation_id = cursor.lastrowid
-        
-        # Update campaign current_amount
-        new_current_amount = campaign[1] + amount
-        cursor.execute("""
-            UPDATE campaigns SET current_amount = %s WHERE id = %s
-        """, (new_current_amount, campaign_id))
-        
-        # Create notification for campaign creator
-        cursor.execute("""
-            SELECT creator_id FROM campaigns WHERE id = %s
-        """, (campaign_id,))
-        creator_result = cursor.fetchone()
-        
-        if creator_result:
-            creator_id = creator_result[0]
-            donor_name = "Anonymous" if is_anonymous else donor[1]
-            notification_message = f"{donor_name} donated Rp {amount:,.0f} to your campaign"
+        cursor = db.cursor()
+        try:
+            # Campaign + creator in one round trip (no lock: the amount is updated in SQL)
+            cursor.execute("SELECT id, creator_id, target_amount FROM campaigns WHERE id = %s", (campaign_id,))
+            campaign = cursor.fetchone()
+            if not campaign:
+                return jsonify({
+                    "status": "error",
+                    "message": "Campaign not found"
+                }), 404
+            creator_id, target_amount = campaign[1], campaign[2]
+            
+            # Duplicate transaction_id is rejected by the unique index
+            try:
+                cursor.execute("""
+                    INSERT INTO donations (campaign_id, donor_id, amount, payment_method, transaction_id, is_anonymous, donation_status)
+                    VALUES (%s, %s, %s, %s, %s, %s, 'completed')
+                """, (campaign_id, donor_id, amount, payment_method, transaction_id, is_anonymous))
+            except mysql.connector.IntegrityError as e:
+                db.rollback()
+                if e.errno == errorcode.ER_NO_REFERENCED_ROW_2:
+                    # Donor deleted after this worker cached it
+                    invalidate('user', donor_id)
+                    return jsonify({
+                        "status": "error",
+                        "message": "Donor not found"
+                    }), 404
+                if e.errno != errorcode.ER_DUP_ENTRY:
+                    raise
+                return jsonify({
+                    "status": "error",
+                    "message": "Transaction already exists"
+                }), 400
+            donation_id = cursor.lastrowid
+            
+            # Notification for campaign creator, queued in this transaction
+            # (before the UPDATE so the campaign row lock is held briefly)
+            donor_name = "Anonymous" if is_anonymous else donor['name']
+            enqueue_notification(
+                cursor, creator_id, 'donation', "New donation",
+                f"{donor_name} donated Rp {amount:,.0f} to your campaign",
+                related_id=campaign_id, related_type='campaign', dedup_key=f"donation:{donation_id}"
+            )
             
+            # Atomic increment: concurrent donations can't overwrite each other
             cursor.execute("""
-                INSERT INTO notifications (user_id, type, message, related_id, related_type)
-                VALUES (%s, 'donation', %s, %s, 'campaign')
-            """, (creator_id, notification_message, campaign_id))
+                UPDATE campaigns SET current_amount = current_amount + %s WHERE id = %s
+            """, (amount, campaign_id))
+            cursor.execute("SELECT current_amount FROM campaigns WHERE id = %s", (campaign_id,))
+            new_current_amount = cursor.fetchone()[0]
+            
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            cursor.close()
+            db.close()
         
-        db.commit()
-        cursor.close()
-        db.close()
+        record_campaign_donation(campaign_id, amount)
+        notify_outbox()
         
         return jsonify({
             "status": "success",
@@ -125,8 +128,8 @@ def create_donation():
             "donation_id": donation_id,
             "campaign_progress": {
                 "current": new_current_amount,
-                "target": campaign[2],
-                "percentage": (new_current_amount / campaign[2] * 100) if campaign[2] > 0 else 0
+                "target": target_amount,
+                "percentage": float(new_current_amount / target_amount * 100) if target_amount > 0 else 0
             }
         }), 201
     
@@ -150,8 +153,7 @@ def get_campaign_donations(campaign_id):
         cursor = db.cursor(dictionary=True)
         
         # Verify campaign exists
-        cursor.execute("SELECT id FROM campaigns WHERE id = %s", (campaign_id,))
-        if not cursor.fetchone():
+        if not get_campaign(db, campaign_id):
             cursor.close()
             db.close()
             return jsonify({
@@ -210,8 +212,7 @@ def get_donor_donations(donor_id):
         cursor = db.cursor(dictionary=True)
         
         # Verify donor exists
-        cursor.execute("SELECT id FROM users WHERE id = %s", (donor_id,))
-        if not cursor.fetchone():
+        if not get_user(db, donor_id):
             cursor.close()
             db.close()
             return jsonify({
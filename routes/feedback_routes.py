@@ -1,23 +1,12 @@
 from flask import Blueprint, request, jsonify
 from db import get_db
 from utils.sentiment_analyzer import analyze_feedback_sentiment
+from utils.entity_cache import get_user
 from datetime import datetime, timedelta
 from collections import defaultdict
 
 feedback_bp = Blueprint("feedback", __name__)
 
-def _serialize_feedback_row(row: dict) -> dict:
-    """Ensure JSON-safe values (e.g., datetime -> string)."""
-    if not row:
-        return row
-    out = dict(row)
-    for k in ("created_at", "updated_at"):
-        v = out.get(k)
-        if hasattr(v, "isoformat"):
-            out[k] = v.isoformat(sep=" ", timespec="seconds")
-    return out
-
-
 # CREATE FEEDBACK
 @feedback_bp.route("/", methods=["POST"])
 def submit_feedback():
@@ -62,8 +51,7 @@ def submit_feedback():
         cursor = db.cursor()
         
         # Verify user exists
-        cursor.execute("SELECT id FROM users WHERE id = %s", (user_id,))
-        if not cursor.fetchone():
+        if not get_user(db, user_id):
             cursor.close()
             db.close()
             return jsonify({
@@ -98,7 +86,7 @@ def submit_feedback():
             "status": "success",
             "message": "Feedback submitted successfully",
             "feedback_id": feedback_id,
-            "data": _serialize_feedback_row(created) if created else None
+            "data": created
         }), 201
     
     except Exception as e:
@@ -135,7 +123,6 @@ def get_all_feedback():
         """, (limit, offset))
         
         feedback_list = cursor.fetchall()
-        feedback_list = [_serialize_feedback_row(f) for f in feedback_list]
         cursor.close()
         db.close()
         
@@ -170,8 +157,7 @@ def get_user_feedback(user_id):
         cursor = db.cursor(dictionary=True)
         
         # Verify user exists
-        cursor.execute("SELECT id FROM users WHERE id = %s", (user_id,))
-        if not cursor.fetchone():
+        if not get_user(db, user_id):
             cursor.close()
             db.close()
             return jsonify({
@@ -195,7 +181,6 @@ def get_user_feedback(user_id):
         """, (user_id, limit, offset))
         
         feedback_list = cursor.fetchall()
-        feedback_list = [_serialize_feedback_row(f) for f in feedback_list]
         cursor.close()
         db.close()
         
@@ -245,7 +230,7 @@ def get_feedback_by_id(feedback_id):
         
         return jsonify({
             "status": "success",
-            "data": _serialize_feedback_row(feedback)
+            "data": feedback
         }), 200
     
     except Exception as e:
@@ -302,7 +287,7 @@ def get_feedback_stats():
         daily_trend = []
         for row in cursor.fetchall():
             daily_trend.append({
-                'date': row['date'].isoformat() if row['date'] else None,
+                'date': row['date'],
                 'count': row['count']
             })
         
@@ -381,7 +366,7 @@ def analyze_single_feedback(feedback_id):
                 "rating": feedback['rating'],
                 "category": feedback['category'],
                 "user_name": feedback['user_name'],
-                "created_at": feedback['created_at'].isoformat() if feedback['created_at'] else None
+                "created_at": feedback['created_at']
             },
             "sentiment": sentiment_result
         }), 200
@@ -432,7 +417,7 @@ def analyze_all_feedback():
                 'rating': fb['rating'],
                 'category': fb['category'],
                 'user_name': fb['user_name'],
-                'created_at': fb['created_at'].isoformat() if fb['created_at'] else None,
+                'created_at': fb['created_at'],
                 'sentiment': sentiment['sentiment'],
                 'confidence': sentiment['confidence'],
                 'score': sentiment['score']
@@ -612,7 +597,7 @@ def get_recent_feedback_with_sentiment():
                 'category': fb['category'],
                 'rating': fb['rating'],
                 'message': fb['message'],
-                'created_at': fb['created_at'].isoformat() if fb['created_at'] else None,
+                'created_at': fb['created_at'],
                 'sentiment': sentiment['sentiment'],
                 'sentiment_score': sentiment['score'],
                 'confidence': sentiment['confidence']
@@ -0,0 +1,197 @@
+import os
+from flask import Blueprint, Response, redirect, request, jsonify
+from db import get_db
+from utils.conditional import conditional_json, make_etag
+from utils.entity_cache import get_user
+from utils.notification_counters import get_unread_count, mark_all_read, mark_read
+from utils.notification_events import (
+    acquire_local_stream, get_hub, get_stream_mode, local_event_stream, release_local_stream
+)
+
+notification_bp = Blueprint("notifications", __name__)
+
+
+# GET NOTIFICATIONS FOR USER
+@notification_bp.route("/user/<int:user_id>", methods=["GET"])
+def get_user_notifications(user_id):
+    """Get notifications for a user (newest first)"""
+    try:
+        page = request.args.get('page', 1, type=int)
+        limit = request.args.get('limit', 20, type=int)
+        unread_only = request.args.get('unread_only', 'false').lower() in ('true', '1')
+        page = max(page, 1)
+        limit = min(max(limit, 1), 100)
+        offset = (page - 1) * limit
+
+        db = get_db()
+        cursor = db.cursor(dictionary=True)
+
+        # Both variants are served by the (user_id, is_read, created_at) index
+        where = "WHERE user_id = %s AND is_read = FALSE" if unread_only else "WHERE user_id = %s"
+        cursor.execute(f"""
+            SELECT id, title, message, notification_type, is_read, related_id, related_type, created_at
+            FROM notifications
+            {where}
+            ORDER BY created_at DESC, id DESC
+            LIMIT %s OFFSET %s
+        """, (user_id, limit, offset))
+        notifications = cursor.fetchall()
+        for n in notifications:
+            n['is_read'] = bool(n['is_read'])
+
+        cursor.close()
+        unread_count = get_unread_count(db, user_id)
+        db.close()
+
+        return jsonify({
+            "status": "success",
+            "data": notifications,
+            "unread_count": unread_count,
+            "pagination": {
+                "page": page,
+                "limit": limit
+            }
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            "status": "error",
+            "message": f"Failed to fetch notifications: {str(e)}"
+        }), 500
+
+
+# UNREAD BADGE
+@notification_bp.route("/user/<int:user_id>/unread-count", methods=["GET"])
+def get_user_unread_count(user_id):
+    """Unread notification count (one counter row; answers 304 while it is unchanged)"""
+    try:
+        db = get_db()
+        unread_count = get_unread_count(db, user_id)
+        db.close()
+
+        return conditional_json({
+            "status": "success",
+            "data": {"user_id": user_id, "unread_count": unread_count}
+        }, etag=make_etag('unread', user_id, unread_count), private=True)
+
+    except Exception as e:
+        return jsonify({
+            "status": "error",
+            "message": f"Failed to fetch unread count: {str(e)}"
+        }), 500
+
+
+# MARK ONE AS READ
+@notification_bp.route("/<int:notification_id>/read", methods=["PUT"])
+def mark_notification_read(notification_id):
+    """Mark a notification as read (user_id in the body restricts it to its owner)"""
+    try:
+        data = request.get_json(silent=True) or {}
+        user_id = data.get('user_id')
+
+        db = get_db()
+        found = mark_read(db, notification_id, user_id)
+        unread_count = get_unread_count(db, user_id) if found and user_id else None
+        db.close()
+
+        if not found:
+            return jsonify({
+                "status": "error",
+                "message": "Notification not found"
+            }), 404
+
+        return jsonify({
+            "status": "success",
+            "message": "Notification marked as read",
+            "unread_count": unread_count
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            "status": "error",
+            "message": f"Failed to mark notification as read: {str(e)}"
+        }), 500
+
+
+# MARK ALL AS READ
+@notification_bp.route("/user/<int:user_id>/read-all", methods=["PUT"])
+def mark_all_notifications_read(user_id):
+    """Mark every unread notification of a user as read in one statement"""
+    try:
+        db = get_db()
+        if not get_user(db, user_id):
+            db.close()
+            return jsonify({
+                "status": "error",
+                "message": "User not found"
+            }), 404
+
+        updated = mark_all_read(db, user_id)
+        db.close()
+
+        return jsonify({
+            "status": "success",
+            "message": "All notifications marked as read",
+            "updated": updated,
+            "unread_count": 0
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            "status": "error",
+            "message": f"Failed to mark notifications as read: {str(e)}"
+        }), 500
+
+
+# REAL-TIME STREAM (Server-Sent Events)
+@notification_bp.route("/stream", methods=["GET"])
+def stream_notifications():
+    """Push new notifications to the client (see utils/notification_events.py for the modes)"""
+    user_id = request.args.get('user_id', type=int)
+    if not user_id:
+        return jsonify({
+            "status": "error",
+            "message": "user_id is required"
+        }), 400
+
+    mode = get_stream_mode()
+    if mode == 'broker':
+        # Normally routed straight to notification_stream.py by the proxy
+        stream_url = os.getenv('NOTIFICATION_STREAM_URL')
+        if stream_url:
+            return redirect(f"{stream_url}?{request.query_string.decode()}", code=307)
+        return jsonify({
+            "status": "error",
+            "message": "Notification stream is served by notification_stream.py"
+        }), 503
+    if mode != 'local':
+        return jsonify({
+            "status": "error",
+            "message": "Notification stream is disabled"
+        }), 503
+
+    # Each local stream holds a worker thread: cap them, clients fall back to polling
+    if not acquire_local_stream():
+        response = jsonify({
+            "status": "error",
+            "message": "Too many open notification streams, poll unread-count instead"
+        })
+        response.headers['Retry-After'] = '30'
+        return response, 503
+
+    hub = get_hub()
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    subscription = hub.subscribe(user_id, last_event_id)
+
+    def cleanup():
+        hub.unsubscribe(subscription)
+        release_local_stream()
+
+    response = Response(
+        local_event_stream(subscription, float(os.getenv('NOTIFICATION_STREAM_MAX_LIFETIME', 300))),
+        mimetype='text/event-stream'
+    )
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    response.call_on_close(cleanup)
+    return response
@@ -1,8 +1,12 @@
 from flask import Blueprint, request, jsonify, current_app
 import os
-from werkzeug.utils import secure_filename
 from db import get_db
-import time
+from utils.image_variants import attach_variants, variant_urls
+from utils.image_jobs import enqueue_image_processing
+from utils.upload_storage import store_upload, add_reference, release_reference
+from utils.upload_stream import upload_error, UPLOAD_ERROR_RESPONSES
+from utils.conditional import make_etag, last_modified_of, not_modified, conditional_json
+from utils.entity_cache import invalidate
 
 post_bp = Blueprint("post", __name__)
 
@@ -21,6 +25,15 @@ def _ensure_uploads_dir():
     return uploads
 
 
+def _process_in_background(uploads, filename):
+    """Queue variant generation; if queueing fails they are generated on first request"""
+    try:
+        return enqueue_image_processing(uploads, filename)['status']
+    except Exception as e:
+        print(f"DEBUG: Failed to queue image processing for {filename}: {str(e)}")
+        return None
+
+
 # GET ALL POSTS
 @post_bp.route("/", methods=["GET"])
 def get_posts():
@@ -51,7 +64,7 @@ def get_posts():
             LIMIT %s OFFSET %s
         """, (limit, offset))
         
-        posts = cursor.fetchall()
+        posts = [attach_variants(post) for post in cursor.fetchall()]
         cursor.close()
         db.close()
         
@@ -83,7 +96,8 @@ def get_post(post_id):
         
         cursor.execute("""
             SELECT p.id, p.user_id, u.name as author_name, u.profile_photo,
-                   p.text, p.image, p.likes, p.created_at
+                   p.text, p.image, p.likes, p.created_at,
+                   p.updated_at, u.updated_at as author_updated_at
             FROM posts p
             JOIN users u ON p.user_id = u.id
             WHERE p.id = %s
@@ -99,10 +113,19 @@ def get_post(post_id):
                 "message": "Post not found"
             }), 404
         
-        return jsonify({
+        # Post row + author row versions (name / photo are part of the payload)
+        updated_at = post.pop('updated_at')
+        author_updated_at = post.pop('author_updated_at')
+        etag = make_etag('post', post_id, updated_at, post['likes'], author_updated_at)
+        last_modified = last_modified_of(updated_at, author_updated_at)
+        cached = not_modified(etag, last_modified)
+        if cached:
+            return cached
+        
+        return conditional_json({
             "status": "success",
-            "data": post
-        }), 200
+            "data": attach_variants(post)
+        }, etag=etag, last_modified=last_modified)
     
     except Exception as e:
         return jsonify({
@@ -121,6 +144,7 @@ def add_post():
     Form: user_id, text, image (file)
     """
     try:
+        image_status = None
         # Get data from either JSON or form
         if request.is_json:
             data = request.json
@@ -135,15 +159,22 @@ def add_post():
             # Handle image upload
             if 'image' in request.files:
                 file = request.files['image']
+                # Streamed uploads are sniffed/size-checked while the request is parsed
+                rejected = upload_error(file) if file and file.filename else None
+                if rejected:
+                    message, status_code = UPLOAD_ERROR_RESPONSES[rejected]
+                    return jsonify({
+                        "status": "error",
+                        "message": message
+                    }), status_code
                 if file and file.filename and allowed_file(file.filename):
                     try:
                         uploads = _ensure_uploads_dir()
-                        # Generate unique filename with timestamp to avoid conflicts
-                        filename = f"{int(time.time())}_{secure_filename(file.filename)}"
-                        save_path = os.path.join(uploads, filename)
-                        file.save(save_path)
+                        # Content-addressed name (ab/cd/<sha256>.<ext>): identical uploads share one file
+                        filename, created = store_upload(file, uploads)
                         image_filename = filename
-                        print(f"DEBUG: Image saved successfully: {filename}")
+                        print(f"DEBUG: Image saved successfully: {filename}" + ("" if created else " (duplicate)"))
+                        image_status = _process_in_background(uploads, filename)
                     except Exception as file_error:
                         print(f"DEBUG: Failed to save image: {str(file_error)}")
                         # Continue without image if save fails
@@ -165,9 +196,10 @@ def add_post():
             INSERT INTO posts (user_id, text, image)
             VALUES (%s, %s, %s)
         """, (user_id, content, image_filename))
+        post_id = cursor.lastrowid
+        add_reference(cursor, image_filename, current_app.config.get('UPLOAD_FOLDER'))
         
         db.commit()
-        post_id = cursor.lastrowid
         cursor.close()
         db.close()
         
@@ -177,7 +209,9 @@ def add_post():
             "status": "success",
             "message": "Post created successfully",
             "post_id": post_id,
-            "image": image_filename
+            "image": image_filename,
+            "image_variants": variant_urls(image_filename),
+            "image_status": image_status
         }), 201
     
     except Exception as e:
@@ -238,6 +272,8 @@ def delete_post(post_id):
         db = get_db()
         cursor = db.cursor()
         
+        cursor.execute("SELECT image FROM posts WHERE id = %s", (post_id,))
+        row = cursor.fetchone()
         cursor.execute("DELETE FROM posts WHERE id = %s", (post_id,))
         
         if cursor.rowcount == 0:
@@ -246,7 +282,9 @@ def delete_post(post_id):
                 "message": "Post not found"
             }), 404
         
+        release_reference(cursor, row[0] if row else None)
         db.commit()
+        invalidate('post', post_id)
         cursor.close()
         db.close()
         
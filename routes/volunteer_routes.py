@@ -1,5 +1,10 @@
 from flask import Blueprint, request, jsonify
+import mysql.connector
+from mysql.connector import errorcode
 from db import get_db
+from utils.entity_cache import get_campaign, get_user, invalidate
+from utils.listing_cache import record_campaign_volunteer
+from utils.notification_outbox import enqueue_notification, notify_outbox
 
 volunteer_bp = Blueprint("volunteer", __name__)
 
@@ -18,8 +23,7 @@ def get_campaign_volunteers(campaign_id):
         cursor = db.cursor(dictionary=True)
         
         # Verify campaign exists
-        cursor.execute("SELECT id FROM campaigns WHERE id = %s", (campaign_id,))
-        if not cursor.fetchone():
+        if not get_campaign(db, campaign_id):
             cursor.close()
             db.close()
             return jsonify({
@@ -96,8 +100,7 @@ def apply_volunteer():
         cursor = db.cursor()
         
         # Verify campaign exists
-        cursor.execute("SELECT id FROM campaigns WHERE id = %s", (campaign_id,))
-        if not cursor.fetchone():
+        if not get_campaign(db, campaign_id):
             cursor.close()
             db.close()
             return jsonify({
@@ -106,8 +109,7 @@ def apply_volunteer():
             }), 404
         
         # Verify user exists
-        cursor.execute("SELECT id FROM users WHERE id = %s", (user_id,))
-        if not cursor.fetchone():
+        if not get_user(db, user_id):
             cursor.close()
             db.close()
             return jsonify({
@@ -129,32 +131,44 @@ def apply_volunteer():
             }), 400
         
         # Insert volunteer application
-        cursor.execute("""
-            INSERT INTO volunteers (campaign_id, user_id, volunteer_status)
-            VALUES (%s, %s, 'applied')
-        """, (campaign_id, user_id))
+        try:
+            cursor.execute("""
+                INSERT INTO volunteers (campaign_id, user_id, volunteer_status)
+                VALUES (%s, %s, 'applied')
+            """, (campaign_id, user_id))
+        except mysql.connector.IntegrityError as e:
+            db.rollback()
+            cursor.close()
+            db.close()
+            if e.errno != errorcode.ER_NO_REFERENCED_ROW_2:
+                raise
+            # Campaign or user deleted after this worker cached it
+            invalidate('campaign', campaign_id)
+            invalidate('user', user_id)
+            return jsonify({
+                "status": "error",
+                "message": "Campaign or user not found"
+            }), 404
         
         volunteer_id = cursor.lastrowid
         
         # Create notification for campaign creator
-        cursor.execute("""
-            SELECT creator_id FROM campaigns WHERE id = %s
-        """, (campaign_id,))
-        creator_result = cursor.fetchone()
+        creator_result = get_campaign(db, campaign_id)
         
         if creator_result:
-            creator_id = creator_result[0]
-            cursor.execute("SELECT name FROM users WHERE id = %s", (user_id,))
-            user_result = cursor.fetchone()
-            user_name = user_result[0] if user_result else "Unknown"
+            creator_id = creator_result['creator_id']
+            user_result = get_user(db, user_id)
+            user_name = user_result['name'] if user_result else "Unknown"
             
-            notification_message = f"{user_name} applied as a volunteer for your campaign"
-            cursor.execute("""
-                INSERT INTO notifications (user_id, type, message, related_id, related_type)
-                VALUES (%s, 'volunteer_application', %s, %s, 'volunteer')
-            """, (creator_id, notification_message, volunteer_id))
+            enqueue_notification(
+                cursor, creator_id, 'volunteer_application', "New volunteer application",
+                f"{user_name} applied as a volunteer for your campaign",
+                related_id=volunteer_id, related_type='volunteer',
+                dedup_key=f"volunteer_application:{volunteer_id}"
+            )
         
         db.commit()
+        notify_outbox()
         cursor.close()
         db.close()
         
@@ -203,17 +217,18 @@ def accept_volunteer(volunteer_id):
         """, (volunteer_id,))
         
         # Create notification for volunteer
-        cursor.execute("SELECT title FROM campaigns WHERE id = %s", (campaign_id,))
-        campaign_result = cursor.fetchone()
-        campaign_title = campaign_result[0] if campaign_result else "Campaign"
+        campaign_result = get_campaign(db, campaign_id)
+        campaign_title = campaign_result['title'] if campaign_result else "Campaign"
         
-        notification_message = f"Your volunteer application for '{campaign_title}' was accepted"
-        cursor.execute("""
-            INSERT INTO notifications (user_id, type, message, related_id, related_type)
-            VALUES (%s, 'volunteer_accepted', %s, %s, 'volunteer')
-        """, (user_id, notification_message, volunteer_id))
+        enqueue_notification(
+            cursor, user_id, 'volunteer_accepted', "Volunteer application accepted",
+            f"Your volunteer application for '{campaign_title}' was accepted",
+            related_id=volunteer_id, related_type='volunteer', dedup_key=f"volunteer_accepted:{volunteer_id}"
+        )
         
         db.commit()
+        record_campaign_volunteer(campaign_id)
+        notify_outbox()
         cursor.close()
         db.close()
         
@@ -264,20 +279,20 @@ def reject_volunteer(volunteer_id):
         """, (volunteer_id,))
         
         # Create notification for volunteer
-        cursor.execute("SELECT title FROM campaigns WHERE id = %s", (campaign_id,))
-        campaign_result = cursor.fetchone()
-        campaign_title = campaign_result[0] if campaign_result else "Campaign"
+        campaign_result = get_campaign(db, campaign_id)
+        campaign_title = campaign_result['title'] if campaign_result else "Campaign"
         
         notification_message = f"Your volunteer application for '{campaign_title}' was declined"
         if rejection_reason:
             notification_message += f": {rejection_reason}"
         
-        cursor.execute("""
-            INSERT INTO notifications (user_id, type, message, related_id, related_type)
-            VALUES (%s, 'volunteer_rejected', %s, %s, 'volunteer')
-        """, (user_id, notification_message, volunteer_id))
+        enqueue_notification(
+            cursor, user_id, 'volunteer_rejected', "Volunteer application declined", notification_message,
+            related_id=volunteer_id, related_type='volunteer', dedup_key=f"volunteer_rejected:{volunteer_id}"
+        )
         
         db.commit()
+        notify_outbox()
         cursor.close()
         db.close()
         
@@ -302,8 +317,7 @@ def get_pending_applications(campaign_id):
         cursor = db.cursor(dictionary=True)
         
         # Verify campaign exists
-        cursor.execute("SELECT id FROM campaigns WHERE id = %s", (campaign_id,))
-        if not cursor.fetchone():
+        if not get_campaign(db, campaign_id):
             cursor.close()
             db.close()
             return jsonify({
@@ -352,8 +366,7 @@ def get_user_volunteers(user_id):
         cursor = db.cursor(dictionary=True)
         
         # Verify user exists
-        cursor.execute("SELECT id FROM users WHERE id = %s", (user_id,))
-        if not cursor.fetchone():
+        if not get_user(db, user_id):
             cursor.close()
             db.close()
             return jsonify({
@@ -5,18 +5,58 @@ from PIL import Image
 import numpy as np
 from io import BytesIO
 import base64
+import uuid
+import threading
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
+from utils.inference_batcher import InferenceBatcher
+from utils.image_hash import PerceptualHashCache, image_hashes
+from utils.upload_stream import upload_error, ERROR_TOO_LARGE
+from utils.conditional import make_etag, not_modified, conditional_json
+from utils.waste_class_map import class_category_map, normalize_class_name
 
-# Try to import ML dependencies
-try:
-    from tensorflow.keras.applications.mobilenet_v2 import MobileNetV2, preprocess_input, decode_predictions
-    from tensorflow.keras.preprocessing import image as keras_image
+# Mode inference:
+# - local: TensorFlow dimuat di dalam worker web ini
+# - pool:  inference dikirim ke ML service terpisah (python ml_service.py), worker web tidak import TensorFlow
+ML_MODE = os.getenv('WASTE_ML_MODE', 'local').lower()
+
+# Cek ketersediaan ML dependencies tanpa meng-import-nya:
+# TensorFlow baru di-import saat get_model() pertama kali dipanggil, sehingga boot worker tetap cepat
+if ML_MODE == 'pool':
+    from utils.ml_worker_pool import MLPoolClient
     ML_AVAILABLE = True
-except:
-    ML_AVAILABLE = False
-    print("⚠️ TensorFlow/Keras not available, using fallback detection")
+else:
+    ML_AVAILABLE = importlib.util.find_spec('tensorflow') is not None
+    if not ML_AVAILABLE:
+        print("⚠️ TensorFlow/Keras not available, using fallback detection")
 
 waste_detection_bp = Blueprint('waste_detection', __name__)
 
+ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'bmp'}
+
+# Batas jumlah gambar per request batch (field app: 10-30 foto per titik pengumpulan)
+BATCH_MAX_FILES = int(os.getenv('WASTE_BATCH_MAX_FILES', 30))
+
+# Thread pool untuk decode/resize gambar secara paralel (PIL melepas GIL saat decode)
+_preprocess_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv('WASTE_PREPROCESS_WORKERS', 4)),
+    thread_name_prefix='waste-preprocess'
+)
+
+# Dynamic batching lintas request: tensor dari request yang berjalan bersamaan
+# digabung menjadi satu panggilan model.predict
+DYNAMIC_BATCHING = os.getenv('WASTE_DYNAMIC_BATCHING', 'true').lower() in ('true', '1', 't')
+DYNAMIC_BATCH_MAX_SIZE = int(os.getenv('WASTE_BATCH_MAX_SIZE', 32))
+DYNAMIC_BATCH_MAX_WAIT_MS = float(os.getenv('WASTE_BATCH_MAX_WAIT_MS', 10))
+INFERENCE_TIMEOUT = float(os.getenv('WASTE_INFERENCE_TIMEOUT', 60))
+
+# Cache hasil deteksi berdasarkan perceptual hash (foto sama / hampir sama dilewati inference-nya)
+RESULT_CACHE_ENABLED = os.getenv('WASTE_CACHE_ENABLED', 'true').lower() in ('true', '1', 't')
+_result_cache = PerceptualHashCache(
+    max_entries=int(os.getenv('WASTE_CACHE_MAX_ENTRIES', 1024)),
+    max_distance=int(os.getenv('WASTE_CACHE_MAX_DISTANCE', 4))
+)
+
 # Klasifikasi sampah berdasarkan jenis
 WASTE_CATEGORIES = {
     'organik': {
@@ -69,62 +109,205 @@ WASTE_CATEGORIES = {
     }
 }
 
+# Kategori statis: ETag dihitung sekali, klien yang sudah punya salinannya dapat 304
+CATEGORIES_ETAG = make_etag('waste-categories', repr(WASTE_CATEGORIES))
+
+# Urutan kategori = urutan kolom pada lookup table
+CATEGORY_KEYS = list(WASTE_CATEGORIES.keys())
+
+# Skor kategori minimum agar hasil ML dipakai (di bawah ini -> fallback)
+ML_MIN_CATEGORY_SCORE = float(os.getenv('WASTE_ML_MIN_SCORE', 0.05))
+
 # Global model (lazy loading)
 _model = None
 
+# Lookup table ImageNet -> kategori sampah (dibangun sekali saat model load)
+_imagenet_labels = None      # np.array (1000,) nama kelas ImageNet
+_class_to_category = None    # np.array (1000,) index kategori, -1 = tidak terpetakan
+_category_matrix = None      # np.array (1000, n_kategori) one-hot float32
+
+def build_category_lookup(class_names):
+    """
+    Petakan kelas ImageNet ke kategori sampah lewat tabel kurasi (utils/waste_class_map.py)
+    Nama kelas dicocokkan utuh, bukan substring ('toucan' tidak ikut 'can')
+    Returns (class_to_category, category_matrix)
+    """
+    class_to_category = np.full(len(class_names), -1, dtype=np.int32)
+    category_by_class = class_category_map()
+    
+    for class_index, class_name in enumerate(class_names):
+        category = category_by_class.get(normalize_class_name(class_name))
+        if category is not None:
+            class_to_category[class_index] = CATEGORY_KEYS.index(category)
+    
+    category_matrix = np.zeros((len(class_names), len(CATEGORY_KEYS)), dtype=np.float32)
+    mapped = np.nonzero(class_to_category >= 0)[0]
+    category_matrix[mapped, class_to_category[mapped]] = 1.0
+    
+    return class_to_category, category_matrix
+
+def _load_category_lookup(labels):
+    """Bangun lookup table dari 1000 nama kelas ImageNet (urutan output model)"""
+    global _imagenet_labels, _class_to_category, _category_matrix
+    
+    _imagenet_labels = np.array(labels)
+    _class_to_category, _category_matrix = build_category_lookup(_imagenet_labels)
+    print(f"✅ Category lookup built: {int((_class_to_category >= 0).sum())}/1000 ImageNet classes mapped")
+
 def get_model():
-    """Load model once and reuse"""
+    """
+    Load model once and reuse
+    Backend dipilih lewat env WASTE_ML_BACKEND (keras | graph | tflite | tflite_int8)
+    Pada mode pool, yang dikembalikan adalah client ke ML service
+    """
     global _model
     if ML_AVAILABLE and _model is None:
         try:
-            _model = MobileNetV2(weights='imagenet', include_top=True)
-            print("✅ ML Model loaded successfully")
+            if ML_MODE == 'pool':
+                model = MLPoolClient()
+            else:
+                from utils.waste_backends import load_backend
+                model = load_backend()
+            _load_category_lookup(model.labels())
+            _model = model
+            print(f"✅ ML Model loaded successfully (backend: {_model.name})")
         except Exception as e:
             print(f"⚠️ Failed to load ML model: {e}")
-            _model = False
+            # Mode pool: ML service mungkin belum siap, coba lagi di request berikutnya
+            _model = None if ML_MODE == 'pool' else False
     return _model if ML_AVAILABLE and _model else None
 
-def predict_with_ml(img_path):
+def warmup_model_async():
+    """Muat model di background thread agar request pertama tidak menunggu import TensorFlow"""
+    if not ML_AVAILABLE:
+        return None
+    thread = threading.Thread(target=get_model, name='waste-model-warmup', daemon=True)
+    thread.start()
+    return thread
+
+# Global batcher (lazy loading)
+_batcher = None
+_batcher_lock = threading.Lock()
+
+def get_batcher():
+    """Create the shared inference batcher once per worker process"""
+    global _batcher
+    if _batcher is None:
+        model = get_model()
+        if model is None:
+            return None
+        with _batcher_lock:
+            if _batcher is None:
+                _batcher = InferenceBatcher(
+                    model.predict,
+                    max_batch_size=DYNAMIC_BATCH_MAX_SIZE,
+                    max_wait_ms=DYNAMIC_BATCH_MAX_WAIT_MS,
+                    name='waste-inference-batcher'
+                )
+    return _batcher
+
+def run_model(batch_arrays):
     """
-    Prediksi menggunakan MobileNetV2 + mapping ke kategori sampah
+    Jalankan MobileNetV2 untuk list array hasil preprocess
+    Lewat dynamic batcher jika aktif, atau langsung model.predict
     """
-    model = get_model()
-    if model is None:
+    if DYNAMIC_BATCHING:
+        batcher = get_batcher()
+        if batcher is not None:
+            futures = batcher.submit_many(batch_arrays)
+            return np.stack([f.result(timeout=INFERENCE_TIMEOUT) for f in futures])
+    
+    return get_model().predict(np.stack(batch_arrays))
+
+def load_image_array(img_path):
+    """
+    Load dan preprocess satu gambar menjadi array (224, 224, 3) untuk MobileNetV2
+    Setara keras load_img(target_size, nearest) + mobilenet_v2.preprocess_input,
+    tanpa perlu import TensorFlow di worker web
+    """
+    with Image.open(img_path) as img:
+        img = img.convert('RGB').resize((224, 224), Image.NEAREST)
+        img_array = np.asarray(img, dtype=np.float32)
+    return img_array / 127.5 - 1.0
+
+def _safe_load_image_array(img_path):
+    """Wrapper load_image_array yang mengembalikan None jika gambar gagal dibaca"""
+    try:
+        return load_image_array(img_path)
+    except Exception as e:
+        print(f"Error saat preprocess {img_path}: {e}")
         return None
+
+def score_predictions(predictions):
+    """
+    Agregasi seluruh 1000 probabilitas softmax per kategori sampah (vectorized)
+    predictions: np.array (N, 1000)
+    Returns list hasil per gambar, None jika skor kategori terbaik terlalu rendah
+    """
+    # (N, 1000) @ (1000, n_kategori) -> total probabilitas per kategori
+    category_scores = predictions @ _category_matrix
+    best_categories = category_scores.argmax(axis=1)
+    
+    # Objek terdeteksi = kelas dengan probabilitas tertinggi di dalam kategori pemenang
+    in_best_category = _class_to_category[np.newaxis, :] == best_categories[:, np.newaxis]
+    top_classes = np.where(in_best_category, predictions, -1.0).argmax(axis=1)
+    
+    results = []
+    for row, category_index in enumerate(best_categories):
+        confidence = float(category_scores[row, category_index])
+        if confidence < ML_MIN_CATEGORY_SCORE:
+            results.append(None)
+            continue
+        
+        results.append({
+            'category': CATEGORY_KEYS[category_index],
+            'confidence': confidence,
+            'detected_object': str(_imagenet_labels[top_classes[row]]),
+            'method': 'ml',
+            'category_scores': {
+                key: round(float(score), 4)
+                for key, score in zip(CATEGORY_KEYS, category_scores[row])
+            }
+        })
+    
+    return results
+
+def predict_batch_with_ml(img_paths):
+    """
+    Prediksi banyak gambar sekaligus dalam satu panggilan model.predict
+    Preprocessing dijalankan paralel; hasil dikembalikan sesuai urutan input
+    (None untuk gambar yang gagal diproses atau tidak cocok dengan kategori manapun)
+    Returns (results, ran): ran False jika model tidak tersedia atau inference gagal
+    (mis. timeout batcher / ML service), sehingga hasilnya tidak boleh di-cache
+    """
+    results = [None] * len(img_paths)
+    model = get_model()
+    if model is None or not img_paths:
+        return results, False
     
     try:
-        # Load dan preprocess gambar
-        img = keras_image.load_img(img_path, target_size=(224, 224))
-        img_array = keras_image.img_to_array(img)
-        img_array = np.expand_dims(img_array, axis=0)
-        img_array = preprocess_input(img_array)
+        arrays = list(_preprocess_executor.map(_safe_load_image_array, img_paths))
+        valid_indexes = [i for i, arr in enumerate(arrays) if arr is not None]
+        if not valid_indexes:
+            return results, True
         
-        # Prediksi
-        predictions = model.predict(img_array, verbose=0)
-        decoded = decode_predictions(predictions, top=5)[0]
+        predictions = run_model([arrays[i] for i in valid_indexes])
         
-        # Mapping prediksi ke kategori sampah
-        for pred in decoded:
-            class_name = pred[1].lower()
-            confidence = float(pred[2])
-            
-            # Cek setiap kategori sampah
-            for category, data in WASTE_CATEGORIES.items():
-                for keyword in data['keywords']:
-                    if keyword in class_name:
-                        return {
-                            'category': category,
-                            'confidence': confidence,
-                            'detected_object': pred[1],
-                            'method': 'ml'
-                        }
+        for i, result in zip(valid_indexes, score_predictions(predictions)):
+            results[i] = result
         
-        # Jika tidak match, kembalikan None untuk fallback
-        return None
+        return results, True
         
     except Exception as e:
-        print(f"Error dalam ML prediction: {e}")
-        return None
+        print(f"Error dalam ML batch prediction: {e}")
+        return results, False
+
+def predict_with_ml(img_path):
+    """
+    Prediksi menggunakan MobileNetV2 + mapping ke kategori sampah
+    """
+    results, _ = predict_batch_with_ml([img_path])
+    return results[0]
 
 def detect_waste_fallback(filename):
     """
@@ -169,6 +352,82 @@ def analyze_image_color(img_path):
     except:
         return {'r': 128, 'g': 128, 'b': 128}
 
+def _safe_image_hashes(img_path):
+    """Wrapper image_hashes yang mengembalikan None jika gambar gagal dibaca"""
+    try:
+        return image_hashes(img_path)
+    except Exception as e:
+        print(f"Error saat hashing {img_path}: {e}")
+        return None
+
+def analyze_images(img_paths):
+    """
+    Jalankan ML detection + analisis warna untuk banyak gambar
+    Gambar yang sama/hampir sama dengan yang pernah diproses diambil dari cache
+    Returns list (ml_result_or_None, color_analysis, cached) sesuai urutan input
+    """
+    outputs = [None] * len(img_paths)
+    keys = [None] * len(img_paths)
+    
+    if RESULT_CACHE_ENABLED:
+        keys = list(_preprocess_executor.map(_safe_image_hashes, img_paths))
+        for i, key in enumerate(keys):
+            if key is None:
+                continue
+            hit, cached = _result_cache.get(key)
+            if hit:
+                outputs[i] = (cached['result'], cached['color_analysis'], True)
+    
+    miss_indexes = [i for i, output in enumerate(outputs) if output is None]
+    miss_paths = [img_paths[i] for i in miss_indexes]
+    ml_results, inference_ran = predict_batch_with_ml(miss_paths)
+    color_results = list(_preprocess_executor.map(analyze_image_color, miss_paths))
+    
+    for i, result, color_analysis in zip(miss_indexes, ml_results, color_results):
+        outputs[i] = (result, color_analysis, False)
+        # Hanya simpan jika inference benar-benar berjalan (bukan ML tidak tersedia / timeout)
+        if keys[i] is not None and inference_ran:
+            _result_cache.put(keys[i], {'result': result, 'color_analysis': color_analysis})
+    
+    return outputs
+
+def allowed_file(filename):
+    """Check if file extension is allowed"""
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+
+def _upload_error_message(error):
+    """Pesan untuk upload yang ditolak saat streaming (utils/upload_stream.py)"""
+    if error == ERROR_TOO_LARGE:
+        max_mb = current_app.config.get('MAX_UPLOAD_FILE_SIZE', 0) / (1024 * 1024)
+        return f'Ukuran file terlalu besar (maksimal {max_mb:.0f}MB)'
+    return 'File bukan gambar yang valid. Gunakan: PNG, JPG, JPEG, GIF, BMP'
+
+def build_detection_payload(result, color_analysis):
+    """
+    Susun bagian detection/classification/color_analysis dari response
+    """
+    category_info = WASTE_CATEGORIES.get(result['category'], {})
+    
+    detection = {
+        'category': result['category'],
+        'confidence': result['confidence'],
+        'detected_object': result['detected_object'],
+        'method': result['method']
+    }
+    if 'category_scores' in result:
+        detection['category_scores'] = result['category_scores']
+    
+    return {
+        'detection': detection,
+        'classification': {
+            'bin_color': category_info.get('bin_color', ''),
+            'bin_code': category_info.get('bin_code', ''),
+            'description': category_info.get('description', ''),
+            'icon': category_info.get('icon', '')
+        },
+        'color_analysis': color_analysis
+    }
+
 @waste_detection_bp.route('/detect', methods=['POST'])
 def detect_waste():
     """
@@ -194,48 +453,38 @@ def detect_waste():
             }), 400
         
         # Cek tipe file
-        allowed_extensions = {'png', 'jpg', 'jpeg', 'gif', 'bmp'}
-        if not ('.' in file.filename and file.filename.rsplit('.', 1)[1].lower() in allowed_extensions):
+        if not allowed_file(file.filename):
             return jsonify({
                 'success': False,
                 'message': 'Format file tidak didukung. Gunakan: PNG, JPG, JPEG, GIF, BMP'
             }), 400
         
+        # Isi file sudah dicek (ukuran & magic bytes) saat request di-stream
+        rejected = upload_error(file)
+        if rejected:
+            return jsonify({
+                'success': False,
+                'message': _upload_error_message(rejected)
+            }), 413 if rejected == ERROR_TOO_LARGE else 400
+        
         # Save file temporarily
         filename = secure_filename(file.filename)
         os.makedirs(current_app.config['UPLOAD_FOLDER'], exist_ok=True)
         filepath = os.path.join(current_app.config['UPLOAD_FOLDER'], f"waste_{filename}")
         file.save(filepath)
         
-        # Coba ML detection terlebih dahulu
-        result = predict_with_ml(filepath)
+        # Coba ML detection terlebih dahulu (+ analisis warna), lewat cache perceptual hash
+        result, color_analysis, cached = analyze_images([filepath])[0]
         
         # Jika ML detection gagal, gunakan fallback
         if result is None:
             result = detect_waste_fallback(filename)
         
-        # Analisis warna
-        color_analysis = analyze_image_color(filepath)
-        
-        # Dapatkan informasi kategori
-        category_info = WASTE_CATEGORIES.get(result['category'], {})
-        
         # Construct response
         response = {
             'success': True,
-            'detection': {
-                'category': result['category'],
-                'confidence': result['confidence'],
-                'detected_object': result['detected_object'],
-                'method': result['method']
-            },
-            'classification': {
-                'bin_color': category_info.get('bin_color', ''),
-                'bin_code': category_info.get('bin_code', ''),
-                'description': category_info.get('description', ''),
-                'icon': category_info.get('icon', '')
-            },
-            'color_analysis': color_analysis,
+            'cached': cached,
+            **build_detection_payload(result, color_analysis),
             'file': {
                 'name': filename,
                 'path': f"/uploads/waste_{filename}"
@@ -257,11 +506,121 @@ def detect_waste():
             'message': f'Error: {str(e)}'
         }), 500
 
+@waste_detection_bp.route('/detect/batch', methods=['POST'])
+def detect_waste_batch():
+    """
+    Deteksi jenis sampah untuk banyak gambar sekaligus
+    Menerima: POST /api/waste/detect/batch
+    - Files: gambar sampah (form-data: files, boleh diulang)
+    - Returns: JSON dengan hasil per gambar, urutan sama dengan input
+    """
+    saved_paths = []
+    try:
+        files = request.files.getlist('files') or request.files.getlist('file')
+        
+        if not files:
+            return jsonify({
+                'success': False,
+                'message': 'Tidak ada file yang diunggah'
+            }), 400
+        
+        if len(files) > BATCH_MAX_FILES:
+            return jsonify({
+                'success': False,
+                'message': f'Maksimal {BATCH_MAX_FILES} file per request'
+            }), 400
+        
+        os.makedirs(current_app.config['UPLOAD_FOLDER'], exist_ok=True)
+        
+        # Validasi dan simpan setiap file; file yang tidak valid tetap dapat slot hasil
+        results = [None] * len(files)
+        filenames = [None] * len(files)
+        pending = []  # (index, filepath)
+        
+        for index, file in enumerate(files):
+            if not file or file.filename == '':
+                results[index] = {
+                    'index': index,
+                    'success': False,
+                    'message': 'File tidak dipilih'
+                }
+                continue
+            
+            if not allowed_file(file.filename):
+                results[index] = {
+                    'index': index,
+                    'success': False,
+                    'file': {'name': file.filename},
+                    'message': 'Format file tidak didukung. Gunakan: PNG, JPG, JPEG, GIF, BMP'
+                }
+                continue
+            
+            rejected = upload_error(file)
+            if rejected:
+                results[index] = {
+                    'index': index,
+                    'success': False,
+                    'file': {'name': file.filename},
+                    'message': _upload_error_message(rejected)
+                }
+                continue
+            
+            filename = secure_filename(file.filename)
+            filepath = os.path.join(
+                current_app.config['UPLOAD_FOLDER'],
+                f"waste_{uuid.uuid4().hex}_{filename}"
+            )
+            file.save(filepath)
+            saved_paths.append(filepath)
+            filenames[index] = filename
+            pending.append((index, filepath))
+        
+        # Satu panggilan model.predict untuk semua gambar valid yang tidak ada di cache
+        analyzed = analyze_images([path for _, path in pending])
+        
+        for (index, _), (result, color_analysis, cached) in zip(pending, analyzed):
+            if result is None:
+                result = detect_waste_fallback(filenames[index])
+            
+            results[index] = {
+                'index': index,
+                'success': True,
+                'cached': cached,
+                **build_detection_payload(result, color_analysis),
+                'file': {'name': filenames[index]}
+            }
+        
+        return jsonify({
+            'success': True,
+            'count': len(results),
+            'processed': len(pending),
+            'results': results
+        }), 200
+    
+    except Exception as e:
+        print(f"Error in detect_waste_batch: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': f'Error: {str(e)}'
+        }), 500
+    
+    finally:
+        # Clean up temporary files
+        for filepath in saved_paths:
+            try:
+                os.remove(filepath)
+            except:
+                pass
+
 @waste_detection_bp.route('/categories', methods=['GET'])
 def get_categories():
     """
     Get semua kategori sampah yang tersedia
     """
+    cached = not_modified(CATEGORIES_ETAG)
+    if cached:
+        return cached
+    
     try:
         categories_list = []
         for key, data in WASTE_CATEGORIES.items():
@@ -275,16 +634,43 @@ def get_categories():
                 'examples': data['examples']
             })
         
-        return jsonify({
+        return conditional_json({
             'success': True,
             'categories': categories_list
-        }), 200
+        }, etag=CATEGORIES_ETAG)
     except Exception as e:
         return jsonify({
             'success': False,
             'message': f'Error: {str(e)}'
         }), 500
 
+def _safe_pool_stats():
+    """Statistik ML service (mode pool saja)"""
+    if ML_MODE != 'pool' or not _model:
+        return None
+    try:
+        return _model.stats()
+    except Exception as e:
+        return {'error': str(e)}
+
+@waste_detection_bp.route('/metrics', methods=['GET'])
+def waste_metrics():
+    """
+    Get metrik inference (queue depth, ukuran batch) untuk worker ini
+    """
+    return jsonify({
+        'success': True,
+        'metrics': {
+            'ml_mode': ML_MODE,
+            'dynamic_batching': DYNAMIC_BATCHING,
+            'model_loaded': bool(_model),
+            'backend': _model.name if _model else None,
+            'batcher': _batcher.stats() if _batcher is not None else None,
+            'result_cache': _result_cache.stats() if RESULT_CACHE_ENABLED else None,
+            'ml_pool': _safe_pool_stats()
+        }
+    }), 200
+
 @waste_detection_bp.route('/info', methods=['GET'])
 def waste_info():
     """
@@ -299,9 +685,12 @@ def waste_info():
             'ml_available': ML_AVAILABLE,
             'supported_formats': ['PNG', 'JPG', 'JPEG', 'GIF', 'BMP'],
             'max_file_size': '16MB',
+            'max_batch_files': BATCH_MAX_FILES,
             'endpoints': {
                 'detect': 'POST /api/waste/detect',
+                'detect_batch': 'POST /api/waste/detect/batch',
                 'categories': 'GET /api/waste/categories',
+                'metrics': 'GET /api/waste/metrics',
                 'info': 'GET /api/waste/info'
             }
         }
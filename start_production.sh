@@ -68,7 +68,6 @@ echo ""
 gunicorn app:app \
     --config gunicorn_config.py \
     --workers 2 \
-    --worker-class sync \
     --timeout 120 \
     --bind 0.0.0.0:8000 \
     --access-logfile logs/access.log \
@@ -235,15 +235,51 @@ async function loadMonthlyStats() {
     }
 }
 
+// Cursor pagination for admin lists: each page continues after the previous one
+const ADMIN_LIST_LOADERS = {
+    users: 'loadUsers', posts: 'loadPosts', campaigns: 'loadCampaigns', donations: 'loadDonations',
+    comments: 'loadComments', volunteers: 'loadVolunteers', notifications: 'loadNotifications'
+};
+const adminListCursors = {};
+
+function adminListUrl(resource, append) {
+    const cursor = append ? adminListCursors[resource] : null;
+    return cursor
+        ? `${ADMIN_API_BASE}/${resource}?cursor=${encodeURIComponent(cursor)}`
+        : `${ADMIN_API_BASE}/${resource}`;
+}
+
+function renderListRows(tbody, resource, rowsHtml, pagination, append) {
+    const moreRow = tbody.querySelector('.load-more-row');
+    if (moreRow) moreRow.remove();
+    if (append) {
+        tbody.insertAdjacentHTML('beforeend', rowsHtml);
+    } else {
+        tbody.innerHTML = rowsHtml;
+    }
+
+    adminListCursors[resource] = pagination && pagination.has_more ? pagination.next_cursor : null;
+    if (adminListCursors[resource]) {
+        const columns = tbody.closest('table').querySelectorAll('thead th').length || 1;
+        tbody.insertAdjacentHTML('beforeend', `
+            <tr class="load-more-row">
+                <td colspan="${columns}" style="text-align: center;">
+                    <button class="btn btn-sm btn-secondary" onclick="${ADMIN_LIST_LOADERS[resource]}(true)">Muat lagi</button>
+                </td>
+            </tr>
+        `);
+    }
+}
+
 // Load users
-async function loadUsers() {
+async function loadUsers(append = false) {
     try {
-        const response = await fetch(`${ADMIN_API_BASE}/users`);
+        const response = await fetch(adminListUrl('users', append));
         const data = await response.json();
 
         const tbody = document.getElementById('usersTableBody');
         if (data.users && data.users.length > 0) {
-            tbody.innerHTML = data.users.map(user => `
+            renderListRows(tbody, 'users', data.users.map(user => `
                 <tr>
                     <td>${user.id}</td>
                     <td>${user.name}</td>
@@ -255,8 +291,8 @@ async function loadUsers() {
                         <button class="btn btn-sm btn-danger" onclick="deleteUser(${user.id})">Hapus</button>
                     </td>
                 </tr>
-            `).join('');
-        } else {
+            `).join(''), data.pagination, append);
+        } else if (!append) {
             tbody.innerHTML = '<tr><td colspan="6" class="loading">Tidak ada data pengguna</td></tr>';
         }
     } catch (error) {
@@ -266,14 +302,14 @@ async function loadUsers() {
 }
 
 // Load posts
-async function loadPosts() {
+async function loadPosts(append = false) {
     try {
-        const response = await fetch(`${ADMIN_API_BASE}/posts`);
+        const response = await fetch(adminListUrl('posts', append));
         const data = await response.json();
 
         const tbody = document.getElementById('postsTableBody');
         if (data.posts && data.posts.length > 0) {
-            tbody.innerHTML = data.posts.map(post => `
+            renderListRows(tbody, 'posts', data.posts.map(post => `
                 <tr>
                     <td>${post.id}</td>
                     <td>${post.user_name || 'Unknown'}</td>
@@ -285,8 +321,8 @@ async function loadPosts() {
                         <button class="btn btn-sm btn-danger" onclick="deletePost(${post.id})">Hapus</button>
                     </td>
                 </tr>
-            `).join('');
-        } else {
+            `).join(''), data.pagination, append);
+        } else if (!append) {
             tbody.innerHTML = '<tr><td colspan="6" class="loading">Tidak ada data postingan</td></tr>';
         }
     } catch (error) {
@@ -296,14 +332,14 @@ async function loadPosts() {
 }
 
 // Load campaigns
-async function loadCampaigns() {
+async function loadCampaigns(append = false) {
     try {
-        const response = await fetch(`${ADMIN_API_BASE}/campaigns`);
+        const response = await fetch(adminListUrl('campaigns', append));
         const data = await response.json();
 
         const tbody = document.getElementById('campaignsTableBody');
         if (data.campaigns && data.campaigns.length > 0) {
-            tbody.innerHTML = data.campaigns.map(campaign => `
+            renderListRows(tbody, 'campaigns', data.campaigns.map(campaign => `
                 <tr>
                     <td>${campaign.id}</td>
                     <td>${campaign.title}</td>
@@ -315,8 +351,8 @@ async function loadCampaigns() {
                         <button class="btn btn-sm btn-secondary" onclick="updateCampaignStatus(${campaign.id}, '${String(campaign.campaign_status || 'active').replace(/'/g, "\\'")}')">Update Status</button>
                     </td>
                 </tr>
-            `).join('');
-        } else {
+            `).join(''), data.pagination, append);
+        } else if (!append) {
             tbody.innerHTML = '<tr><td colspan="7" class="loading">Tidak ada data kampanye</td></tr>';
         }
     } catch (error) {
@@ -326,14 +362,14 @@ async function loadCampaigns() {
 }
 
 // Load donations
-async function loadDonations() {
+async function loadDonations(append = false) {
     try {
-        const response = await fetch(`${ADMIN_API_BASE}/donations`);
+        const response = await fetch(adminListUrl('donations', append));
         const data = await response.json();
 
         const tbody = document.getElementById('donationsTableBody');
         if (data.donations && data.donations.length > 0) {
-            tbody.innerHTML = data.donations.map(donation => `
+            renderListRows(tbody, 'donations', data.donations.map(donation => `
                 <tr>
                     <td>${donation.id}</td>
                     <td>${donation.user_name || 'Unknown'}</td>
@@ -345,8 +381,8 @@ async function loadDonations() {
                         <button class="btn btn-sm btn-secondary" onclick="updateDonationStatus(${donation.id}, '${String(donation.status || 'pending').replace(/'/g, "\\'")}')">Update Status</button>
                     </td>
                 </tr>
-            `).join('');
-        } else {
+            `).join(''), data.pagination, append);
+        } else if (!append) {
             tbody.innerHTML = '<tr><td colspan="7" class="loading">Tidak ada data donasi</td></tr>';
         }
     } catch (error) {
@@ -356,14 +392,14 @@ async function loadDonations() {
 }
 
 // Load comments
-async function loadComments() {
+async function loadComments(append = false) {
     try {
-        const response = await fetch(`${ADMIN_API_BASE}/comments`);
+        const response = await fetch(adminListUrl('comments', append));
         const data = await response.json();
 
         const tbody = document.getElementById('commentsTableBody');
         if (data.comments && data.comments.length > 0) {
-            tbody.innerHTML = data.comments.map(comment => `
+            renderListRows(tbody, 'comments', data.comments.map(comment => `
                 <tr>
                     <td>${comment.id}</td>
                     <td>${comment.post_id}</td>
@@ -374,8 +410,8 @@ async function loadComments() {
                         <button class="btn btn-sm btn-danger" onclick="deleteComment(${comment.id})">Hapus</button>
                     </td>
                 </tr>
-            `).join('');
-        } else {
+            `).join(''), data.pagination, append);
+        } else if (!append) {
             tbody.innerHTML = '<tr><td colspan="6" class="loading">Tidak ada data komentar</td></tr>';
         }
     } catch (error) {
@@ -385,14 +421,14 @@ async function loadComments() {
 }
 
 // Load volunteers
-async function loadVolunteers() {
+async function loadVolunteers(append = false) {
     try {
-        const response = await fetch(`${ADMIN_API_BASE}/volunteers`);
+        const response = await fetch(adminListUrl('volunteers', append));
         const data = await response.json();
 
         const tbody = document.getElementById('volunteersTableBody');
         if (data.volunteers && data.volunteers.length > 0) {
-            tbody.innerHTML = data.volunteers.map(v => `
+            renderListRows(tbody, 'volunteers', data.volunteers.map(v => `
                 <tr>
                     <td>${v.id}</td>
                     <td>${v.campaign_title || '-'}</td>
@@ -404,8 +440,8 @@ async function loadVolunteers() {
                         <button class="btn btn-sm btn-secondary" onclick="updateVolunteer(${v.id}, '${String(v.volunteer_status || 'applied').replace(/'/g, "\\'")}', ${Number(v.hours_contributed || 0)})">Update</button>
                     </td>
                 </tr>
-            `).join('');
-        } else {
+            `).join(''), data.pagination, append);
+        } else if (!append) {
             tbody.innerHTML = '<tr><td colspan="7" class="loading">Tidak ada data relawan</td></tr>';
         }
     } catch (error) {
@@ -415,14 +451,14 @@ async function loadVolunteers() {
 }
 
 // Load notifications
-async function loadNotifications() {
+async function loadNotifications(append = false) {
     try {
-        const response = await fetch(`${ADMIN_API_BASE}/notifications`);
+        const response = await fetch(adminListUrl('notifications', append));
         const data = await response.json();
 
         const tbody = document.getElementById('notificationsTableBody');
         if (data.notifications && data.notifications.length > 0) {
-            tbody.innerHTML = data.notifications.map(n => `
+            renderListRows(tbody, 'notifications', data.notifications.map(n => `
                 <tr>
                     <td>${n.id}</td>
                     <td>${n.user_name || 'Unknown'}</td>
@@ -434,8 +470,8 @@ async function loadNotifications() {
                         <button class="btn btn-sm btn-danger" onclick="deleteNotification(${n.id})">Hapus</button>
                     </td>
                 </tr>
-            `).join('');
-        } else {
+            `).join(''), data.pagination, append);
+        } else if (!append) {
             tbody.innerHTML = '<tr><td colspan="7" class="loading">Tidak ada data notifikasi</td></tr>';
         }
     } catch (error) {
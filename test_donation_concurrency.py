@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Concurrency test untuk donasi
+Fires parallel donations at one campaign and verifies:
+- current_amount grew by exactly the sum of accepted donations (no lost updates)
+- every accepted donation was stored once
+- re-sent transaction_ids are rejected (unique index), even when racing
+
+Usage:
+    python test_donation_concurrency.py
+    python test_donation_concurrency.py --campaign 1 --donor 2 --donations 100 --workers 20
+"""
+import argparse
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+import requests
+
+# Configuration
+BASE_URL = 'http://127.0.0.1:5000'
+CAMPAIGN_ID = 1  # Ganti dengan campaign ID yang valid
+DONOR_ID = 2     # Ganti dengan user ID yang valid
+
+# Colors for output
+GREEN = '\033[92m'
+RED = '\033[91m'
+YELLOW = '\033[93m'
+BLUE = '\033[94m'
+RESET = '\033[0m'
+
+
+def print_header(text):
+    print(f"\n{BLUE}{'='*60}{RESET}")
+    print(f"{BLUE}{text}{RESET}")
+    print(f"{BLUE}{'='*60}{RESET}")
+
+
+def print_success(text):
+    print(f"{GREEN}✅ {text}{RESET}")
+
+
+def print_error(text):
+    print(f"{RED}❌ {text}{RESET}")
+
+
+def print_info(text):
+    print(f"{YELLOW}ℹ️  {text}{RESET}")
+
+
+def get_campaign_state(campaign_id):
+    """(current_amount, donation count) read straight from the API"""
+    response = requests.get(f"{BASE_URL}/api/campaigns/{campaign_id}", timeout=10)
+    response.raise_for_status()
+    current = Decimal(str(response.json()['data']['current_amount']))
+
+    response = requests.get(f"{BASE_URL}/api/donations/campaign/{campaign_id}?limit=1", timeout=10)
+    response.raise_for_status()
+    return current, response.json()['pagination']['total']
+
+
+def donate(campaign_id, donor_id, amount, transaction_id):
+    started = time.perf_counter()
+    try:
+        response = requests.post(f"{BASE_URL}/api/donations/", json={
+            'campaign_id': campaign_id,
+            'donor_id': donor_id,
+            'amount': amount,
+            'payment_method': 'concurrency_test',
+            'transaction_id': transaction_id,
+            'is_anonymous': True,
+        }, timeout=30)
+        return response.status_code, amount, time.perf_counter() - started
+    except requests.RequestException as e:
+        print_error(f"{transaction_id}: {e}")
+        return None, amount, time.perf_counter() - started
+
+
+def test_parallel_donations(campaign_id, donor_id, count, workers):
+    """N different transactions in parallel: every one must be counted"""
+    print_header(f"TEST 1: {count} parallel donations ({workers} workers)")
+
+    before_amount, before_rows = get_campaign_state(campaign_id)
+    print_info(f"Before: current_amount={before_amount}, donations={before_rows}")
+
+    run_id = uuid.uuid4().hex[:8]
+    # Varying amounts so a lost update can't cancel out
+    jobs = [(campaign_id, donor_id, 1000 + i, f"conc-{run_id}-{i}") for i in range(count)]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(lambda job: donate(*job), jobs))
+
+    accepted = [amount for status, amount, _ in results if status == 201]
+    latencies = sorted(elapsed for _, _, elapsed in results)
+    print_info(f"Accepted: {len(accepted)}/{count}, "
+               f"p50 {latencies[len(latencies) // 2] * 1000:.0f} ms, "
+               f"p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:.0f} ms")
+
+    after_amount, after_rows = get_campaign_state(campaign_id)
+    expected_amount = before_amount + sum(Decimal(a) for a in accepted)
+    print_info(f"After:  current_amount={after_amount} (expected {expected_amount}), donations={after_rows}")
+
+    ok = True
+    if len(accepted) != count:
+        print_error(f"{count - len(accepted)} donation(s) failed")
+        ok = False
+    if after_amount != expected_amount:
+        print_error(f"Lost update: current_amount is off by {expected_amount - after_amount}")
+        ok = False
+    if after_rows - before_rows != len(accepted):
+        print_error(f"Stored {after_rows - before_rows} donation rows for {len(accepted)} accepted requests")
+        ok = False
+    if ok:
+        print_success("Totals match")
+    return ok
+
+
+def test_duplicate_transactions(campaign_id, donor_id, copies, workers):
+    """The same transaction_id sent concurrently: exactly one may succeed"""
+    print_header(f"TEST 2: same transaction_id sent {copies}x concurrently")
+
+    before_amount, before_rows = get_campaign_state(campaign_id)
+    transaction_id = f"dup-{uuid.uuid4().hex[:12]}"
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(lambda _: donate(campaign_id, donor_id, 5000, transaction_id), range(copies)))
+
+    statuses = [status for status, _, _ in results]
+    after_amount, after_rows = get_campaign_state(campaign_id)
+    print_info(f"Statuses: 201 x{statuses.count(201)}, 400 x{statuses.count(400)}, "
+               f"other x{len(statuses) - statuses.count(201) - statuses.count(400)}")
+
+    ok = statuses.count(201) == 1 and statuses.count(400) == copies - 1 \
+        and after_amount - before_amount == Decimal(5000) and after_rows - before_rows == 1
+    if ok:
+        print_success("Duplicate transaction rejected, amount counted once")
+    else:
+        print_error(f"Amount delta {after_amount - before_amount}, rows delta {after_rows - before_rows}")
+    return ok
+
+
+def main():
+    """Run all tests"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--campaign', type=int, default=CAMPAIGN_ID)
+    parser.add_argument('--donor', type=int, default=DONOR_ID)
+    parser.add_argument('--donations', type=int, default=50)
+    parser.add_argument('--workers', type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{BLUE}╔═══════════════════════════════════════════════════════════╗{RESET}")
+    print(f"{BLUE}║       RUANG HIJAU - DONATION CONCURRENCY TEST             ║{RESET}")
+    print(f"{BLUE}╚═══════════════════════════════════════════════════════════╝{RESET}")
+    print(f"Base URL: {BASE_URL}")
+    print(f"Campaign ID: {args.campaign}, Donor ID: {args.donor}")
+    print_info("Creates real donation rows - run against a test database")
+
+    results = [
+        ("Parallel Donations", test_parallel_donations(args.campaign, args.donor, args.donations, args.workers)),
+        ("Duplicate Transactions", test_duplicate_transactions(args.campaign, args.donor, args.workers, args.workers)),
+    ]
+
+    # Summary
+    print_header("TEST SUMMARY")
+    passed = sum(1 for _, result in results if result)
+    for test_name, result in results:
+        status = f"{GREEN}PASS{RESET}" if result else f"{RED}FAIL{RESET}"
+        print(f"  {status} - {test_name}")
+    print(f"\nTotal: {passed}/{len(results)} tests passed")
+    return 0 if passed == len(results) else 1
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Test script untuk lookup ImageNet class -> kategori sampah
+Tidak butuh server / TensorFlow: cukup jalankan `python test_waste_categories.py`
+"""
+import numpy as np
+
+from routes.waste_detection_routes import CATEGORY_KEYS, build_category_lookup
+
+# Kelas yang dulu ikut terpetakan lewat substring keyword ('can', 'bag', 'box', ...)
+UNRELATED_CLASSES = [
+    'toucan', 'pelican', 'American_alligator', 'African_elephant', 'candle', 'canoe',
+    'boxer', 'jellyfish', 'power plant', 'leafhopper', 'wire-haired_fox_terrier',
+]
+
+EXPECTED = {
+    'water_bottle': 'anorganik',
+    'plastic bag': 'anorganik',
+    'bagel': 'organik',
+    'banana': 'organik',
+    'carton': 'kertas',
+    'beer_bottle': 'kaca',
+    'milk_can': 'logam',
+    'table_lamp': 'b3',
+}
+
+
+def _categories(class_names):
+    class_to_category, category_matrix = build_category_lookup(class_names)
+    assert category_matrix.shape == (len(class_names), len(CATEGORY_KEYS))
+    assert np.array_equal(category_matrix.sum(axis=1), (class_to_category >= 0).astype(np.float32))
+    return [CATEGORY_KEYS[i] if i >= 0 else None for i in class_to_category]
+
+
+def test_unrelated_classes_unmapped():
+    """Nama kelas yang hanya mengandung keyword sebagai substring tidak dipetakan"""
+    categories = _categories(UNRELATED_CLASSES)
+    for class_name, category in zip(UNRELATED_CLASSES, categories):
+        assert category is None, f"{class_name} -> {category}"
+
+
+def test_known_classes_mapped():
+    """Kelas sampah dikenali dengan atau tanpa underscore"""
+    categories = _categories(list(EXPECTED))
+    for (class_name, expected), category in zip(EXPECTED.items(), categories):
+        assert category == expected, f"{class_name} -> {category} (expected {expected})"
+
+
+if __name__ == '__main__':
+    for test in (test_unrelated_classes_unmapped, test_known_classes_mapped):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test script untuk waste detection endpoints
+Tests: single detect, batch detect (urutan hasil + file tidak valid)
+"""
+import requests
+import json
+from io import BytesIO
+from PIL import Image
+
+BASE_URL = 'http://127.0.0.1:5000'
+
+
+def make_image(color=(40, 160, 40), fmt='PNG'):
+    """Create an in-memory test image"""
+    buffer = BytesIO()
+    Image.new('RGB', (64, 64), color).save(buffer, fmt)
+    buffer.seek(0)
+    return buffer
+
+
+def test_detect_single():
+    """Test single image detection"""
+    print("\n" + "=" * 60)
+    print("[TEST 1] Detect - Single Image")
+    print("=" * 60)
+
+    try:
+        res = requests.post(
+            f'{BASE_URL}/api/waste/detect',
+            files={'file': ('botol_kaca.png', make_image(), 'image/png')}
+        )
+        print(f"Status Code: {res.status_code}")
+        print(f"Response: {json.dumps(res.json(), indent=2)}")
+
+        if res.status_code == 200 and res.json().get('success'):
+            print("✅ Single detection OK")
+            return True
+        print(f"❌ Failed with status {res.status_code}")
+        return False
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return False
+
+
+def test_detect_batch():
+    """Test batch detection returns results in input order"""
+    print("\n" + "=" * 60)
+    print("[TEST 2] Detect - Batch")
+    print("=" * 60)
+
+    files = [
+        ('files', ('kaleng.png', make_image((150, 150, 150)), 'image/png')),
+        ('files', ('catatan.txt', BytesIO(b'bukan gambar'), 'text/plain')),
+        ('files', ('daun.jpg', make_image((20, 200, 20), 'JPEG'), 'image/jpeg')),
+    ]
+
+    try:
+        res = requests.post(f'{BASE_URL}/api/waste/detect/batch', files=files)
+        print(f"Status Code: {res.status_code}")
+        body = res.json()
+        print(f"Response: {json.dumps(body, indent=2)}")
+
+        if res.status_code != 200:
+            print(f"❌ Failed with status {res.status_code}")
+            return False
+
+        results = body.get('results', [])
+        ok = (
+            len(results) == 3
+            and [r['index'] for r in results] == [0, 1, 2]
+            and results[0]['success'] and not results[1]['success'] and results[2]['success']
+        )
+        if ok:
+            print("✅ Batch results returned in order")
+        else:
+            print("❌ Unexpected batch results")
+        return ok
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return False
+
+
+def run_all_tests():
+    """Run all waste detection tests"""
+    results = {
+        'detect_single': test_detect_single(),
+        'detect_batch': test_detect_batch(),
+    }
+
+    print("\n" + "=" * 60)
+    print("SUMMARY")
+    print("=" * 60)
+    for name, passed in results.items():
+        print(f"{'✅' if passed else '❌'} {name}")
+
+    return all(results.values())
+
+
+if __name__ == '__main__':
+    run_all_tests()
@@ -1,2 +1,3 @@
 # Utils package
 from .sentiment_analyzer import SentimentAnalyzer, analyze_sentiment, analyze_feedback_sentiment
+from .inference_batcher import InferenceBatcher
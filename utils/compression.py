@@ -0,0 +1,118 @@
+"""
+Response Compression Module
+Compresses API / HTML responses with brotli or gzip, negotiated through
+Accept-Encoding. Only text-like content types above a size threshold are
+compressed; file responses from /uploads (images are already compressed,
+and send_file bodies are streamed) are left untouched.
+
+Brotli needs the optional ``Brotli`` package; without it only gzip is offered.
+
+Enabled with ``init_compression(app)``.
+"""
+
+import gzip
+import os
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+DEFAULT_MIMETYPES = (
+    'application/json',
+    'application/javascript',
+    'text/html',
+    'text/css',
+    'text/javascript',
+    'text/plain',
+    'text/csv',
+    'image/svg+xml',
+)
+
+SKIP_PREFIXES = ('/uploads/',)
+
+
+def _env_bool(name: str, default: str) -> bool:
+    return os.getenv(name, default).lower() in ('true', '1', 't', 'yes')
+
+
+class Compressor:
+    """after_request hook: compress eligible responses in place"""
+
+    def __init__(self, min_size=1024, gzip_level=6, brotli_quality=4, mimetypes=DEFAULT_MIMETYPES):
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.mimetypes = frozenset(mimetypes)
+        self.encodings = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+    def choose_encoding(self, accept_encodings):
+        """Best supported encoding the client accepts (server preference on ties), else None"""
+        best, best_q = None, 0
+        for encoding in self.encodings:
+            q = accept_encodings[encoding]
+            if q > best_q:
+                best, best_q = encoding, q
+        return best
+
+    def compress(self, data: bytes, encoding: str) -> bytes:
+        if encoding == 'br':
+            return brotli.compress(data, quality=self.brotli_quality)
+        # mtime=0: identical bodies give identical bytes
+        return gzip.compress(data, compresslevel=self.gzip_level, mtime=0)
+
+    def __call__(self, response):
+        if response.mimetype not in self.mimetypes or request.path.startswith(SKIP_PREFIXES):
+            return response
+        response.vary.add('Accept-Encoding')
+
+        if (response.status_code < 200 or response.status_code in (204, 206, 304)
+                or response.direct_passthrough or response.is_streamed
+                or 'Content-Encoding' in response.headers
+                or response.cache_control.no_transform):
+            return response
+
+        encoding = self.choose_encoding(request.accept_encodings)
+        if encoding is None:
+            return response
+
+        data = response.get_data()
+        if len(data) < self.min_size:
+            return response
+
+        compressed = self.compress(data, encoding)
+        if len(compressed) >= len(data):
+            return response
+
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        # The encoded body is a different representation: weaken a strong ETag
+        # so If-None-Match (weak comparison) still matches the identity ETag
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+
+def init_compression(app):
+    """
+    Register the compression hook from env:
+    COMPRESSION_ENABLED, COMPRESSION_MIN_SIZE, COMPRESSION_GZIP_LEVEL,
+    COMPRESSION_BROTLI_QUALITY, COMPRESSION_MIMETYPES (comma separated)
+    """
+    if not _env_bool('COMPRESSION_ENABLED', 'true'):
+        return None
+
+    mimetypes = os.getenv('COMPRESSION_MIMETYPES')
+    compressor = Compressor(
+        min_size=int(os.getenv('COMPRESSION_MIN_SIZE', 1024)),
+        gzip_level=int(os.getenv('COMPRESSION_GZIP_LEVEL', 6)),
+        brotli_quality=int(os.getenv('COMPRESSION_BROTLI_QUALITY', 4)),
+        mimetypes=[m.strip() for m in mimetypes.split(',') if m.strip()] if mimetypes else DEFAULT_MIMETYPES,
+    )
+    app.after_request(compressor)
+    print(f"✅ Response compression enabled ({', '.join(compressor.encodings)}, "
+          f"min {compressor.min_size} bytes)")
+    return compressor
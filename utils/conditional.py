@@ -0,0 +1,71 @@
+"""
+Conditional GET Module
+ETag / Last-Modified handling for read endpoints that clients poll.
+
+Two ways to get a validator:
+- row versions (updated_at, counters) that the route already selected:
+  ``not_modified(etag, last_modified)`` answers 304 before the payload is
+  built or serialized
+- a hash of the serialized payload (lists and other derived data):
+  ``conditional_json(payload)`` still builds the body but skips sending it
+
+Responses get ``Cache-Control: no-cache`` so clients always revalidate.
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from typing import Optional
+
+from flask import current_app, jsonify, request
+from werkzeug.http import is_resource_modified
+
+
+def make_etag(*parts) -> str:
+    """Stable ETag from row versions, e.g. make_etag('post', id, updated_at, likes)"""
+    raw = '|'.join('' if part is None else str(part) for part in parts)
+    return hashlib.blake2b(raw.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def last_modified_of(*timestamps) -> Optional[datetime]:
+    """Latest of the given DB timestamps as aware UTC (naive values are server local time)"""
+    values = [ts for ts in timestamps if isinstance(ts, datetime)]
+    if not values:
+        return None
+    return max(ts.astimezone(timezone.utc) for ts in values).replace(microsecond=0)
+
+
+def _set_validators(response, etag, last_modified, private):
+    if etag:
+        response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified
+    response.cache_control.no_cache = True
+    if private:
+        response.cache_control.private = True
+    else:
+        response.cache_control.public = True
+    return response
+
+
+def not_modified(etag: str = None, last_modified: datetime = None, private: bool = False):
+    """304 response if the client's copy is current, else None (caller builds the payload)"""
+    if request.method not in ('GET', 'HEAD') or not (etag or last_modified):
+        return None
+    if is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        return None
+    response = current_app.response_class(status=304, mimetype='application/json')
+    return _set_validators(response, etag, last_modified, private)
+
+
+def conditional_json(payload, etag: str = None, last_modified: datetime = None,
+                     private: bool = False, status: int = 200):
+    """
+    jsonify(payload) with validators; answers 304 when they match.
+    Without an etag, the ETag is a hash of the serialized body.
+    """
+    response = jsonify(payload)
+    response.status_code = status
+    if etag is None:
+        etag = hashlib.blake2b(response.get_data(), digest_size=16).hexdigest()
+    _set_validators(response, etag, last_modified, private)
+    return response.make_conditional(request)
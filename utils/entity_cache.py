@@ -0,0 +1,363 @@
+"""
+Entity Cache Module
+Read-through cache for primary-key lookups of users, campaigns and posts
+(the existence checks every comment / donation / volunteer write runs).
+
+Only stable columns are cached (id, name, creator_id, title, user_id) -
+never counters or amounts. Misses are not cached, so a freshly created
+row is visible immediately. Routes that update or delete a row call
+``invalidate(kind, id)``.
+
+Two levels:
+- per-process LRU with a TTL (ENTITY_CACHE_TTL, ENTITY_CACHE_MAX_ENTRIES)
+- optional SQLite file shared by all workers on the host
+  (ENTITY_CACHE_SHARED_PATH, e.g. /dev/shm/ruang_hijau_cache.sqlite3).
+  Invalidations delete from it immediately; other workers' local copies
+  expire after ENTITY_CACHE_TTL, so keep that short when it is enabled.
+
+Every invalidation bumps a generation (per process, and in the shared
+store). A load that read its row before an invalidation doesn't store the
+result, so a deleted row can't be written back after it was dropped.
+Inserts that rely on a cached existence check still handle the foreign
+key error for rows another worker deleted.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+# kind -> primary-key lookup; the selected columns are what gets cached
+ENTITY_QUERIES = {
+    'user': "SELECT id, name FROM users WHERE id = %s",
+    'campaign': "SELECT id, creator_id, title FROM campaigns WHERE id = %s",
+    'post': "SELECT id, user_id FROM posts WHERE id = %s",
+}
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire ``ttl`` seconds after being stored"""
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 60):
+        self.max_entries = max(1, int(max_entries))
+        self.ttl = float(ttl)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Metrics
+        self._hits = 0
+        self._misses = 0
+        self._expired = 0
+        self._evictions = 0
+
+    def get(self, key: str):
+        """Return (hit, value)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return True, value
+                del self._entries[key]
+                self._expired += 1
+            self._misses += 1
+            return False, None
+
+    def put(self, key: str, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def delete_prefix(self, prefix: str):
+        with self._lock:
+            for key in [k for k in self._entries if k.startswith(prefix)]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'hits': self._hits,
+                'misses': self._misses,
+                'expired': self._expired,
+                'evictions': self._evictions,
+                'hit_rate': round(self._hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+class SharedStore:
+    """
+    Key/value store in a local SQLite file, shared by every worker process.
+    Failures are logged once and treated as misses: the cache is optional.
+    """
+
+    def __init__(self, path: str, ttl: float = 300):
+        self.path = path
+        self.ttl = float(ttl)
+        self._local = threading.local()
+        self._warned = False
+        self._hits = 0
+        self._misses = 0
+        self._errors = 0
+        conn = self._conn()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS entity_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS entity_cache_meta (
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            )
+        """)
+        conn.execute("INSERT OR IGNORE INTO entity_cache_meta (name, value) VALUES ('generation', 0)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=1, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            self._local.conn = conn
+        return conn
+
+    def _failed(self, e: Exception):
+        self._errors += 1
+        if not self._warned:
+            print(f"⚠️ Shared entity cache unavailable ({self.path}): {e}")
+            self._warned = True
+
+    def get(self, key: str):
+        try:
+            row = self._conn().execute(
+                "SELECT value FROM entity_cache WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        except sqlite3.Error as e:
+            self._failed(e)
+            return False, None
+        if row is None:
+            self._misses += 1
+            return False, None
+        self._hits += 1
+        return True, json.loads(row[0])
+
+    def generation(self) -> Optional[int]:
+        """Invalidation counter shared by all workers; None if the store is unavailable"""
+        try:
+            row = self._conn().execute("SELECT value FROM entity_cache_meta WHERE name = 'generation'").fetchone()
+        except sqlite3.Error as e:
+            self._failed(e)
+            return None
+        return row[0] if row else None
+
+    def put(self, key: str, value, generation: int):
+        """Store unless an invalidation happened since generation() was read (one atomic statement)"""
+        try:
+            self._conn().execute("""
+                INSERT OR REPLACE INTO entity_cache (key, value, expires_at)
+                SELECT ?, ?, ? WHERE (SELECT value FROM entity_cache_meta WHERE name = 'generation') = ?
+            """, (key, json.dumps(value, default=str), time.time() + self.ttl, generation))
+        except sqlite3.Error as e:
+            self._failed(e)
+
+    def _bump_generation(self):
+        # Before the delete: a load that passes the check in put() lands before it and is deleted
+        self._conn().execute("UPDATE entity_cache_meta SET value = value + 1 WHERE name = 'generation'")
+
+    def delete(self, key: str):
+        try:
+            self._bump_generation()
+            self._conn().execute("DELETE FROM entity_cache WHERE key = ?", (key,))
+        except sqlite3.Error as e:
+            self._failed(e)
+
+    def delete_prefix(self, prefix: str):
+        try:
+            self._bump_generation()
+            self._conn().execute("DELETE FROM entity_cache WHERE key >= ? AND key < ?",
+                                 (prefix, prefix + '\uffff'))
+        except sqlite3.Error as e:
+            self._failed(e)
+
+    def purge_expired(self):
+        try:
+            self._conn().execute("DELETE FROM entity_cache WHERE expires_at <= ?", (time.time(),))
+        except sqlite3.Error as e:
+            self._failed(e)
+
+    def stats(self) -> Dict:
+        lookups = self._hits + self._misses
+        return {
+            'path': self.path,
+            'ttl': self.ttl,
+            'hits': self._hits,
+            'misses': self._misses,
+            'errors': self._errors,
+            'hit_rate': round(self._hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class EntityCache:
+    """Read-through cache of ENTITY_QUERIES rows keyed by '<kind>:<id>'"""
+
+    def __init__(self, local: TTLCache, shared: Optional[SharedStore] = None):
+        self.local = local
+        self.shared = shared
+        self._loads = 0
+        self._invalidations = 0
+        self._stale_loads = 0
+        self._puts_since_purge = 0
+        # Bumped by invalidate(); checked before storing a value read earlier
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def _put_local(self, key: str, value, generation: int) -> bool:
+        with self._lock:
+            if generation != self._generation:
+                self._stale_loads += 1
+                return False
+            self.local.put(key, value)
+            return True
+
+    @staticmethod
+    def _key(kind: str, entity_id) -> str:
+        return f"{kind}:{int(entity_id)}"
+
+    def get(self, db, kind: str, entity_id) -> Optional[Dict]:
+        """Cached row as a dict, loading it with ``db`` on a miss; None if it doesn't exist"""
+        try:
+            key = self._key(kind, entity_id)
+        except (TypeError, ValueError):
+            return None
+
+        hit, value = self.local.get(key)
+        if hit:
+            return value
+        generation = self._generation
+        if self.shared is not None:
+            hit, value = self.shared.get(key)
+            if hit:
+                self._put_local(key, value, generation)
+                return value
+            shared_generation = self.shared.generation()
+
+        cursor = db.cursor(dictionary=True, buffered=True)
+        try:
+            cursor.execute(ENTITY_QUERIES[kind], (int(entity_id),))
+            value = cursor.fetchone()
+        finally:
+            cursor.close()
+        self._loads += 1
+        if value is None:
+            return None  # misses aren't cached: the row may be created any moment
+
+        if self.shared is not None and self.shared.generation() != shared_generation:
+            # Another worker invalidated meanwhile
+            self._stale_loads += 1
+            return value
+        if not self._put_local(key, value, generation):
+            return value  # invalidated while loading: use it for this request only
+        if self.shared is not None and shared_generation is not None:
+            self.shared.put(key, value, shared_generation)
+            self._puts_since_purge += 1
+            if self._puts_since_purge >= 1000:
+                self._puts_since_purge = 0
+                self.shared.purge_expired()
+        return value
+
+    def invalidate(self, kind: str, entity_id=None):
+        """Drop one cached row, or every row of a kind when entity_id is None"""
+        if entity_id is None:
+            prefix = f"{kind}:"
+            with self._lock:
+                self._invalidations += 1
+                self._generation += 1
+                self.local.delete_prefix(prefix)
+            if self.shared is not None:
+                self.shared.delete_prefix(prefix)
+            return
+        try:
+            key = self._key(kind, entity_id)
+        except (TypeError, ValueError):
+            return
+        with self._lock:
+            self._invalidations += 1
+            self._generation += 1
+            self.local.delete(key)
+        if self.shared is not None:
+            self.shared.delete(key)
+
+    def stats(self) -> Dict:
+        return {
+            'local': self.local.stats(),
+            'shared': self.shared.stats() if self.shared is not None else None,
+            'db_loads': self._loads,
+            'invalidations': self._invalidations,
+            'stale_loads': self._stale_loads,
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_entity_cache() -> EntityCache:
+    """Process-wide cache configured from ENTITY_CACHE_* env vars"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                local = TTLCache(
+                    max_entries=int(os.getenv('ENTITY_CACHE_MAX_ENTRIES', 10000)),
+                    ttl=float(os.getenv('ENTITY_CACHE_TTL', 30)),
+                )
+                shared = None
+                shared_path = os.getenv('ENTITY_CACHE_SHARED_PATH', '').strip()
+                if shared_path:
+                    try:
+                        shared = SharedStore(shared_path, ttl=float(os.getenv('ENTITY_CACHE_SHARED_TTL', 300)))
+                    except sqlite3.Error as e:
+                        print(f"⚠️ Shared entity cache disabled ({shared_path}): {e}")
+                _cache = EntityCache(local, shared)
+    return _cache
+
+
+def get_user(db, user_id) -> Optional[Dict]:
+    """{'id', 'name'} or None"""
+    return get_entity_cache().get(db, 'user', user_id)
+
+
+def get_campaign(db, campaign_id) -> Optional[Dict]:
+    """{'id', 'creator_id', 'title'} or None"""
+    return get_entity_cache().get(db, 'campaign', campaign_id)
+
+
+def get_post(db, post_id) -> Optional[Dict]:
+    """{'id', 'user_id'} or None"""
+    return get_entity_cache().get(db, 'post', post_id)
+
+
+def invalidate(kind: str, entity_id=None):
+    get_entity_cache().invalidate(kind, entity_id)
@@ -0,0 +1,137 @@
+"""
+Perceptual Image Hashing Module
+aHash / dHash fingerprints and an LRU cache that matches near-duplicate
+images by Hamming distance
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from PIL import Image
+
+HASH_SIZE = 8  # 8x8 -> 64-bit hashes
+
+
+def _grayscale_thumbnail(img: Image.Image, size: Tuple[int, int]) -> Image.Image:
+    # draft() lets the JPEG decoder downscale while decoding (much cheaper than full decode)
+    img.draft('L', (size[0] * 4, size[1] * 4))
+    return img.convert('L').resize(size, Image.BILINEAR)
+
+
+def average_hash(img: Image.Image, hash_size: int = HASH_SIZE) -> int:
+    """aHash: one bit per pixel, set when brighter than the thumbnail mean"""
+    pixels = list(_grayscale_thumbnail(img, (hash_size, hash_size)).getdata())
+    mean = sum(pixels) / len(pixels)
+    value = 0
+    for pixel in pixels:
+        value = (value << 1) | (1 if pixel > mean else 0)
+    return value
+
+
+def difference_hash(img: Image.Image, hash_size: int = HASH_SIZE) -> int:
+    """dHash: one bit per horizontal gradient sign between neighbouring pixels"""
+    thumb = _grayscale_thumbnail(img, (hash_size + 1, hash_size))
+    pixels = list(thumb.getdata())
+    width = hash_size + 1
+    value = 0
+    for row in range(hash_size):
+        offset = row * width
+        for col in range(hash_size):
+            value = (value << 1) | (1 if pixels[offset + col] > pixels[offset + col + 1] else 0)
+    return value
+
+
+def image_hashes(img_path: str) -> Tuple[int, int]:
+    """Return (dhash, ahash) for an image file, decoding it only once"""
+    with Image.open(img_path) as img:
+        img.draft('L', (HASH_SIZE * 8, HASH_SIZE * 8))
+        gray = img.convert('L')
+    return difference_hash(gray), average_hash(gray)
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+class PerceptualHashCache:
+    """
+    LRU cache keyed by (dHash, aHash).
+
+    A lookup hits when an entry exists whose dHash and aHash are both within
+    ``max_distance`` bits of the query. Exact matches are checked first via
+    the dict; near matches fall back to a scan over the (bounded) entries.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_distance: int = 4):
+        self.max_entries = max(1, int(max_entries))
+        self.max_distance = max(0, int(max_distance))
+        self._entries: "OrderedDict[Tuple[int, int], object]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Metrics
+        self._exact_hits = 0
+        self._near_hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def _find_near(self, key: Tuple[int, int]) -> Optional[Tuple[int, int]]:
+        dhash, ahash = key
+        best_key, best_distance = None, None
+        for candidate in self._entries:
+            d_distance = hamming_distance(dhash, candidate[0])
+            if d_distance > self.max_distance:
+                continue
+            a_distance = hamming_distance(ahash, candidate[1])
+            if a_distance > self.max_distance:
+                continue
+            distance = d_distance + a_distance
+            if best_distance is None or distance < best_distance:
+                best_key, best_distance = candidate, distance
+        return best_key
+
+    def get(self, key: Tuple[int, int]):
+        """Return (hit, value) for the closest stored image within the threshold"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._exact_hits += 1
+                return True, self._entries[key]
+
+            if self.max_distance > 0:
+                near_key = self._find_near(key)
+                if near_key is not None:
+                    self._entries.move_to_end(near_key)
+                    self._near_hits += 1
+                    return True, self._entries[near_key]
+
+            self._misses += 1
+            return False, None
+
+    def put(self, key: Tuple[int, int], value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            hits = self._exact_hits + self._near_hits
+            lookups = hits + self._misses
+            return {
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'max_distance': self.max_distance,
+                'hits': hits,
+                'exact_hits': self._exact_hits,
+                'near_hits': self._near_hits,
+                'misses': self._misses,
+                'evictions': self._evictions,
+                'hit_rate': round(hits / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,235 @@
+"""
+Background Image Processing Module
+Takes post-upload work (variant generation, re-encoding) off the request
+path: upload endpoints store the raw bytes durably (utils/upload_storage.py),
+enqueue a job and return immediately.
+
+Jobs run on a small pool of daemon threads inside each web worker. Failed
+jobs are retried with exponential backoff; per-image status is kept in a
+bounded in-memory history. Anything lost on restart is still covered by
+lazy variant generation in GET /uploads/<variant>/<file>.
+"""
+
+import heapq
+import itertools
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+from utils.image_variants import VARIANTS, FORMATS, generate_variants, variant_name
+
+STATUS_PENDING = 'pending'
+STATUS_PROCESSING = 'processing'
+STATUS_RETRYING = 'retrying'
+STATUS_DONE = 'done'
+STATUS_FAILED = 'failed'
+
+
+def variants_ready(upload_dir: str, filename: str) -> bool:
+    return all(
+        os.path.exists(os.path.join(upload_dir, variant_name(filename, variant, fmt)))
+        for variant in VARIANTS for fmt in FORMATS
+    )
+
+
+class ImageJobQueue:
+    """
+    Thread-pool job queue with retry.
+
+    ``process_fn(upload_dir, filename)`` is called for each job; an
+    exception schedules a retry after ``retry_delay * 2**(attempt-1)``
+    seconds until ``max_attempts`` is reached.
+    """
+
+    def __init__(self, process_fn: Callable, num_workers: int = 2, max_attempts: int = 3,
+                 retry_delay: float = 2.0, history_size: int = 1000, name: str = 'image-jobs'):
+        self.process_fn = process_fn
+        self.num_workers = max(1, int(num_workers))
+        self.max_attempts = max(1, int(max_attempts))
+        self.retry_delay = max(0.0, float(retry_delay))
+        self.history_size = max(1, int(history_size))
+        self.name = name
+
+        # Heap of (run_at, seq, filename); seq keeps ordering stable
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._jobs: "OrderedDict[str, Dict]" = OrderedDict()
+        self._stopped = False
+
+        # Metrics
+        self._completed = 0
+        self._failed = 0
+        self._retries = 0
+        self._total_process_time = 0.0
+
+        self._threads = [
+            threading.Thread(target=self._run, name=f'{name}-{i}', daemon=True)
+            for i in range(self.num_workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def enqueue(self, upload_dir: str, filename: str) -> Dict:
+        """Queue an image for processing and return a copy of its job record"""
+        now = time.time()
+        with self._cond:
+            if self._stopped:
+                raise RuntimeError(f"{self.name} sudah dihentikan")
+            job = {
+                'filename': filename,
+                'upload_dir': upload_dir,
+                'status': STATUS_PENDING,
+                'attempts': 0,
+                'error': None,
+                'created_at': now,
+                'updated_at': now,
+            }
+            self._jobs[filename] = job
+            self._jobs.move_to_end(filename)
+            self._trim_history()
+            heapq.heappush(self._heap, (now, next(self._seq), filename))
+            self._cond.notify()
+            return self._public(job)
+
+    def status(self, filename: str) -> Optional[Dict]:
+        with self._cond:
+            job = self._jobs.get(filename)
+            return self._public(job) if job else None
+
+    def _public(self, job: Dict) -> Dict:
+        return {key: value for key, value in job.items() if key != 'upload_dir'}
+
+    def _trim_history(self):
+        # Only finished jobs are evicted; queued ones must stay addressable
+        while len(self._jobs) > self.history_size:
+            for filename, job in self._jobs.items():
+                if job['status'] in (STATUS_DONE, STATUS_FAILED):
+                    del self._jobs[filename]
+                    break
+            else:
+                return
+
+    def _next_job(self) -> Optional[Dict]:
+        with self._cond:
+            while True:
+                if self._stopped:
+                    return None
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                run_at, _, filename = self._heap[0]
+                delay = run_at - time.time()
+                if delay > 0:
+                    self._cond.wait(timeout=delay)
+                    continue
+                heapq.heappop(self._heap)
+                job = self._jobs.get(filename)
+                if job is None or job['status'] not in (STATUS_PENDING, STATUS_RETRYING):
+                    continue
+                job['status'] = STATUS_PROCESSING
+                job['attempts'] += 1
+                job['updated_at'] = time.time()
+                return job
+
+    def _run(self):
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+
+            started = time.perf_counter()
+            try:
+                self.process_fn(job['upload_dir'], job['filename'])
+                error = None
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+            elapsed = time.perf_counter() - started
+
+            with self._cond:
+                self._total_process_time += elapsed
+                job['updated_at'] = time.time()
+                if error is None:
+                    job['status'] = STATUS_DONE
+                    job['error'] = None
+                    self._completed += 1
+                elif job['attempts'] < self.max_attempts:
+                    job['status'] = STATUS_RETRYING
+                    job['error'] = error
+                    self._retries += 1
+                    run_at = time.time() + self.retry_delay * (2 ** (job['attempts'] - 1))
+                    heapq.heappush(self._heap, (run_at, next(self._seq), job['filename']))
+                    self._cond.notify()
+                else:
+                    job['status'] = STATUS_FAILED
+                    job['error'] = error
+                    self._failed += 1
+                    print(f"⚠️ Image job failed for {job['filename']} after {job['attempts']} attempts: {error}")
+
+    def stats(self) -> Dict:
+        with self._cond:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job['status']] = counts.get(job['status'], 0) + 1
+            processed = self._completed + self._failed + self._retries
+            return {
+                'workers': self.num_workers,
+                'queue_depth': len(self._heap),
+                'jobs_by_status': counts,
+                'completed': self._completed,
+                'failed': self._failed,
+                'retries': self._retries,
+                'avg_process_ms': round(self._total_process_time / processed * 1000, 2) if processed else 0.0,
+            }
+
+    def shutdown(self, timeout: float = 5.0):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+
+
+# Created on first use so gunicorn workers start their threads after fork
+_image_queue = None
+_image_queue_lock = threading.Lock()
+
+
+def get_image_queue() -> ImageJobQueue:
+    global _image_queue
+    if _image_queue is None:
+        with _image_queue_lock:
+            if _image_queue is None:
+                _image_queue = ImageJobQueue(
+                    generate_variants,
+                    num_workers=int(os.getenv('IMAGE_JOB_WORKERS', 2)),
+                    max_attempts=int(os.getenv('IMAGE_JOB_MAX_ATTEMPTS', 3)),
+                    retry_delay=float(os.getenv('IMAGE_JOB_RETRY_DELAY', 2)),
+                    history_size=int(os.getenv('IMAGE_JOB_HISTORY', 1000)),
+                )
+    return _image_queue
+
+
+def enqueue_image_processing(upload_dir: str, filename: str) -> Dict:
+    """Queue variant generation for a freshly saved upload"""
+    return get_image_queue().enqueue(upload_dir, filename)
+
+
+def image_status(upload_dir: str, filename: str) -> Optional[Dict]:
+    """
+    Job status for an upload. Jobs handled by another worker (or before a
+    restart) aren't in this process's history, so fall back to the files on disk.
+    """
+    if _image_queue is not None:
+        job = _image_queue.status(filename)
+        if job:
+            return job
+    if variants_ready(upload_dir, filename):
+        status = STATUS_DONE
+    elif os.path.isfile(os.path.join(upload_dir, filename)):
+        status = STATUS_PENDING
+    else:
+        return None
+    return {'filename': filename, 'status': status}
@@ -0,0 +1,154 @@
+"""
+Image Variants Module
+Resized copies of uploaded images (thumb / medium / large) in WebP with a
+JPEG fallback, so feeds don't download multi-megabyte originals.
+
+Layout (inside the uploads folder):
+    <filename>                        original upload
+    <variant>/<filename>.webp         e.g. thumb/1712345678_foto.png.webp
+    <variant>/<filename>.jpg          e.g. thumb/1712345678_foto.png.jpg
+
+Variants are generated right after upload and, for older uploads, lazily
+on the first request for them.
+"""
+
+import os
+import threading
+from typing import Dict, Optional
+
+from PIL import Image, ImageOps, features
+
+# Longest side in pixels; images are never upscaled
+VARIANTS = {
+    'thumb': int(os.getenv('IMAGE_VARIANT_THUMB', 320)),
+    'medium': int(os.getenv('IMAGE_VARIANT_MEDIUM', 640)),
+    'large': int(os.getenv('IMAGE_VARIANT_LARGE', 1280)),
+}
+
+WEBP_AVAILABLE = features.check('webp')
+FORMATS = ('webp', 'jpg') if WEBP_AVAILABLE else ('jpg',)
+
+WEBP_QUALITY = int(os.getenv('IMAGE_VARIANT_WEBP_QUALITY', 80))
+JPEG_QUALITY = int(os.getenv('IMAGE_VARIANT_JPEG_QUALITY', 82))
+
+MIMETYPES = {'webp': 'image/webp', 'jpg': 'image/jpeg'}
+
+# One lock per output file so concurrent first requests don't all resize it
+_locks: Dict[str, threading.Lock] = {}
+_locks_guard = threading.Lock()
+
+
+def _lock_for(path: str) -> threading.Lock:
+    with _locks_guard:
+        return _locks.setdefault(path, threading.Lock())
+
+
+def variant_name(filename: str, variant: str, fmt: str) -> str:
+    """Relative path of a variant inside the uploads folder"""
+    return f"{variant}/{filename}.{fmt}"
+
+
+def original_name(variant_filename: str) -> Optional[str]:
+    """Map 'foto.png.webp' back to 'foto.png'; None if not a variant name"""
+    base, _, fmt = variant_filename.rpartition('.')
+    if not base or fmt not in FORMATS:
+        return None
+    return base
+
+
+def variant_urls(filename: Optional[str]) -> Optional[Dict[str, Dict[str, str]]]:
+    """
+    Variant paths for API responses, relative to /uploads/:
+    {'thumb': {'webp': 'thumb/x.jpg.webp', 'jpg': 'thumb/x.jpg.jpg'}, ...}
+    """
+    if not filename:
+        return None
+    return {
+        variant: {fmt: variant_name(filename, variant, fmt) for fmt in FORMATS}
+        for variant in VARIANTS
+    }
+
+
+def attach_variants(row: Optional[dict], field: str = 'image') -> Optional[dict]:
+    """Add '<field>_variants' to a DB row dict that has an image filename"""
+    if row is not None:
+        row[f'{field}_variants'] = variant_urls(row.get(field))
+    return row
+
+
+def _save(img: Image.Image, path: str, fmt: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Unique across worker processes (thread idents repeat between forked workers)
+    tmp_path = f"{path}.{os.getpid()}_{os.urandom(4).hex()}.tmp"
+    try:
+        if fmt == 'webp':
+            img.save(tmp_path, 'WEBP', quality=WEBP_QUALITY, method=4)
+        else:
+            if img.mode != 'RGB':
+                # JPEG has no alpha: flatten onto white instead of black
+                background = Image.new('RGB', img.size, (255, 255, 255))
+                background.paste(img, mask=img.getchannel('A') if 'A' in img.getbands() else None)
+                img = background
+            img.save(tmp_path, 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _load_resized(original_path: str, max_side: int) -> Image.Image:
+    with Image.open(original_path) as img:
+        # Let the JPEG decoder downscale while decoding when possible
+        img.draft('RGB', (max_side, max_side))
+        img = ImageOps.exif_transpose(img)
+        img = img.convert('RGBA' if 'A' in img.getbands() or img.mode == 'P' else 'RGB')
+    img.thumbnail((max_side, max_side), Image.LANCZOS)
+    return img
+
+
+def generate_variants(upload_dir: str, filename: str, overwrite: bool = False) -> Dict[str, Dict[str, str]]:
+    """Create every variant/format of an uploaded image; returns variant_urls()"""
+    original_path = os.path.join(upload_dir, filename)
+    source = None
+    # Largest first: decode once, then derive each smaller size from the previous one
+    for variant, max_side in sorted(VARIANTS.items(), key=lambda item: item[1], reverse=True):
+        targets = [
+            (fmt, os.path.join(upload_dir, variant_name(filename, variant, fmt)))
+            for fmt in FORMATS
+        ]
+        if not overwrite and all(os.path.exists(path) for _, path in targets):
+            continue
+        if source is None:
+            source = _load_resized(original_path, max_side)
+        else:
+            source.thumbnail((max_side, max_side), Image.LANCZOS)
+        for fmt, path in targets:
+            if overwrite or not os.path.exists(path):
+                _save(source, path, fmt)
+    return variant_urls(filename)
+
+
+def ensure_variant(upload_dir: str, variant: str, filename: str, fmt: str) -> Optional[str]:
+    """
+    Return the path of one variant, generating it on first request.
+    None when the variant/format is unknown or the original doesn't exist.
+    """
+    if variant not in VARIANTS or fmt not in FORMATS:
+        return None
+
+    path = os.path.join(upload_dir, variant_name(filename, variant, fmt))
+    if os.path.exists(path):
+        return path
+
+    original_path = os.path.join(upload_dir, filename)
+    if not os.path.isfile(original_path):
+        return None
+
+    try:
+        with _lock_for(path):
+            if not os.path.exists(path):
+                _save(_load_resized(original_path, VARIANTS[variant]), path, fmt)
+    finally:
+        with _locks_guard:
+            _locks.pop(path, None)
+    return path
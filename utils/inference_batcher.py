@@ -0,0 +1,156 @@
+"""
+Dynamic Batching Module for ML Inference
+Collects single inputs from concurrent callers into one batched model call
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, Dict, List
+
+import numpy as np
+
+
+class InferenceBatcher:
+    """
+    Queue-based dynamic batcher.
+
+    Callers submit preprocessed tensors and get a Future back. A single
+    background thread drains the queue, groups up to ``max_batch_size``
+    items (or whatever arrived within ``max_wait_ms`` of the first one),
+    runs ``predict_fn`` once on the stacked batch and hands each row of the
+    output back to its caller.
+    """
+
+    def __init__(self, predict_fn: Callable, max_batch_size: int = 32,
+                 max_wait_ms: float = 10, name: str = 'inference-batcher'):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.name = name
+
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._stopped = False
+
+        # Metrics
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._items = 0
+        self._errors = 0
+        self._largest_batch = 0
+        self._batch_size_hist: Dict[int, int] = {}
+        self._total_predict_time = 0.0
+
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, item) -> Future:
+        """Queue a single input and return a Future for its output row"""
+        future = Future()
+        with self._cond:
+            if self._stopped:
+                raise RuntimeError(f"{self.name} sudah dihentikan")
+            self._queue.append((item, future))
+            self._cond.notify()
+        return future
+
+    def submit_many(self, items) -> List[Future]:
+        """Queue several inputs at once; they may be split across batches"""
+        futures = []
+        with self._cond:
+            if self._stopped:
+                raise RuntimeError(f"{self.name} sudah dihentikan")
+            for item in items:
+                future = Future()
+                self._queue.append((item, future))
+                futures.append(future)
+            self._cond.notify()
+        return futures
+
+    def predict(self, item, timeout: float = None):
+        """Submit one input and block until its output is ready"""
+        return self.submit(item).result(timeout=timeout)
+
+    def queue_depth(self) -> int:
+        """Number of inputs waiting to be batched"""
+        with self._cond:
+            return len(self._queue)
+
+    def stats(self) -> Dict:
+        """Snapshot of queue depth and batch-size metrics"""
+        with self._stats_lock:
+            avg_batch = self._items / self._batches if self._batches else 0.0
+            avg_predict_ms = (self._total_predict_time / self._batches * 1000) if self._batches else 0.0
+            return {
+                'queue_depth': self.queue_depth(),
+                'batches': self._batches,
+                'items': self._items,
+                'errors': self._errors,
+                'avg_batch_size': round(avg_batch, 2),
+                'largest_batch': self._largest_batch,
+                'batch_size_histogram': dict(sorted(self._batch_size_hist.items())),
+                'avg_predict_ms': round(avg_predict_ms, 2),
+                'max_batch_size': self.max_batch_size,
+                'max_wait_ms': self.max_wait * 1000,
+            }
+
+    def shutdown(self, wait: bool = True):
+        """Stop the worker thread; pending inputs are still processed"""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if wait:
+            self._thread.join()
+
+    def _collect_batch(self):
+        """Block for the first item, then gather more until full or timed out"""
+        with self._cond:
+            while not self._queue and not self._stopped:
+                self._cond.wait()
+            if not self._queue:
+                return []
+
+            batch = [self._queue.popleft()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                if self._queue:
+                    batch.append(self._queue.popleft())
+                    continue
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self._stopped:
+                    break
+                self._cond.wait(remaining)
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            if not batch:
+                return
+
+            items = [item for item, _ in batch]
+            futures = [future for _, future in batch]
+
+            started = time.monotonic()
+            try:
+                outputs = self.predict_fn(np.stack(items))
+            except Exception as e:
+                with self._stats_lock:
+                    self._errors += 1
+                for future in futures:
+                    future.set_exception(e)
+                continue
+            elapsed = time.monotonic() - started
+
+            with self._stats_lock:
+                size = len(batch)
+                self._batches += 1
+                self._items += size
+                self._largest_batch = max(self._largest_batch, size)
+                self._batch_size_hist[size] = self._batch_size_hist.get(size, 0) + 1
+                self._total_predict_time += elapsed
+
+            for future, output in zip(futures, outputs):
+                future.set_result(output)
@@ -0,0 +1,88 @@
+"""
+JSON Provider Module
+Flask JSON provider backed by orjson (falls back to the stdlib encoder when
+orjson isn't installed). Rows from cursor(dictionary=True) can be returned
+as-is from jsonify():
+
+- datetime / date / time -> ISO 8601 ("2025-01-05T10:00:00", "2025-01-05")
+- Decimal                -> number (DECIMAL amounts, SUM()/AVG() results)
+- set / bytes            -> list / UTF-8 string
+- numpy scalars/arrays   -> numbers / lists (waste detection confidences)
+
+Enabled with ``app.json = FastJSONProvider(app)``.
+"""
+
+import dataclasses
+import datetime
+import decimal
+import json
+import uuid
+
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+def _default(o):
+    """Types neither orjson nor the stdlib encoder handle natively"""
+    if isinstance(o, decimal.Decimal):
+        return float(o)
+    if isinstance(o, (datetime.datetime, datetime.date, datetime.time)):
+        return o.isoformat()
+    if isinstance(o, datetime.timedelta):
+        return o.total_seconds()
+    if isinstance(o, (set, frozenset)):
+        return list(o)
+    if isinstance(o, (bytes, bytearray)):
+        return o.decode('utf-8', errors='replace')
+    if isinstance(o, uuid.UUID):
+        return str(o)
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if hasattr(o, 'tolist'):  # numpy arrays and scalars
+        return o.tolist()
+    if hasattr(o, '__html__'):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+class FastJSONProvider(JSONProvider):
+    """
+    Drop-in replacement for Flask's DefaultJSONProvider.
+    Keys are not sorted and output is compact unless JSONIFY_PRETTYPRINT
+    (app.config) or app.debug is set.
+    """
+
+    mimetype = 'application/json'
+
+    def _pretty(self) -> bool:
+        return bool(self._app.config.get('JSONIFY_PRETTYPRINT', self._app.debug))
+
+    def dumps(self, obj, **kwargs) -> str:
+        return self.dumpb(obj, **kwargs).decode('utf-8')
+
+    def dumpb(self, obj, **kwargs) -> bytes:
+        indent = kwargs.pop('indent', 2 if self._pretty() else None)
+        if orjson is not None and not kwargs:
+            option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+            if indent:
+                option |= orjson.OPT_INDENT_2
+            return orjson.dumps(obj, default=_default, option=option)
+
+        kwargs.setdefault('default', _default)
+        kwargs.setdefault('ensure_ascii', False)
+        if not indent:
+            kwargs.setdefault('separators', (',', ':'))
+        return json.dumps(obj, indent=indent, **kwargs).encode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumpb(obj) + b'\n', mimetype=self.mimetype)
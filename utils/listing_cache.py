@@ -0,0 +1,278 @@
+"""
+Listing Cache Module
+Per-process stale-while-revalidate cache for list payloads (the campaign
+browse screen). Each entry is:
+
+- fresh for ``ttl`` seconds: served from memory
+- stale for another ``stale_ttl`` seconds: served from memory while one
+  background thread rebuilds it
+- expired afterwards: rebuilt synchronously (one loader per key, other
+  requests for the same key wait for it)
+
+Writes either drop entries (``invalidate``) or patch cached items in place
+(``update_items``) when the change is small and known, e.g. a donation.
+A load that overlaps a patch is only kept out of the cache when the patch
+touches the loaded value (it can't tell whether its SELECT saw the write);
+requests waiting on that load still use its result.
+"""
+
+import os
+import threading
+import time
+from collections import Counter, deque
+from decimal import Decimal
+from typing import Callable, Dict, Hashable, Optional
+
+
+class _Entry:
+    __slots__ = ('value', 'fresh_until', 'stale_until')
+
+    def __init__(self, value, fresh_until, stale_until):
+        self.value = value
+        self.fresh_until = fresh_until
+        self.stale_until = stale_until
+
+
+class _Load:
+    """One in-flight loader call; waiters take its result"""
+    __slots__ = ('event', 'value', 'ok')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.ok = False
+
+
+class StaleWhileRevalidateCache:
+    """Cache of loader results keyed by tuples whose first element is a group name"""
+
+    def __init__(self, ttl: float = 30, stale_ttl: float = 300, max_entries: int = 500):
+        self.ttl = float(ttl)
+        self.stale_ttl = float(stale_ttl)
+        self.max_entries = max(1, int(max_entries))
+        self._entries: Dict[Hashable, _Entry] = {}
+        self._loading: Dict[Hashable, _Load] = {}
+        self._lock = threading.Lock()
+        # Bumped by every invalidation so a load that started before it isn't stored
+        self._version = 0
+        # Patches recorded while loads are in flight: (seq, group, update)
+        self._patch_seq = 0
+        self._patch_log = deque()
+        self._active_loads = Counter()  # patch seq at load start -> loads
+
+        # Metrics
+        self._hits = 0
+        self._stale_hits = 0
+        self._misses = 0
+        self._refreshes = 0
+        self._refresh_errors = 0
+        self._invalidations = 0
+        self._patches = 0
+        self._discarded_loads = 0
+
+    def get(self, key: Hashable, loader: Callable[[], object]):
+        """Cached value for key, calling loader() to build it when needed"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now < entry.fresh_until:
+                self._hits += 1
+                return entry.value
+            if entry is not None and now < entry.stale_until:
+                self._stale_hits += 1
+                if key not in self._loading:
+                    load = self._loading[key] = _Load()
+                    threading.Thread(target=self._refresh, args=(key, loader, load), daemon=True,
+                                     name='listing-cache-refresh').start()
+                return entry.value
+
+            self._misses += 1
+            waiter = self._loading.get(key)
+            if waiter is None:
+                load = self._loading[key] = _Load()
+
+        if waiter is not None:
+            # Someone else is building this key: wait for it, then use their result
+            waiter.event.wait(timeout=30)
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and time.monotonic() < entry.stale_until:
+                    return entry.value
+            if waiter.ok:
+                return waiter.value  # loaded but not cached (overlapped a write)
+            return loader()
+
+        try:
+            return self._load(key, loader, load)
+        finally:
+            self._done_loading(key)
+
+    def _load(self, key, loader, load: _Load):
+        with self._lock:
+            version = self._version
+            patch_seq = self._patch_seq
+            self._active_loads[patch_seq] += 1
+        try:
+            value = loader()
+            load.value, load.ok = value, True
+            self._store(key, value, version, patch_seq)
+        finally:
+            with self._lock:
+                self._active_loads[patch_seq] -= 1
+                if not self._active_loads[patch_seq]:
+                    del self._active_loads[patch_seq]
+                self._prune_patch_log()
+        return value
+
+    def _prune_patch_log(self):
+        """Drop patches no in-flight load can overlap (call with the lock held)"""
+        oldest = min(self._active_loads, default=self._patch_seq)
+        while self._patch_log and self._patch_log[0][0] <= oldest:
+            self._patch_log.popleft()
+
+    def _refresh(self, key, loader, load: _Load):
+        try:
+            self._load(key, loader, load)
+            with self._lock:
+                self._refreshes += 1
+        except Exception as e:
+            # Keep serving the stale value until it expires
+            with self._lock:
+                self._refresh_errors += 1
+            print(f"⚠️ Listing cache refresh failed for {key}: {e}")
+        finally:
+            self._done_loading(key)
+
+    def _done_loading(self, key):
+        with self._lock:
+            load = self._loading.pop(key, None)
+        if load is not None:
+            load.event.set()
+
+    def _store(self, key, value, version, patch_seq):
+        now = time.monotonic()
+        with self._lock:
+            if version != self._version:
+                self._discarded_loads += 1
+                return  # invalidated while loading: the value may predate the write
+            for seq, group, update in self._patch_log:
+                if seq > patch_seq and group == key[0] and update(value) is not None:
+                    # Patched while loading and the patch touches this value: the
+                    # SELECT may or may not have seen the write, so don't cache it
+                    self._discarded_loads += 1
+                    return
+            self._entries[key] = _Entry(value, now + self.ttl, now + self.ttl + self.stale_ttl)
+            if len(self._entries) > self.max_entries:
+                # Drop the entries closest to expiry
+                for old_key in sorted(self._entries, key=lambda k: self._entries[k].stale_until)[
+                        :len(self._entries) - self.max_entries]:
+                    del self._entries[old_key]
+
+    def invalidate(self, group: Optional[str] = None):
+        """Drop every entry of a group (first key element), or everything"""
+        with self._lock:
+            self._version += 1
+            self._invalidations += 1
+            if group is None:
+                self._entries.clear()
+            else:
+                for key in [k for k in self._entries if k[0] == group]:
+                    del self._entries[key]
+
+    def update_items(self, group: str, update: Callable[[object], Optional[object]]) -> int:
+        """
+        Patch cached values of a group without a reload.
+        update(value) returns a new value, or None when the entry is unaffected.
+        Values are replaced, never mutated, so in-flight responses are safe.
+        """
+        patched = 0
+        with self._lock:
+            if self._active_loads:
+                # Checked against the result of every load already in flight (_store)
+                self._patch_seq += 1
+                self._patch_log.append((self._patch_seq, group, update))
+            for key, entry in self._entries.items():
+                if key[0] != group:
+                    continue
+                new_value = update(entry.value)
+                if new_value is not None:
+                    entry.value = new_value
+                    patched += 1
+            self._patches += patched
+        return patched
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self._hits + self._stale_hits + self._misses
+            return {
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'stale_ttl': self.stale_ttl,
+                'hits': self._hits,
+                'stale_hits': self._stale_hits,
+                'misses': self._misses,
+                'refreshes': self._refreshes,
+                'refresh_errors': self._refresh_errors,
+                'invalidations': self._invalidations,
+                'patches': self._patches,
+                'discarded_loads': self._discarded_loads,
+                'hit_rate': round((self._hits + self._stale_hits) / lookups, 4) if lookups else 0.0,
+            }
+
+
+# ============================================================================
+# Campaign listings (GET /api/campaigns/)
+# ============================================================================
+
+CAMPAIGN_LISTINGS = 'campaigns'
+
+_campaign_cache = None
+_campaign_cache_lock = threading.Lock()
+
+
+def get_campaign_listing_cache() -> StaleWhileRevalidateCache:
+    """Process-wide cache configured from CAMPAIGN_LIST_CACHE_* env vars"""
+    global _campaign_cache
+    if _campaign_cache is None:
+        with _campaign_cache_lock:
+            if _campaign_cache is None:
+                _campaign_cache = StaleWhileRevalidateCache(
+                    ttl=float(os.getenv('CAMPAIGN_LIST_CACHE_TTL', 30)),
+                    stale_ttl=float(os.getenv('CAMPAIGN_LIST_CACHE_STALE', 300)),
+                    max_entries=int(os.getenv('CAMPAIGN_LIST_CACHE_MAX_ENTRIES', 500)),
+                )
+    return _campaign_cache
+
+
+def invalidate_campaign_listings():
+    """Campaign created / edited / deleted / status changed"""
+    get_campaign_listing_cache().invalidate(CAMPAIGN_LISTINGS)
+
+
+def _patch_campaign(campaign_id, changes):
+    def update(payload):
+        if not any(item.get('id') == campaign_id for item in payload['data']):
+            return None
+        data = [
+            {**item, **changes(item)} if item.get('id') == campaign_id else item
+            for item in payload['data']
+        ]
+        return {**payload, 'data': data}
+    return update
+
+
+def record_campaign_donation(campaign_id, amount):
+    """Donation committed: bump current_amount / donor_count in cached pages"""
+    amount = Decimal(str(amount))
+    get_campaign_listing_cache().update_items(CAMPAIGN_LISTINGS, _patch_campaign(int(campaign_id), lambda item: {
+        'current_amount': Decimal(str(item.get('current_amount') or 0)) + amount,
+        'donor_count': (item.get('donor_count') or 0) + 1,
+    }))
+
+
+def record_campaign_volunteer(campaign_id, delta=1):
+    """Volunteer accepted (+1) or an accepted one removed (-1)"""
+    get_campaign_listing_cache().update_items(CAMPAIGN_LISTINGS, _patch_campaign(int(campaign_id), lambda item: {
+        'volunteer_count': max((item.get('volunteer_count') or 0) + delta, 0),
+    }))
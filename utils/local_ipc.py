@@ -0,0 +1,101 @@
+"""
+Local IPC Module
+Socket and authkey handling for the helper processes that web workers talk
+to over multiprocessing.connection (ml_service.py, notification_stream.py).
+
+multiprocessing.connection unpickles every message it receives, so anyone
+who can connect and authenticate can run code in the server. Therefore:
+
+- there is no built-in authkey: it must be configured, or generated by the
+  gunicorn master (ensure_authkey) and inherited by workers and helpers
+- Unix sockets default to a private 0700 directory and are created 0600
+- host:port addresses must be loopback
+"""
+
+import getpass
+import ipaddress
+import os
+import secrets
+import tempfile
+from multiprocessing.connection import Listener
+
+
+def runtime_dir() -> str:
+    """Per-user private directory holding the default sockets"""
+    owner = os.getuid() if hasattr(os, 'getuid') else getpass.getuser()
+    return os.path.join(tempfile.gettempdir(), f"ruang_hijau-{owner}")
+
+
+def default_socket(name: str) -> str:
+    return os.path.join(runtime_dir(), name)
+
+
+def is_loopback(host: str) -> bool:
+    host = host.strip('[]')
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def parse_address(address: str):
+    """'host:port' -> (host, port), loopback only; anything else is a Unix socket path"""
+    if ':' in address and not address.startswith('/'):
+        host, port = address.rsplit(':', 1)
+        if not is_loopback(host):
+            raise ValueError(f"Refusing non-loopback IPC address {address}: use a Unix socket or 127.0.0.1")
+        return (host.strip('[]'), int(port))
+    return address
+
+
+def require_authkey(env_name: str) -> bytes:
+    key = os.getenv(env_name)
+    if not key:
+        raise RuntimeError(
+            f"{env_name} is not set. Set a random secret "
+            f"(python -c \"import secrets; print(secrets.token_hex(32))\") "
+            f"or start the service through gunicorn, which generates one"
+        )
+    return key.encode()
+
+
+def ensure_authkey(env_name: str) -> bool:
+    """Generate a random key in this process's env if none is configured (gunicorn master)"""
+    if os.environ.get(env_name):
+        return False
+    os.environ[env_name] = secrets.token_hex(32)
+    return True
+
+
+def _ensure_private_dir(path: str):
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    info = os.stat(path)
+    if hasattr(os, 'getuid') and info.st_uid != os.getuid():
+        raise RuntimeError(f"{path} is owned by another user; refusing to create sockets in it")
+    if info.st_mode & 0o077:
+        os.chmod(path, 0o700)
+
+
+def listen(address, authkey: bytes) -> Listener:
+    """Listener with owner-only permissions on Unix socket paths"""
+    if not isinstance(address, str):
+        return Listener(address, authkey=authkey)
+
+    parent = os.path.dirname(address) or '.'
+    if os.path.abspath(parent) == os.path.abspath(runtime_dir()):
+        _ensure_private_dir(parent)
+    else:
+        os.makedirs(parent, mode=0o700, exist_ok=True)
+    if os.path.exists(address):
+        os.remove(address)  # stale socket from a previous run
+
+    # Created 0600 from the start: no window where other users can connect
+    old_umask = os.umask(0o177)
+    try:
+        listener = Listener(address, authkey=authkey)
+    finally:
+        os.umask(old_umask)
+    os.chmod(address, 0o600)
+    return listener
@@ -0,0 +1,451 @@
+"""
+Process-Isolated ML Worker Pool
+Runs TensorFlow inference in a dedicated pool of worker processes so web
+workers never import TensorFlow or hold their own copy of the model.
+
+- MLWorkerPool: N spawned processes with pinned intra-/inter-op thread
+  counts, each fed through its own pipe
+- MLService: exposes one pool to every web worker over a local socket
+  (multiprocessing.connection), started by ml_service.py
+- MLPoolClient: what web workers use; same predict()/labels() interface as
+  the in-process backends in utils/waste_backends.py
+
+Every call is bounded by WASTE_ML_POOL_TIMEOUT, and a worker process that
+dies is restarted with its in-flight batches failed, so a crashed worker
+can't leave web requests waiting forever. Socket / authkey rules are in
+utils/local_ipc.py.
+"""
+
+import itertools
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from multiprocessing.connection import Client, wait
+from typing import Dict, List
+
+from utils import local_ipc
+
+AUTHKEY_ENV = 'WASTE_ML_POOL_AUTHKEY'
+
+# Seconds a predict may take in the pool; clients wait a little longer so the
+# service's own timeout error reaches them first
+PREDICT_TIMEOUT = float(os.getenv('WASTE_ML_POOL_TIMEOUT', 60))
+CLIENT_GRACE = 5.0
+
+# Don't respawn a crashing worker more often than this
+RESTART_BACKOFF = 5.0
+
+
+def parse_address(address: str = None):
+    """'host:port' (loopback only) -> (host, port); anything else is a Unix socket path"""
+    address = address or os.getenv('WASTE_ML_POOL_ADDRESS') or local_ipc.default_socket('ml.sock')
+    return local_ipc.parse_address(address)
+
+
+def get_authkey() -> bytes:
+    return local_ipc.require_authkey(AUTHKEY_ENV)
+
+
+def _cores_for_worker(worker_id: int, num_workers: int) -> List[int]:
+    """Split the available cores into contiguous, non-overlapping slices"""
+    cores = sorted(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else []
+    if not cores or num_workers > len(cores):
+        return []
+    per_worker = len(cores) // num_workers
+    return cores[worker_id * per_worker:(worker_id + 1) * per_worker]
+
+
+def _worker_main(worker_id, conn, backend_name, intra_op_threads, inter_op_threads, cores):
+    """Entry point of one ML worker process; talks to the pool over its own pipe"""
+    if cores and hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, cores)
+
+    # Thread counts must be fixed before TensorFlow initialises its pools
+    os.environ['OMP_NUM_THREADS'] = str(intra_op_threads)
+    os.environ['TF_NUM_INTRAOP_THREADS'] = str(intra_op_threads)
+    os.environ['TF_NUM_INTEROP_THREADS'] = str(inter_op_threads)
+
+    try:
+        import tensorflow as tf
+        tf.config.threading.set_intra_op_parallelism_threads(intra_op_threads)
+        tf.config.threading.set_inter_op_parallelism_threads(inter_op_threads)
+
+        from utils.waste_backends import load_backend
+        backend = load_backend(backend_name)
+        conn.send(('ready', worker_id, {'backend': backend.name, 'labels': backend.labels()}))
+    except Exception as e:
+        conn.send(('failed', worker_id, f"{type(e).__name__}: {e}"))
+        return
+
+    while True:
+        try:
+            task = conn.recv()
+        except (EOFError, OSError):
+            break
+        if task is None:
+            break
+        task_id, batch = task
+        try:
+            conn.send((task_id, True, backend.predict(batch)))
+        except Exception as e:
+            conn.send((task_id, False, f"{type(e).__name__}: {e}"))
+
+
+class _WorkerHandle:
+    """Pool-side state of one worker process"""
+
+    def __init__(self, worker_id: int, process, conn):
+        self.worker_id = worker_id
+        self.process = process
+        self.conn = conn
+        self.send_lock = threading.Lock()
+        self.running = set()  # task ids sent to this worker
+        self.ready = False
+        self.dead = False
+        self.started_at = time.monotonic()
+
+
+class MLWorkerPool:
+    """
+    Pool of spawned TensorFlow worker processes.
+    Each worker has its own pipe (no lock shared between processes, so a
+    killed worker can't wedge the others); batches go to the least busy one.
+    """
+
+    def __init__(self, num_workers: int = None, backend: str = None,
+                 intra_op_threads: int = None, inter_op_threads: int = None,
+                 pin_cores: bool = None):
+        self.num_workers = num_workers or int(os.getenv('WASTE_ML_POOL_WORKERS', 2))
+        self.backend = backend or os.getenv('WASTE_ML_BACKEND', 'keras')
+        self.intra_op_threads = intra_op_threads or int(os.getenv('WASTE_ML_INTRA_OP_THREADS', 2))
+        self.inter_op_threads = inter_op_threads or int(os.getenv('WASTE_ML_INTER_OP_THREADS', 1))
+        if pin_cores is None:
+            pin_cores = os.getenv('WASTE_ML_PIN_CORES', 'false').lower() in ('true', '1', 't')
+        self.pin_cores = pin_cores
+
+        # spawn: forking a process that may already hold TF/BLAS threads is unsafe
+        self._ctx = multiprocessing.get_context('spawn')
+        self._workers: List[_WorkerHandle] = []
+        self._pending: Dict[int, Future] = {}
+        self._owners: Dict[int, _WorkerHandle] = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        self._collector = None
+        self._closing = False
+
+        self.backend_name = None
+        self.labels = None
+
+        # Metrics
+        self._completed = 0
+        self._failed = 0
+        self._timed_out = 0
+        self._restarts = 0
+        self._images = 0
+
+    def _spawn(self, worker_id: int) -> _WorkerHandle:
+        cores = _cores_for_worker(worker_id, self.num_workers) if self.pin_cores else []
+        parent_conn, child_conn = self._ctx.Pipe()
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(worker_id, child_conn, self.backend,
+                  self.intra_op_threads, self.inter_op_threads, cores),
+            name=f'ml-worker-{worker_id}',
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        return _WorkerHandle(worker_id, process, parent_conn)
+
+    def start(self, timeout: float = 300):
+        """Spawn the workers and wait until every one has loaded the model"""
+        self._workers = [self._spawn(worker_id) for worker_id in range(self.num_workers)]
+
+        deadline = time.monotonic() + timeout
+        for worker in self._workers:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0 or not worker.conn.poll(remaining):
+                    raise TimeoutError("ML workers did not become ready in time")
+                status, worker_id, payload = worker.conn.recv()
+            except (EOFError, OSError):
+                status, worker_id, payload = 'failed', worker.worker_id, 'process exited during startup'
+            except TimeoutError:
+                self.shutdown()
+                raise
+            if status == 'failed':
+                self.shutdown()
+                raise RuntimeError(f"ML worker {worker_id} failed to start: {payload}")
+            self.backend_name = payload['backend']
+            self.labels = payload['labels']
+            worker.ready = True
+
+        self._collector = threading.Thread(target=self._collect_results, name='ml-pool-collector', daemon=True)
+        self._collector.start()
+        return self
+
+    def _worker_died(self, worker: _WorkerHandle):
+        """
+        Fail the batches a dead worker held and close its pipe. Only called by
+        the collector, the single reader of the pipes; it respawns the worker.
+        """
+        worker.process.join(timeout=1)  # reap it so exitcode is known
+        if worker.process.is_alive():
+            worker.process.terminate()  # pipe broken but process stuck
+            worker.process.join(timeout=1)
+        with self._lock:
+            if worker.dead:
+                return
+            worker.dead = True
+            worker.ready = False
+            futures = [self._pending.pop(task_id, None) for task_id in worker.running]
+            for task_id in worker.running:
+                self._owners.pop(task_id, None)
+            worker.running.clear()
+            self._failed += sum(1 for future in futures if future is not None)
+        for future in futures:
+            if future is not None:
+                future.set_exception(RuntimeError(
+                    f"ML worker {worker.worker_id} died (exit code {worker.process.exitcode})"
+                ))
+        worker.conn.close()
+        if not self._closing:
+            print(f"⚠️ ML worker {worker.worker_id} died (exit code {worker.process.exitcode})")
+
+    def _restart_dead_workers(self):
+        with self._lock:
+            for index, worker in enumerate(self._workers):
+                if self._closing or not worker.dead:
+                    continue
+                if time.monotonic() - worker.started_at < RESTART_BACKOFF:
+                    continue  # crashing on startup: don't respawn in a tight loop
+                worker.process.join(timeout=0)
+                self._workers[index] = self._spawn(worker.worker_id)
+                self._restarts += 1
+
+    def _handle_message(self, worker: _WorkerHandle, message):
+        task_id, ok, payload = message
+        if task_id == 'ready':
+            with self._lock:
+                worker.ready = True
+            print(f"✅ ML worker {worker.worker_id} restarted")
+            return
+        if task_id == 'failed':
+            print(f"⚠️ ML worker {worker.worker_id} failed to restart: {payload}")
+            return
+        with self._lock:
+            future = self._pending.pop(task_id, None)
+            self._owners.pop(task_id, None)
+            worker.running.discard(task_id)
+            if future is not None:
+                if ok:
+                    self._completed += 1
+                    self._images += len(payload)
+                else:
+                    self._failed += 1
+        if future is None:
+            return  # already timed out
+        if ok:
+            future.set_result(payload)
+        else:
+            future.set_exception(RuntimeError(payload))
+
+    def _collect_results(self):
+        """Single reader of every worker pipe; also notices exited processes"""
+        while not self._closing:
+            with self._lock:
+                workers = [w for w in self._workers if not w.dead]
+            by_conn = {w.conn: w for w in workers}
+            by_sentinel = {w.process.sentinel: w for w in workers}
+            try:
+                ready_list = wait(list(by_conn) + list(by_sentinel), timeout=1.0)
+            except (OSError, ValueError):
+                if self._closing:
+                    return
+                continue
+            for ready in ready_list:
+                worker = by_conn.get(ready) or by_sentinel[ready]
+                if worker.dead:
+                    continue
+                try:
+                    # Drain whatever the worker sent before exiting
+                    while worker.conn.poll():
+                        self._handle_message(worker, worker.conn.recv())
+                except (EOFError, OSError):
+                    self._worker_died(worker)
+                    continue
+                if ready in by_sentinel:
+                    self._worker_died(worker)
+            self._restart_dead_workers()
+
+    def submit(self, batch) -> Future:
+        future = Future()
+        task_id = next(self._ids)
+        future.task_id = task_id
+        with self._lock:
+            workers = [w for w in self._workers if w.ready and not w.dead]
+            if not workers:
+                raise RuntimeError("No ML worker available")
+            worker = min(workers, key=lambda w: len(w.running))
+            self._pending[task_id] = future
+            self._owners[task_id] = worker
+            worker.running.add(task_id)
+        try:
+            with worker.send_lock:
+                worker.conn.send((task_id, batch))
+        except (OSError, ValueError) as e:
+            # Stop routing to it; the collector sees the exit / EOF and cleans up
+            with self._lock:
+                worker.ready = False
+                self._pending.pop(task_id, None)
+                self._owners.pop(task_id, None)
+                worker.running.discard(task_id)
+                self._failed += 1
+            future.set_exception(RuntimeError(f"ML worker {worker.worker_id} unavailable: {e}"))
+        return future
+
+    def predict(self, batch, timeout: float = None):
+        future = self.submit(batch)
+        try:
+            return future.result(timeout=timeout if timeout is not None else PREDICT_TIMEOUT)
+        except FutureTimeoutError:
+            # The worker stays counted as busy with it until its late result arrives
+            with self._lock:
+                self._pending.pop(future.task_id, None)
+                self._timed_out += 1
+            raise TimeoutError("ML inference timed out")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'workers': self.num_workers,
+                'alive_workers': sum(1 for w in self._workers if w.ready and not w.dead),
+                'backend': self.backend_name,
+                'intra_op_threads': self.intra_op_threads,
+                'inter_op_threads': self.inter_op_threads,
+                'pin_cores': self.pin_cores,
+                'in_flight': len(self._pending),
+                'completed_batches': self._completed,
+                'failed_batches': self._failed,
+                'timed_out_batches': self._timed_out,
+                'worker_restarts': self._restarts,
+                'images': self._images,
+            }
+
+    def shutdown(self):
+        with self._lock:
+            self._closing = True  # no more restarts after this snapshot
+            workers, self._workers = self._workers, []
+        for worker in workers:
+            try:
+                with worker.send_lock:
+                    worker.conn.send(None)
+            except (OSError, ValueError):
+                pass
+        for worker in workers:
+            worker.process.join(timeout=10)
+            if worker.process.is_alive():
+                worker.process.terminate()
+            worker.conn.close()
+
+
+class MLService:
+    """Serves an MLWorkerPool to web workers over a local socket"""
+
+    def __init__(self, pool: MLWorkerPool, address=None, authkey: bytes = None):
+        self.pool = pool
+        self.address = parse_address(address) if not isinstance(address, tuple) else address
+        self.authkey = authkey or get_authkey()
+        self._listener = None
+
+    def _handle(self, conn):
+        try:
+            while True:
+                try:
+                    message = conn.recv()
+                except (EOFError, OSError):
+                    return
+                command = message[0]
+                try:
+                    if command == 'predict':
+                        conn.send(('ok', self.pool.predict(message[1], timeout=PREDICT_TIMEOUT)))
+                    elif command == 'labels':
+                        conn.send(('ok', {'backend': self.pool.backend_name, 'labels': self.pool.labels}))
+                    elif command == 'stats':
+                        conn.send(('ok', self.pool.stats()))
+                    else:
+                        conn.send(('error', f"Unknown command: {command}"))
+                except Exception as e:
+                    try:
+                        conn.send(('error', f"{type(e).__name__}: {e}"))
+                    except (OSError, ValueError):
+                        return  # client went away (e.g. its own timeout)
+        finally:
+            conn.close()
+
+    def serve_forever(self):
+        self._listener = local_ipc.listen(self.address, self.authkey)
+        print(f"✅ ML service listening on {self.address}")
+        try:
+            while True:
+                try:
+                    conn = self._listener.accept()
+                except Exception as e:
+                    print(f"⚠️ ML service rejected connection: {e}")
+                    continue
+                threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+        finally:
+            self._listener.close()
+
+
+class MLPoolClient:
+    """
+    Web-worker side handle to the ML service.
+    Keeps a small pool of connections so concurrent threads don't serialize.
+    """
+
+    name = 'pool'
+
+    def __init__(self, address=None, authkey: bytes = None, max_connections: int = None):
+        self.address = parse_address(address) if not isinstance(address, tuple) else address
+        self.authkey = authkey or get_authkey()
+        self._connections = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(
+            max_connections or int(os.getenv('WASTE_ML_POOL_CLIENT_CONNECTIONS', 4))
+        )
+        self.timeout = PREDICT_TIMEOUT + CLIENT_GRACE
+        info = self._call('labels')
+        self.backend_name = info['backend']
+        self._labels = info['labels']
+
+    def _call(self, *message):
+        with self._slots:
+            try:
+                conn = self._connections.get_nowait()
+            except queue.Empty:
+                conn = Client(self.address, authkey=self.authkey)
+            try:
+                conn.send(message)
+                if not conn.poll(self.timeout):
+                    # A late reply would desync this connection: drop it
+                    raise TimeoutError(f"ML service did not answer within {self.timeout:.0f}s")
+                status, payload = conn.recv()
+            except Exception:
+                conn.close()
+                raise
+            self._connections.put(conn)
+        if status != 'ok':
+            raise RuntimeError(payload)
+        return payload
+
+    def labels(self):
+        return self._labels
+
+    def predict(self, batch):
+        return self._call('predict', batch)
+
+    def stats(self) -> Dict:
+        return self._call('stats')
@@ -0,0 +1,281 @@
+"""
+Notification Broadcast Module
+Fans one notification out to an audience (all users, all donors, a
+campaign's volunteers or donors) without one INSERT per recipient:
+
+- recipient ids are read in keyset pages (``id > last ORDER BY id LIMIT n``)
+  so the id list is never held in memory and no read stays open
+- each page becomes one multi-row INSERT, committed on its own, so a
+  100k-user broadcast is ~100 short transactions instead of 100k
+
+Admin broadcasts run in a background thread of the worker that accepted
+them. Progress is written to notification_broadcasts
+(migrations/add_notification_broadcasts.sql) so GET
+/admin/notifications/broadcast/<id> answers from any worker; without the
+table it is only known to the worker running the job.
+"""
+
+import itertools
+import os
+import threading
+import time
+import uuid
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from db import get_db
+from utils.notification_counters import increment_unread
+from utils.notification_events import publish_notifications
+
+# audience -> (keyset query over recipient ids, needs campaign_id)
+AUDIENCES = {
+    'all_users': ("""
+        SELECT id FROM users
+        WHERE role = 'user' AND id > %(after)s
+        ORDER BY id LIMIT %(limit)s
+    """, False),
+    'all_donors': ("""
+        SELECT DISTINCT donor_id FROM donations
+        WHERE donor_id IS NOT NULL AND donor_id > %(after)s
+        ORDER BY donor_id LIMIT %(limit)s
+    """, False),
+    'campaign_volunteers': ("""
+        SELECT DISTINCT user_id FROM volunteers
+        WHERE campaign_id = %(campaign_id)s AND volunteer_status IN ('accepted', 'completed')
+          AND user_id > %(after)s
+        ORDER BY user_id LIMIT %(limit)s
+    """, True),
+    'campaign_donors': ("""
+        SELECT DISTINCT donor_id FROM donations
+        WHERE campaign_id = %(campaign_id)s AND donor_id IS NOT NULL AND donor_id > %(after)s
+        ORDER BY donor_id LIMIT %(limit)s
+    """, True),
+}
+
+DEFAULT_CHUNK_SIZE = int(os.getenv('NOTIFICATION_BROADCAST_CHUNK_SIZE', 1000))
+
+
+def iter_audience(db, audience: str, campaign_id: int = None,
+                  chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[int]]:
+    """Yield recipient ids of an audience in ascending chunks"""
+    query, _ = AUDIENCES[audience]
+    after = 0
+    while True:
+        cursor = db.cursor()
+        try:
+            cursor.execute(query, {'after': after, 'limit': chunk_size, 'campaign_id': campaign_id})
+            ids = [row[0] for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+        if not ids:
+            return
+        yield ids
+        if len(ids) < chunk_size:
+            return
+        after = ids[-1]
+
+
+def chunked(user_ids: Iterable[int], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[int]]:
+    """Split any iterable of ids (generator, cursor, list) into lists of chunk_size"""
+    iterator = iter(user_ids)
+    while True:
+        chunk = list(itertools.islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def insert_notification_chunk(cursor, user_ids: List[int], title: str, message: str,
+                              notification_type: str = None, related_id: int = None,
+                              related_type: str = None) -> int:
+    """One multi-row INSERT for the whole chunk; returns the rows inserted"""
+    if not user_ids:
+        return 0
+    values = ', '.join(['(%s, %s, %s, %s, %s, %s)'] * len(user_ids))
+    params = []
+    for user_id in user_ids:
+        params.extend((user_id, title, message, notification_type, related_id, related_type))
+    cursor.execute(f"""
+        INSERT INTO notifications (user_id, title, message, notification_type, related_id, related_type)
+        VALUES {values}
+    """, params)
+    inserted = cursor.rowcount
+    increment_unread(cursor, user_ids)
+    return inserted
+
+
+def bulk_create_notifications(db, id_chunks: Iterable[List[int]], title: str, message: str,
+                              notification_type: str = None, related_id: int = None,
+                              related_type: str = None, progress=None) -> int:
+    """
+    Insert a notification for every id in id_chunks, committing per chunk.
+    progress(sent) is called after each commit. Returns the total inserted.
+    """
+    sent = 0
+    payload = {
+        'title': title,
+        'message': message,
+        'notification_type': notification_type,
+        'related_id': related_id,
+        'related_type': related_type,
+    }
+    cursor = db.cursor()
+    try:
+        for chunk in id_chunks:
+            sent += insert_notification_chunk(cursor, chunk, title, message,
+                                              notification_type, related_id, related_type)
+            db.commit()
+            publish_notifications([(chunk, payload)])
+            if progress is not None:
+                progress(sent)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        cursor.close()
+    return sent
+
+
+# ============================================================================
+# Background broadcasts (admin API)
+# ============================================================================
+
+_jobs: Dict[str, Dict] = {}
+_jobs_lock = threading.Lock()
+MAX_TRACKED_JOBS = 100
+
+# False once we know the notification_broadcasts migration isn't applied
+_shared_state = True
+
+JOB_COLUMNS = ('id', 'audience', 'campaign_id', 'title', 'created_by', 'status',
+               'sent', 'error', 'duration_ms', 'created_at')
+
+
+def broadcasts_shared() -> bool:
+    """True while job state is stored in notification_broadcasts (visible to every worker)"""
+    return _shared_state
+
+
+def _save_job(db, job: Dict):
+    """Upsert a job row; failures only cost cross-worker visibility, never the broadcast"""
+    global _shared_state
+    if not _shared_state:
+        return
+    cursor = db.cursor()
+    try:
+        cursor.execute("""
+            INSERT INTO notification_broadcasts
+                (id, audience, campaign_id, title, created_by, status, sent, error, duration_ms)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+                status = VALUES(status), sent = VALUES(sent),
+                error = VALUES(error), duration_ms = VALUES(duration_ms)
+        """, (job['id'], job['audience'], job['campaign_id'], job['title'][:200], job['created_by'],
+              job['status'], job['sent'], (job['error'] or '')[:1000] or None, job['duration_ms']))
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        if getattr(e, 'errno', None) == 1146:
+            _shared_state = False
+            print("⚠️ notification_broadcasts table missing, broadcast progress is per worker "
+                  "(run migrations/add_notification_broadcasts.sql)")
+        else:
+            print(f"⚠️ Could not save broadcast progress: {e}")
+    finally:
+        cursor.close()
+
+
+def _update_job(job_id: str, db=None, **changes):
+    with _jobs_lock:
+        _jobs[job_id].update(changes)
+        snapshot = dict(_jobs[job_id])
+    if db is not None:
+        _save_job(db, snapshot)
+
+
+def _run_broadcast(job_id: str, audience: str, title: str, message: str, notification_type: str,
+                   campaign_id: Optional[int], chunk_size: int):
+    started = time.perf_counter()
+    db = get_db()
+    status_db = get_db()  # progress commits stay separate from the chunk transactions
+    try:
+        _update_job(job_id, status_db, status='running')
+        related_id, related_type = (campaign_id, 'campaign') if campaign_id else (None, None)
+        sent = bulk_create_notifications(
+            db, iter_audience(db, audience, campaign_id, chunk_size),
+            title, message, notification_type, related_id, related_type,
+            progress=lambda sent: _update_job(job_id, status_db, sent=sent),
+        )
+        _update_job(job_id, status_db, status='done', sent=sent,
+                    duration_ms=round((time.perf_counter() - started) * 1000, 1))
+        print(f"📣 Broadcast {job_id} ({audience}) sent to {sent} users")
+    except Exception as e:
+        _update_job(job_id, status_db, status='failed', error=str(e),
+                    duration_ms=round((time.perf_counter() - started) * 1000, 1))
+        print(f"⚠️ Broadcast {job_id} failed: {e}")
+    finally:
+        status_db.close()
+        db.close()
+
+
+def start_broadcast(audience: str, title: str, message: str, notification_type: str = 'broadcast',
+                    campaign_id: int = None, created_by: int = None,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict:
+    """Start a broadcast in a background thread; returns the job record"""
+    job_id = uuid.uuid4().hex[:16]
+    job = {
+        'id': job_id,
+        'audience': audience,
+        'campaign_id': campaign_id,
+        'title': title,
+        'created_by': created_by,
+        'status': 'queued',
+        'sent': 0,
+        'error': None,
+        'duration_ms': None,
+        'created_at': time.time(),
+    }
+    with _jobs_lock:
+        _jobs[job_id] = job
+        # Forget the oldest finished jobs
+        finished = [j for j in _jobs.values() if j['status'] in ('done', 'failed')]
+        for old in sorted(finished, key=lambda j: j['created_at'])[:max(len(_jobs) - MAX_TRACKED_JOBS, 0)]:
+            del _jobs[old['id']]
+        snapshot = dict(job)
+
+    # Recorded before the thread starts so the first poll finds it on any worker
+    db = get_db()
+    try:
+        _save_job(db, snapshot)
+    finally:
+        db.close()
+
+    threading.Thread(target=_run_broadcast, name=f'broadcast-{job_id}', daemon=True,
+                     args=(job_id, audience, title, message, notification_type, campaign_id, chunk_size)).start()
+    return snapshot
+
+
+def get_broadcast(job_id: str, db=None) -> Optional[Dict]:
+    """Job record: this worker's copy if it runs the job, else the shared row"""
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        if job:
+            return dict(job)
+    if db is None or not _shared_state:
+        return None
+
+    cursor = db.cursor(dictionary=True)
+    try:
+        cursor.execute(f"SELECT {', '.join(JOB_COLUMNS)} FROM notification_broadcasts WHERE id = %s",
+                       (job_id,))
+        row = cursor.fetchone()
+    except Exception as e:
+        if getattr(e, 'errno', None) != 1146:
+            raise
+        return None
+    finally:
+        cursor.close()
+    if row is None:
+        return None
+    row['created_at'] = row['created_at'].timestamp() if row['created_at'] else None
+    row['duration_ms'] = float(row['duration_ms']) if row['duration_ms'] is not None else None
+    return row
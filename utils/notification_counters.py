@@ -0,0 +1,181 @@
+"""
+Notification Counters Module
+Per-user unread counts kept in user_notification_counters
+(migrations/add_notification_unread_counters.sql) so the unread badge is a
+primary-key read instead of a COUNT(*) over notifications.
+
+Every path that inserts notifications calls ``increment_unread`` in the
+same transaction; every path that marks them read or deletes unread ones
+calls ``decrement_unread``. ``rebuild_unread_counters`` recomputes them
+from notifications if they ever drift (e.g. rows inserted by hand).
+
+Before the migration is applied the functions fall back to counting
+(the increments / decrements are skipped).
+"""
+
+from collections import Counter
+from typing import Iterable, Optional
+
+import mysql.connector
+
+ER_NO_SUCH_TABLE = 1146
+
+_missing_table_warned = False
+
+
+def _missing_table(e: mysql.connector.Error) -> bool:
+    global _missing_table_warned
+    if e.errno != ER_NO_SUCH_TABLE:
+        return False
+    if not _missing_table_warned:
+        print("⚠️ Table user_notification_counters not found - run migrations/add_notification_unread_counters.sql")
+        _missing_table_warned = True
+    return True
+
+
+def increment_unread(cursor, user_ids: Iterable[int]):
+    """+1 per occurrence of each user id (one multi-row upsert)"""
+    counts = Counter(int(user_id) for user_id in user_ids)
+    if not counts:
+        return
+    # Sorted so concurrent batches lock counter rows in the same order
+    rows = sorted(counts.items())
+    values = ', '.join(['(%s, %s)'] * len(rows))
+    params = [value for row in rows for value in row]
+    try:
+        cursor.execute(f"""
+            INSERT INTO user_notification_counters (user_id, unread_count)
+            VALUES {values}
+            ON DUPLICATE KEY UPDATE unread_count = unread_count + VALUES(unread_count)
+        """, params)
+    except mysql.connector.Error as e:
+        if not _missing_table(e):
+            raise
+
+
+def decrement_unread(cursor, user_id: int, count: int = 1):
+    if count <= 0:
+        return
+    try:
+        cursor.execute("""
+            UPDATE user_notification_counters
+            SET unread_count = GREATEST(unread_count - %s, 0)
+            WHERE user_id = %s
+        """, (count, user_id))
+    except mysql.connector.Error as e:
+        if not _missing_table(e):
+            raise
+
+
+def get_unread_count(db, user_id: int) -> int:
+    cursor = db.cursor()
+    try:
+        try:
+            cursor.execute("SELECT unread_count FROM user_notification_counters WHERE user_id = %s", (user_id,))
+            row = cursor.fetchone()
+            return int(row[0]) if row else 0
+        except mysql.connector.Error as e:
+            if not _missing_table(e):
+                raise
+        cursor.execute("SELECT COUNT(*) FROM notifications WHERE user_id = %s AND is_read = FALSE", (user_id,))
+        return int(cursor.fetchone()[0])
+    finally:
+        cursor.close()
+
+
+def get_total_unread(db) -> int:
+    """Unread notifications across all users"""
+    cursor = db.cursor()
+    try:
+        try:
+            cursor.execute("SELECT COALESCE(SUM(unread_count), 0) FROM user_notification_counters")
+            return int(cursor.fetchone()[0])
+        except mysql.connector.Error as e:
+            if not _missing_table(e):
+                raise
+        cursor.execute("SELECT COUNT(*) FROM notifications WHERE is_read = FALSE")
+        return int(cursor.fetchone()[0])
+    finally:
+        cursor.close()
+
+
+def mark_read(db, notification_id: int, user_id: Optional[int] = None) -> bool:
+    """
+    Mark one notification read (only the owner's when user_id is given).
+    Returns False if it doesn't exist; already-read is a no-op success.
+    """
+    cursor = db.cursor()
+    try:
+        cursor.execute("SELECT user_id, is_read FROM notifications WHERE id = %s FOR UPDATE", (notification_id,))
+        row = cursor.fetchone()
+        if not row or (user_id is not None and int(row[0]) != int(user_id)):
+            db.rollback()
+            return False
+        if not row[1]:
+            cursor.execute("UPDATE notifications SET is_read = TRUE WHERE id = %s", (notification_id,))
+            decrement_unread(cursor, row[0])
+        db.commit()
+        return True
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def mark_all_read(db, user_id: int) -> int:
+    """Mark every unread notification of a user read; returns how many changed"""
+    cursor = db.cursor()
+    try:
+        cursor.execute("UPDATE notifications SET is_read = TRUE WHERE user_id = %s AND is_read = FALSE", (user_id,))
+        updated = cursor.rowcount
+        decrement_unread(cursor, user_id, updated)
+        db.commit()
+        return updated
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def delete_notification(db, notification_id: int) -> bool:
+    """Delete a notification, keeping its owner's counter in step"""
+    cursor = db.cursor()
+    try:
+        cursor.execute("SELECT user_id, is_read FROM notifications WHERE id = %s FOR UPDATE", (notification_id,))
+        row = cursor.fetchone()
+        if not row:
+            db.rollback()
+            return False
+        cursor.execute("DELETE FROM notifications WHERE id = %s", (notification_id,))
+        if not row[1]:
+            decrement_unread(cursor, row[0])
+        db.commit()
+        return True
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def rebuild_unread_counters(db, user_id: Optional[int] = None):
+    """Recompute counters from notifications (one user, or everyone)"""
+    cursor = db.cursor()
+    try:
+        where, params = ("WHERE user_id = %s", (user_id,)) if user_id is not None else ("", ())
+        cursor.execute(f"UPDATE user_notification_counters SET unread_count = 0 {where}", params)
+        cursor.execute(f"""
+            INSERT INTO user_notification_counters (user_id, unread_count)
+            SELECT user_id, COUNT(*) FROM notifications
+            WHERE is_read = FALSE {'AND user_id = %s' if user_id is not None else ''}
+            GROUP BY user_id
+            ON DUPLICATE KEY UPDATE unread_count = VALUES(unread_count)
+        """, params)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        cursor.close()
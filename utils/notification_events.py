@@ -0,0 +1,502 @@
+"""
+Notification Events Module
+Pushes new notifications to connected clients over Server-Sent Events.
+
+- NotificationHub: in-process pub/sub keyed by user id. Each subscriber
+  gets a bounded queue; a per-user replay buffer lets a reconnecting
+  client resume from its Last-Event-ID. When the gap can't be replayed
+  the client gets a ``resync`` event and should refetch the list.
+- publish_notifications(): called by the notification insert paths
+  (outbox dispatcher, broadcasts) after commit.
+
+NOTIFICATION_STREAM_MODE:
+- local  - each web worker serves /api/notifications/stream from its own
+           hub. Every connection holds a worker thread and only sees
+           notifications created in that worker, so this is meant for the
+           dev server (capped by NOTIFICATION_STREAM_MAX_LOCAL). The
+           default; gunicorn_config.py defaults to broker instead.
+- broker - workers send events to notification_stream.py over a local
+           socket; that single asyncio process holds every SSE connection
+           (thousands of idle clients cost no web worker threads). The
+           socket needs NOTIFICATION_BROKER_AUTHKEY (gunicorn generates one)
+           and is created 0600, see utils/local_ipc.py.
+- off    - nothing is published.
+"""
+
+import asyncio
+import json
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from utils import local_ipc
+
+AUTHKEY_ENV = 'NOTIFICATION_BROKER_AUTHKEY'
+
+HEARTBEAT_INTERVAL = float(os.getenv('NOTIFICATION_STREAM_HEARTBEAT', 15))
+RETRY_MS = 3000
+
+
+def get_stream_mode() -> str:
+    return os.getenv('NOTIFICATION_STREAM_MODE', 'local').lower()
+
+
+def parse_address(address: str = None):
+    """'host:port' (loopback only) -> (host, port); anything else is a Unix socket path"""
+    address = address or os.getenv('NOTIFICATION_BROKER_ADDRESS') or local_ipc.default_socket('notify.sock')
+    return local_ipc.parse_address(address)
+
+
+def get_authkey() -> bytes:
+    return local_ipc.require_authkey(AUTHKEY_ENV)
+
+
+def format_sse(data=None, event: str = None, event_id: str = None, retry: int = None) -> bytes:
+    """One SSE frame; data is JSON encoded"""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event is not None:
+        lines.append(f"event: {event}")
+    if retry is not None:
+        lines.append(f"retry: {retry}")
+    if data is not None:
+        lines.append(f"data: {json.dumps(data, default=str, separators=(',', ':'))}")
+    return ('\n'.join(lines) + '\n\n').encode('utf-8')
+
+
+HEARTBEAT = b': ping\n\n'
+
+
+class _ReplayBuffer:
+    __slots__ = ('events', 'floor')
+
+    def __init__(self, floor: int, maxlen: int):
+        self.events = deque(maxlen=maxlen)  # (seq, payload)
+        self.floor = floor  # events with seq <= floor are unknown to this buffer
+
+
+class Subscription:
+    """One connected client; ``queue`` receives (event_id, payload), ``resync`` is set when events were lost"""
+
+    __slots__ = ('user_id', 'queue', 'backlog', 'resync')
+
+    def __init__(self, user_id: int, q, backlog: List, resync: bool):
+        self.user_id = user_id
+        self.queue = q
+        self.backlog = backlog
+        self.resync = resync
+
+
+class NotificationHub:
+    """
+    Thread-safe user_id -> subscribers fan-out.
+    Works with queue.Queue (thread per client) or asyncio.Queue (publish
+    must then run on the event loop thread).
+    """
+
+    def __init__(self, queue_size: int = 100, replay_size: int = 20, replay_users: int = 10000):
+        self.queue_size = max(1, int(queue_size))
+        self.replay_size = max(0, int(replay_size))
+        self.replay_users = max(0, int(replay_users))
+        # Event ids are "<epoch>-<seq>": after a restart old ids are recognised as unknown
+        self.epoch = format(int(time.time()), 'x')
+        self._seq = 0
+        self._evicted_floor = 0  # highest seq held by a replay buffer that was dropped
+        self._subscribers: Dict[int, set] = {}
+        self._buffers: "OrderedDict[int, _ReplayBuffer]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Metrics
+        self._published = 0
+        self._delivered = 0
+        self._dropped = 0
+
+    def _parse_event_id(self, event_id: Optional[str]) -> Optional[int]:
+        """seq of a Last-Event-ID from this hub, -1 if it is from another epoch, None if absent"""
+        if not event_id:
+            return None
+        epoch, _, seq = event_id.partition('-')
+        if epoch != self.epoch or not seq.isdigit():
+            return -1
+        return int(seq)
+
+    def subscribe(self, user_id: int, last_event_id: str = None, queue_factory=queue.Queue) -> Subscription:
+        user_id = int(user_id)
+        last_seq = self._parse_event_id(last_event_id)
+        with self._lock:
+            backlog, resync = [], False
+            if last_seq is not None:
+                buffer = self._buffers.get(user_id)
+                if last_seq < 0:
+                    resync = True
+                elif buffer is not None and last_seq >= buffer.floor:
+                    backlog = [(f"{self.epoch}-{seq}", payload)
+                               for seq, payload in buffer.events if seq > last_seq]
+                elif buffer is None and last_seq >= self._evicted_floor:
+                    pass  # nothing was published for this user since
+                else:
+                    resync = True
+            subscription = Subscription(user_id, queue_factory(maxsize=self.queue_size), backlog, resync)
+            self._subscribers.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.user_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.user_id]
+
+    def _remember(self, user_id: int, seq: int, payload: Dict):
+        buffer = self._buffers.get(user_id)
+        if buffer is None:
+            buffer = self._buffers[user_id] = _ReplayBuffer(seq - 1, self.replay_size)
+            while len(self._buffers) > self.replay_users:
+                _, evicted = self._buffers.popitem(last=False)
+                if evicted.events:
+                    self._evicted_floor = max(self._evicted_floor, evicted.events[-1][0])
+        else:
+            self._buffers.move_to_end(user_id)
+        if len(buffer.events) == buffer.events.maxlen and buffer.events:
+            buffer.floor = buffer.events[0][0]
+        buffer.events.append((seq, payload))
+
+    def publish(self, user_ids: Iterable[int], payload: Dict) -> int:
+        """Send payload to every connected subscriber of user_ids; returns deliveries"""
+        delivered = 0
+        with self._lock:
+            for user_id in user_ids:
+                user_id = int(user_id)
+                self._seq += 1
+                self._published += 1
+                if self.replay_size and self.replay_users:
+                    self._remember(user_id, self._seq, payload)
+                for subscription in self._subscribers.get(user_id, ()):
+                    try:
+                        subscription.queue.put_nowait((f"{self.epoch}-{self._seq}", payload))
+                        delivered += 1
+                    except (queue.Full, asyncio.QueueFull):
+                        # Slow client: tell it to resync instead of blocking the publisher
+                        subscription.resync = True
+                        self._dropped += 1
+            self._delivered += delivered
+        return delivered
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'epoch': self.epoch,
+                'users_connected': len(self._subscribers),
+                'connections': sum(len(s) for s in self._subscribers.values()),
+                'replay_users': len(self._buffers),
+                'published': self._published,
+                'delivered': self._delivered,
+                'dropped': self._dropped,
+            }
+
+
+def notification_payload(row: Dict) -> Dict:
+    """Fields of a notification row sent to clients"""
+    return {
+        'title': row.get('title'),
+        'message': row.get('message'),
+        'notification_type': row.get('notification_type'),
+        'related_id': row.get('related_id'),
+        'related_type': row.get('related_type'),
+    }
+
+
+class BrokerPublisher:
+    """Web-worker side connection to notification_stream.py (one socket, reconnected lazily)"""
+
+    def __init__(self, address=None, authkey: bytes = None, retry_after: float = 5.0):
+        self.address = parse_address(address) if not isinstance(address, tuple) else address
+        self.authkey = authkey or get_authkey()
+        self.retry_after = retry_after
+        self._conn = None
+        self._down_until = 0.0
+        self._lock = threading.Lock()
+        self._sent = 0
+        self._failed = 0
+
+    def send(self, messages: List[Tuple[List[int], Dict]]) -> bool:
+        """Best effort: events are dropped while the broker is down (clients resync on reconnect)"""
+        with self._lock:
+            if self._conn is None:
+                if time.monotonic() < self._down_until:
+                    self._failed += len(messages)
+                    return False
+                try:
+                    self._conn = Client(self.address, authkey=self.authkey)
+                except (OSError, EOFError, AuthenticationError) as e:
+                    self._down_until = time.monotonic() + self.retry_after
+                    self._failed += len(messages)
+                    print(f"⚠️ Notification broker unavailable ({self.address}): {e}")
+                    return False
+            try:
+                self._conn.send(('publish', messages))
+                self._sent += len(messages)
+                return True
+            except (OSError, EOFError, ValueError) as e:
+                self._conn.close()
+                self._conn = None
+                self._failed += len(messages)
+                print(f"⚠️ Notification broker send failed: {e}")
+                return False
+
+    def stats(self) -> Dict:
+        return {'address': str(self.address), 'sent': self._sent, 'failed': self._failed}
+
+
+_hub = None
+_publisher = None
+_init_lock = threading.Lock()
+
+
+def get_hub() -> NotificationHub:
+    """This process's hub (the one local-mode streams subscribe to)"""
+    global _hub
+    if _hub is None:
+        with _init_lock:
+            if _hub is None:
+                _hub = NotificationHub(
+                    queue_size=int(os.getenv('NOTIFICATION_STREAM_QUEUE_SIZE', 100)),
+                    replay_size=int(os.getenv('NOTIFICATION_STREAM_REPLAY', 20)),
+                )
+    return _hub
+
+
+def get_publisher() -> BrokerPublisher:
+    global _publisher
+    if _publisher is None:
+        with _init_lock:
+            if _publisher is None:
+                _publisher = BrokerPublisher()
+    return _publisher
+
+
+def publish_notifications(messages: List[Tuple[List[int], Dict]]):
+    """
+    messages: [(user_ids, payload), ...] for notifications that were just committed.
+    Never raises: real-time delivery is an optimisation over polling.
+    """
+    if not messages:
+        return
+    mode = get_stream_mode()
+    try:
+        if mode == 'broker':
+            get_publisher().send(messages)
+        elif mode == 'local':
+            hub = get_hub()
+            for user_ids, payload in messages:
+                hub.publish(user_ids, payload)
+    except Exception as e:
+        print(f"⚠️ Notification publish failed: {e}")
+
+
+_local_slots = None
+
+
+def acquire_local_stream() -> bool:
+    """Reserve one of NOTIFICATION_STREAM_MAX_LOCAL streams this worker may hold open"""
+    global _local_slots
+    if _local_slots is None:
+        with _init_lock:
+            if _local_slots is None:
+                _local_slots = threading.BoundedSemaphore(int(os.getenv('NOTIFICATION_STREAM_MAX_LOCAL', 2)))
+    return _local_slots.acquire(blocking=False)
+
+
+def release_local_stream():
+    _local_slots.release()
+
+
+def local_event_stream(subscription: Subscription, max_lifetime: float):
+    """SSE frames for one local-mode client; ends after max_lifetime so the thread is returned"""
+    yield format_sse(retry=RETRY_MS)
+    for event_id, payload in subscription.backlog:
+        yield format_sse(payload, event='notification', event_id=event_id)
+    subscription.backlog = []
+
+    deadline = time.monotonic() + max_lifetime
+    while time.monotonic() < deadline:
+        if subscription.resync:
+            subscription.resync = False
+            while not subscription.queue.empty():
+                subscription.queue.get_nowait()
+            yield format_sse({'reason': 'missed events'}, event='resync')
+        try:
+            event_id, payload = subscription.queue.get(
+                timeout=max(0.0, min(HEARTBEAT_INTERVAL, deadline - time.monotonic())))
+        except queue.Empty:
+            yield HEARTBEAT
+            continue
+        yield format_sse(payload, event='notification', event_id=event_id)
+
+
+def stream_stats() -> Dict:
+    mode = get_stream_mode()
+    if mode == 'broker':
+        return {'mode': mode, 'publisher': get_publisher().stats()}
+    if mode == 'local':
+        return {'mode': mode, 'hub': get_hub().stats()}
+    return {'mode': mode}
+
+
+# ============================================================================
+# Stream server (notification_stream.py, NOTIFICATION_STREAM_MODE=broker)
+# ============================================================================
+
+STREAM_PATH = '/api/notifications/stream'
+
+
+class NotificationStreamServer:
+    """
+    asyncio HTTP server that only speaks SSE, plus the broker socket web
+    workers publish to. One coroutine per connection: idle clients cost a
+    few KB, not a thread.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 8001, broker_address=None, authkey: bytes = None):
+        self.host = host
+        self.port = int(port)
+        self.broker_address = parse_address(broker_address) if not isinstance(broker_address, tuple) \
+            else broker_address
+        self.authkey = authkey or get_authkey()
+        self.hub = NotificationHub(
+            queue_size=int(os.getenv('NOTIFICATION_STREAM_QUEUE_SIZE', 100)),
+            replay_size=int(os.getenv('NOTIFICATION_STREAM_REPLAY', 20)),
+        )
+        self.cors_origin = os.getenv('NOTIFICATION_STREAM_CORS_ORIGIN', '*')
+        self._loop = None
+
+    # --- broker (web workers -> this process) -------------------------------
+
+    def _publish_all(self, messages):
+        for user_ids, payload in messages:
+            self.hub.publish(user_ids, payload)
+
+    def _broker_connection(self, conn):
+        try:
+            while True:
+                try:
+                    command, messages = conn.recv()
+                except (EOFError, OSError):
+                    return
+                if command == 'publish':
+                    self._loop.call_soon_threadsafe(self._publish_all, messages)
+        finally:
+            conn.close()
+
+    def _serve_broker(self):
+        listener = local_ipc.listen(self.broker_address, self.authkey)
+        print(f"✅ Notification broker listening on {self.broker_address}")
+        while True:
+            try:
+                conn = listener.accept()
+            except Exception as e:
+                print(f"⚠️ Notification broker rejected connection: {e}")
+                continue
+            threading.Thread(target=self._broker_connection, args=(conn,), daemon=True).start()
+
+    # --- HTTP ---------------------------------------------------------------
+
+    def _head(self, status: str, content_type: str, extra: str = '') -> bytes:
+        return (f"HTTP/1.1 {status}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Access-Control-Allow-Origin: {self.cors_origin}\r\n"
+                f"{extra}\r\n").encode('latin-1')
+
+    def _json(self, status: str, body: Dict) -> bytes:
+        data = json.dumps(body, default=str).encode('utf-8')
+        return self._head(status, 'application/json',
+                          f"Content-Length: {len(data)}\r\nConnection: close\r\n") + data
+
+    async def _stream(self, writer, user_id: int, last_event_id: Optional[str]):
+        subscription = self.hub.subscribe(user_id, last_event_id, queue_factory=asyncio.Queue)
+        try:
+            writer.write(self._head('200 OK', 'text/event-stream; charset=utf-8',
+                                    "Cache-Control: no-cache\r\nConnection: keep-alive\r\n"
+                                    "X-Accel-Buffering: no\r\n"))
+            writer.write(format_sse(retry=RETRY_MS))
+            for event_id, payload in subscription.backlog:
+                writer.write(format_sse(payload, event='notification', event_id=event_id))
+            subscription.backlog = []
+            await writer.drain()
+
+            while True:
+                if subscription.resync:
+                    subscription.resync = False
+                    while not subscription.queue.empty():
+                        subscription.queue.get_nowait()
+                    writer.write(format_sse({'reason': 'missed events'}, event='resync'))
+                try:
+                    event_id, payload = await asyncio.wait_for(subscription.queue.get(), HEARTBEAT_INTERVAL)
+                    writer.write(format_sse(payload, event='notification', event_id=event_id))
+                except asyncio.TimeoutError:
+                    writer.write(HEARTBEAT)  # also how a vanished client is noticed
+                await writer.drain()
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            self.hub.unsubscribe(subscription)
+
+    async def _handle(self, reader, writer):
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=10)
+            headers = {}
+            for _ in range(100):
+                line = await asyncio.wait_for(reader.readline(), timeout=10)
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+
+            from urllib.parse import parse_qs, urlsplit
+            parts = request_line.decode('latin-1').split()
+            if len(parts) != 3:
+                return
+            method, target = parts[0], urlsplit(parts[1])
+            params = parse_qs(target.query)
+
+            if method == 'OPTIONS':
+                writer.write(self._head('204 No Content', 'text/plain',
+                                        "Access-Control-Allow-Methods: GET, OPTIONS\r\n"
+                                        "Access-Control-Allow-Headers: Last-Event-ID, Cache-Control\r\n"
+                                        "Content-Length: 0\r\nConnection: close\r\n"))
+            elif method != 'GET':
+                writer.write(self._json('405 Method Not Allowed', {"status": "error", "message": "Method not allowed"}))
+            elif target.path.rstrip('/') == STREAM_PATH + '/stats':
+                writer.write(self._json('200 OK', {"status": "success", "data": self.hub.stats()}))
+            elif target.path.rstrip('/') == STREAM_PATH:
+                user_id = (params.get('user_id') or [''])[0]
+                if not user_id.isdigit():
+                    writer.write(self._json('400 Bad Request', {"status": "error", "message": "user_id is required"}))
+                else:
+                    last_event_id = headers.get('last-event-id') or (params.get('last_event_id') or [None])[0]
+                    await self._stream(writer, int(user_id), last_event_id)
+            else:
+                writer.write(self._json('404 Not Found', {"status": "error", "message": "Endpoint not found"}))
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError, OSError):
+            pass
+        finally:
+            writer.close()
+
+    async def _main(self):
+        self._loop = asyncio.get_running_loop()
+        threading.Thread(target=self._serve_broker, name='notification-broker', daemon=True).start()
+        server = await asyncio.start_server(self._handle, self.host, self.port, backlog=2048)
+        print(f"✅ Notification stream listening on http://{self.host}:{self.port}{STREAM_PATH}")
+        async with server:
+            await server.serve_forever()
+
+    def serve_forever(self):
+        asyncio.run(self._main())
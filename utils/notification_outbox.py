@@ -0,0 +1,292 @@
+"""
+Notification Outbox Module
+Request handlers don't create notifications themselves: they add a row to
+notification_outbox in the same transaction as the write that caused it
+(migrations/add_notification_outbox.sql), so a notification exists if and
+only if the donation / volunteer change committed.
+
+A dispatcher thread in each web worker then claims pending rows in batches,
+runs the delivery channels, inserts the notifications rows and marks the
+outbox rows sent - in one transaction per batch. Failed rows are retried
+with exponential backoff and marked failed after OUTBOX_MAX_ATTEMPTS.
+
+- Deduplication: ``dedup_key`` is unique in the outbox, so enqueueing the
+  same event twice (client retry, double submit) creates one notification.
+- Channels: ``register_channel(name, fn)`` adds a delivery step (push, email);
+  ``fn(rows)`` gets the whole batch and returns the ids that failed. Rows are
+  retried as a whole, so channels must be idempotent per outbox id.
+- Several workers can dispatch at once: rows are claimed with an UPDATE
+  carrying a per-claim token, never selected and processed twice. A batch
+  only inserts / marks rows its token still holds, so a slow batch whose
+  rows were re-claimed after claim_timeout doesn't deliver them again.
+"""
+
+import os
+import threading
+import time
+import uuid
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import mysql.connector
+
+from db import get_db
+from utils.notification_counters import increment_unread
+from utils.notification_events import notification_payload, publish_notifications
+
+STATUS_PENDING = 'pending'
+STATUS_PROCESSING = 'processing'
+STATUS_SENT = 'sent'
+STATUS_FAILED = 'failed'
+
+_missing_table_warned = False
+
+
+def _insert_notifications(cursor, rows: List[Dict]):
+    cursor.executemany("""
+        INSERT INTO notifications (user_id, title, message, notification_type, related_id, related_type)
+        VALUES (%s, %s, %s, %s, %s, %s)
+    """, [
+        (row['user_id'], row['title'], row['message'], row['notification_type'],
+         row['related_id'], row['related_type'])
+        for row in rows
+    ])
+    increment_unread(cursor, (row['user_id'] for row in rows))
+
+
+def enqueue_notification(cursor, user_id: int, notification_type: str, title: str, message: str,
+                         related_id: int = None, related_type: str = None, dedup_key: str = None):
+    """
+    Queue a notification inside the caller's transaction (commit it with the caller's write).
+    Before the outbox migration is applied the notification is inserted directly.
+    """
+    global _missing_table_warned
+    try:
+        cursor.execute("""
+            INSERT IGNORE INTO notification_outbox
+                (dedup_key, user_id, notification_type, title, message, related_id, related_type)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+        """, (dedup_key, user_id, notification_type, title, message, related_id, related_type))
+    except mysql.connector.Error as e:
+        if e.errno != 1146:  # ER_NO_SUCH_TABLE
+            raise
+        if not _missing_table_warned:
+            print("⚠️ Table notification_outbox not found - run migrations/add_notification_outbox.sql")
+            _missing_table_warned = True
+        _insert_notifications(cursor, [{
+            'user_id': user_id, 'title': title, 'message': message, 'notification_type': notification_type,
+            'related_id': related_id, 'related_type': related_type,
+        }])
+
+
+class OutboxDispatcher:
+    """
+    Background thread that drains notification_outbox.
+    Wakes up on ``wake()`` (called after a request commits) or every
+    ``poll_interval`` seconds to pick up rows from other workers / retries.
+    """
+
+    def __init__(self, batch_size: int = 100, poll_interval: float = 2.0, max_attempts: int = 5,
+                 retry_delay: float = 5.0, claim_timeout: float = 300.0, name: str = 'notification-outbox'):
+        self.batch_size = max(1, int(batch_size))
+        self.poll_interval = max(0.1, float(poll_interval))
+        self.max_attempts = max(1, int(max_attempts))
+        self.retry_delay = max(0.0, float(retry_delay))
+        self.claim_timeout = max(1.0, float(claim_timeout))
+        self.name = name
+        self._channels: Dict[str, Callable[[List[Dict]], Iterable[int]]] = {}
+        self._wakeup = threading.Event()
+        self._stopped = False
+
+        # Metrics
+        self._lock = threading.Lock()
+        self._batches = 0
+        self._sent = 0
+        self._retried = 0
+        self._failed = 0
+        self._errors = 0
+        self._last_error = None
+        self._total_batch_time = 0.0
+
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def register_channel(self, name: str, deliver: Callable[[List[Dict]], Iterable[int]]):
+        """deliver(rows) -> ids of rows that failed (empty when all were delivered)"""
+        self._channels[name] = deliver
+
+    def wake(self):
+        self._wakeup.set()
+
+    def _run(self):
+        while not self._stopped:
+            try:
+                # Keep draining while full batches come back
+                while not self._stopped and self.dispatch_once() >= self.batch_size:
+                    pass
+            except Exception as e:
+                with self._lock:
+                    self._errors += 1
+                    self._last_error = f"{type(e).__name__}: {e}"
+                if getattr(e, 'errno', None) != 1146:
+                    print(f"⚠️ Notification outbox dispatch failed: {e}")
+            self._wakeup.wait(timeout=self.poll_interval)
+            self._wakeup.clear()
+
+    def _claim(self, db, cursor) -> Tuple[str, List[Dict]]:
+        token = uuid.uuid4().hex
+        # Rows stuck in 'processing' (worker died mid-batch) are claimable again
+        cursor.execute("""
+            UPDATE notification_outbox
+            SET status = 'processing', claim_token = %s, claimed_at = NOW(), attempts = attempts + 1
+            WHERE (status = 'pending' AND available_at <= NOW())
+               OR (status = 'processing' AND claimed_at < NOW() - INTERVAL %s SECOND)
+            ORDER BY id
+            LIMIT %s
+        """, (token, int(self.claim_timeout), self.batch_size))
+        db.commit()
+        if cursor.rowcount == 0:
+            return token, []
+        cursor.execute("""
+            SELECT id, dedup_key, user_id, notification_type, title, message,
+                   related_id, related_type, attempts
+            FROM notification_outbox
+            WHERE claim_token = %s
+            ORDER BY id
+        """, (token,))
+        return token, cursor.fetchall()
+
+    def _still_held(self, cursor, token: str) -> set:
+        """
+        Ids this claim still owns, locked until commit. A slow batch may have
+        been re-claimed by another worker after claim_timeout; those rows are
+        theirs now and must not be inserted or marked again here.
+        """
+        cursor.execute("""
+            SELECT id FROM notification_outbox
+            WHERE claim_token = %s AND status = 'processing'
+            FOR UPDATE
+        """, (token,))
+        return {row['id'] for row in cursor.fetchall()}
+
+    def dispatch_once(self) -> int:
+        """Claim and process one batch; returns the number of rows claimed"""
+        started = time.perf_counter()
+        db = get_db()
+        cursor = db.cursor(dictionary=True)
+        try:
+            token, rows = self._claim(db, cursor)
+            if not rows:
+                return 0
+
+            failed: Dict[int, str] = {}
+            for channel, deliver in self._channels.items():
+                pending = [row for row in rows if row['id'] not in failed]
+                if not pending:
+                    break
+                try:
+                    for row_id in deliver(pending) or ():
+                        failed[row_id] = f"{channel}: delivery failed"
+                except Exception as e:
+                    for row in pending:
+                        failed[row['id']] = f"{channel}: {type(e).__name__}: {e}"
+
+            held = self._still_held(cursor, token)
+            lost = len(rows) - len(held)
+            rows = [row for row in rows if row['id'] in held]
+
+            delivered = [row for row in rows if row['id'] not in failed]
+            if delivered:
+                _insert_notifications(cursor, delivered)
+                placeholders = ', '.join(['%s'] * len(delivered))
+                cursor.execute(f"""
+                    UPDATE notification_outbox
+                    SET status = 'sent', processed_at = NOW(), last_error = NULL
+                    WHERE claim_token = %s AND id IN ({placeholders})
+                """, (token, *(row['id'] for row in delivered)))
+
+            retried = gave_up = 0
+            for row in rows:
+                if row['id'] not in failed:
+                    continue
+                if row['attempts'] >= self.max_attempts:
+                    gave_up += 1
+                    cursor.execute("""
+                        UPDATE notification_outbox
+                        SET status = 'failed', processed_at = NOW(), last_error = %s
+                        WHERE id = %s AND claim_token = %s
+                    """, (failed[row['id']][:1000], row['id'], token))
+                else:
+                    retried += 1
+                    delay = self.retry_delay * (2 ** (row['attempts'] - 1))
+                    cursor.execute("""
+                        UPDATE notification_outbox
+                        SET status = 'pending', claim_token = NULL,
+                            available_at = NOW() + INTERVAL %s SECOND, last_error = %s
+                        WHERE id = %s AND claim_token = %s
+                    """, (int(delay), failed[row['id']][:1000], row['id'], token))
+            db.commit()
+            publish_notifications([([row['user_id']], notification_payload(row)) for row in delivered])
+
+            with self._lock:
+                self._batches += 1
+                self._sent += len(delivered)
+                self._retried += retried
+                self._failed += gave_up
+                self._total_batch_time += time.perf_counter() - started
+            if gave_up:
+                print(f"⚠️ {gave_up} notification(s) failed after {self.max_attempts} attempts")
+            if lost:
+                print(f"⚠️ {lost} outbox row(s) were re-claimed by another dispatcher, skipped")
+            return len(rows) + lost
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            cursor.close()
+            db.close()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'channels': ['database'] + list(self._channels),
+                'batch_size': self.batch_size,
+                'batches': self._batches,
+                'sent': self._sent,
+                'retried': self._retried,
+                'failed': self._failed,
+                'errors': self._errors,
+                'last_error': self._last_error,
+                'avg_batch_ms': round(self._total_batch_time / self._batches * 1000, 2) if self._batches else 0.0,
+            }
+
+    def shutdown(self, timeout: float = 5.0):
+        self._stopped = True
+        self._wakeup.set()
+        self._thread.join(timeout=timeout)
+
+
+# Created on first use so gunicorn workers start their threads after fork
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher() -> Optional[OutboxDispatcher]:
+    """Process-wide dispatcher (None when NOTIFICATION_OUTBOX_DISPATCHER=off)"""
+    global _dispatcher
+    if _dispatcher is None and os.getenv('NOTIFICATION_OUTBOX_DISPATCHER', 'thread').lower() != 'off':
+        with _dispatcher_lock:
+            if _dispatcher is None:
+                _dispatcher = OutboxDispatcher(
+                    batch_size=int(os.getenv('OUTBOX_BATCH_SIZE', 100)),
+                    poll_interval=float(os.getenv('OUTBOX_POLL_INTERVAL', 2)),
+                    max_attempts=int(os.getenv('OUTBOX_MAX_ATTEMPTS', 5)),
+                    retry_delay=float(os.getenv('OUTBOX_RETRY_DELAY', 5)),
+                )
+    return _dispatcher
+
+
+def notify_outbox():
+    """Call after committing enqueue_notification() rows: dispatch them now instead of at the next poll"""
+    dispatcher = get_dispatcher()
+    if dispatcher is not None:
+        dispatcher.wake()
@@ -0,0 +1,306 @@
+"""
+Notification Retention Module
+Keeps the live notifications table small (archive_notifications.py, cron):
+
+- read notifications older than NOTIFICATION_RETENTION_DAYS are moved to
+  notifications_archive (migrations/add_notifications_archive.sql) in
+  bounded batches: one short INSERT ... SELECT + DELETE transaction each,
+  with an optional pause between batches
+- unread notifications are never archived, so unread counters don't change
+- the archive can be RANGE-partitioned by month (optional migration); the
+  job then adds upcoming partitions and expires old months with DROP
+  PARTITION instead of DELETE
+- sent / failed notification_outbox rows are pruned the same way
+
+Progress is written to a JSON status file after every batch so the admin
+panel (GET /admin/notifications/retention) can show a running job.
+"""
+
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+ARCHIVE_TABLE = 'notifications_archive'
+DEFAULT_STATUS_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'logs', 'notification_retention.json'
+)
+
+
+def get_status_file() -> str:
+    return os.getenv('NOTIFICATION_RETENTION_STATUS_FILE', DEFAULT_STATUS_FILE)
+
+
+def read_status() -> Optional[Dict]:
+    """Last progress written by a retention run (None if it never ran)"""
+    try:
+        with open(get_status_file(), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def table_sizes(cursor, tables=('notifications', ARCHIVE_TABLE, 'notification_outbox')) -> Dict:
+    """Approximate rows / data / index bytes from information_schema"""
+    placeholders = ', '.join(['%s'] * len(tables))
+    cursor.execute(f"""
+        SELECT table_name, table_rows, data_length, index_length
+        FROM information_schema.tables
+        WHERE table_schema = DATABASE() AND table_name IN ({placeholders})
+    """, tuple(tables))
+    return {
+        row[0]: {'rows': int(row[1] or 0), 'data_bytes': int(row[2] or 0), 'index_bytes': int(row[3] or 0)}
+        for row in cursor.fetchall()
+    }
+
+
+# ============================================================================
+# Monthly partitions of the archive
+# ============================================================================
+
+def _month_start(value: datetime) -> datetime:
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _next_month(value: datetime) -> datetime:
+    return (_month_start(value) + timedelta(days=32)).replace(day=1)
+
+
+def list_partitions(cursor, table: str = ARCHIVE_TABLE) -> List[Dict]:
+    """[{'name', 'less_than' (unix ts or None for MAXVALUE)}]; empty if not partitioned"""
+    cursor.execute("""
+        SELECT partition_name, partition_description
+        FROM information_schema.partitions
+        WHERE table_schema = DATABASE() AND table_name = %s AND partition_name IS NOT NULL
+        ORDER BY partition_ordinal_position
+    """, (table,))
+    return [
+        {'name': name, 'less_than': None if str(bound).upper() == 'MAXVALUE' else int(bound)}
+        for name, bound in cursor.fetchall()
+    ]
+
+
+def ensure_partitions(cursor, months_ahead: int = 3, table: str = ARCHIVE_TABLE) -> List[str]:
+    """Split pmax so the current and next months_ahead months have their own partition"""
+    partitions = list_partitions(cursor, table)
+    if not partitions or partitions[-1]['less_than'] is not None:
+        return []
+    highest = max((p['less_than'] for p in partitions if p['less_than'] is not None), default=None)
+
+    created = []
+    month = _month_start(datetime.now())
+    for _ in range(months_ahead + 1):
+        upper = _next_month(month)
+        if highest is None or int(upper.timestamp()) > highest:
+            name = f"p{month:%Y%m}"
+            cursor.execute(f"""
+                ALTER TABLE {table} REORGANIZE PARTITION pmax INTO (
+                    PARTITION {name} VALUES LESS THAN (UNIX_TIMESTAMP(%s)),
+                    PARTITION pmax VALUES LESS THAN MAXVALUE
+                )
+            """, (upper.strftime('%Y-%m-%d %H:%M:%S'),))
+            highest = int(upper.timestamp())
+            created.append(name)
+        month = upper
+    return created
+
+
+def drop_expired_partitions(cursor, cutoff: datetime, table: str = ARCHIVE_TABLE) -> List[str]:
+    """Drop partitions whose rows are all older than cutoff (never pmax)"""
+    expired = [
+        p['name'] for p in list_partitions(cursor, table)
+        if p['less_than'] is not None and p['less_than'] <= int(cutoff.timestamp())
+    ]
+    if expired:
+        cursor.execute(f"ALTER TABLE {table} DROP PARTITION {', '.join(expired)}")
+    return expired
+
+
+# ============================================================================
+# Batch job
+# ============================================================================
+
+class RetentionJob:
+    """One retention run; every step works in bounded, separately committed batches"""
+
+    def __init__(self, db, retention_days: int = 90, batch_size: int = 1000, pause: float = 0.0,
+                 max_batches: int = None, apply: bool = True, status_file: str = None):
+        self.db = db
+        self.retention_days = retention_days
+        self.batch_size = max(1, int(batch_size))
+        self.pause = max(0.0, float(pause))
+        self.max_batches = max_batches
+        self.apply = apply
+        self.status_file = status_file or get_status_file()
+        self.metrics = {
+            'state': 'running',
+            'apply': apply,
+            'started_at': datetime.now().isoformat(timespec='seconds'),
+            'finished_at': None,
+            'retention_days': retention_days,
+            'batches': 0,
+            'archived': 0,
+            'outbox_pruned': 0,
+            'archive_purged': 0,
+            'partitions_created': [],
+            'partitions_dropped': [],
+            'last_id': 0,
+            'rows_per_second': 0.0,
+            'error': None,
+        }
+        self._started = time.perf_counter()
+
+    def _write_status(self):
+        elapsed = time.perf_counter() - self._started
+        self.metrics['elapsed_seconds'] = round(elapsed, 1)
+        if elapsed > 0:
+            self.metrics['rows_per_second'] = round(self.metrics['archived'] / elapsed, 1)
+        try:
+            os.makedirs(os.path.dirname(self.status_file), exist_ok=True)
+            tmp_path = f"{self.status_file}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.metrics, f, indent=2)
+            os.replace(tmp_path, self.status_file)
+        except OSError as e:
+            print(f"  ⚠️ Could not write status file: {e}")
+
+    def _budget_left(self) -> bool:
+        return self.max_batches is None or self.metrics['batches'] < self.max_batches
+
+    def _after_batch(self):
+        self.metrics['batches'] += 1
+        self._write_status()
+        if self.pause:
+            time.sleep(self.pause)  # let replication / purge threads catch up
+
+    def archive_read(self, cutoff: datetime) -> int:
+        """Move read notifications created before cutoff into the archive"""
+        cursor = self.db.cursor()
+        last_id = 0
+        try:
+            while self._budget_left():
+                cursor.execute("""
+                    SELECT id FROM notifications
+                    WHERE id > %s AND is_read = TRUE AND created_at < %s
+                    ORDER BY id
+                    LIMIT %s
+                """, (last_id, cutoff, self.batch_size))
+                ids = [row[0] for row in cursor.fetchall()]
+                if not ids:
+                    break
+                last_id = ids[-1]
+
+                if self.apply:
+                    placeholders = ', '.join(['%s'] * len(ids))
+                    cursor.execute(f"""
+                        INSERT IGNORE INTO {ARCHIVE_TABLE}
+                            (id, user_id, title, message, notification_type, related_id, related_type, created_at)
+                        SELECT id, user_id, title, message, notification_type, related_id, related_type, created_at
+                        FROM notifications
+                        WHERE id IN ({placeholders}) AND is_read = TRUE
+                    """, ids)
+                    # Re-checked: a row can't be deleted without having been archived
+                    cursor.execute(f"""
+                        DELETE n FROM notifications n
+                        JOIN {ARCHIVE_TABLE} a ON a.id = n.id AND a.created_at = n.created_at
+                        WHERE n.id IN ({placeholders}) AND n.is_read = TRUE
+                    """, ids)
+                    moved = cursor.rowcount
+                    self.db.commit()
+                else:
+                    moved = len(ids)
+
+                self.metrics['archived'] += moved
+                self.metrics['last_id'] = last_id
+                print(f"  📦 batch {self.metrics['batches'] + 1}: archived {moved} "
+                      f"(total {self.metrics['archived']}, up to id {last_id})")
+                self._after_batch()
+                if len(ids) < self.batch_size:
+                    break
+        except Exception:
+            self.db.rollback()
+            raise
+        finally:
+            cursor.close()
+        return self.metrics['archived']
+
+    def prune_outbox(self, cutoff: datetime) -> int:
+        """Delete sent / failed outbox rows processed before cutoff"""
+        cursor = self.db.cursor()
+        try:
+            while self._budget_left():
+                if not self.apply:
+                    cursor.execute("""
+                        SELECT COUNT(*) FROM notification_outbox
+                        WHERE status IN ('sent', 'failed') AND processed_at < %s
+                    """, (cutoff,))
+                    self.metrics['outbox_pruned'] = int(cursor.fetchone()[0])
+                    break
+                cursor.execute("""
+                    DELETE FROM notification_outbox
+                    WHERE status IN ('sent', 'failed') AND processed_at < %s
+                    ORDER BY id
+                    LIMIT %s
+                """, (cutoff, self.batch_size))
+                deleted = cursor.rowcount
+                self.db.commit()
+                if not deleted:
+                    break
+                self.metrics['outbox_pruned'] += deleted
+                self._after_batch()
+                if deleted < self.batch_size:
+                    break
+        except Exception as e:
+            self.db.rollback()
+            if getattr(e, 'errno', None) != 1146:  # outbox migration not applied
+                raise
+        finally:
+            cursor.close()
+        return self.metrics['outbox_pruned']
+
+    def purge_archive(self, cutoff: datetime) -> int:
+        """Expire archived rows older than cutoff (whole partitions when partitioned)"""
+        cursor = self.db.cursor()
+        try:
+            if list_partitions(cursor):
+                if self.apply:
+                    self.metrics['partitions_dropped'] = drop_expired_partitions(cursor, cutoff)
+                else:
+                    self.metrics['partitions_dropped'] = [
+                        p['name'] for p in list_partitions(cursor)
+                        if p['less_than'] is not None and p['less_than'] <= int(cutoff.timestamp())
+                    ]
+                return 0
+            while self._budget_left() and self.apply:
+                cursor.execute(f"DELETE FROM {ARCHIVE_TABLE} WHERE created_at < %s LIMIT %s",
+                               (cutoff, self.batch_size))
+                deleted = cursor.rowcount
+                self.db.commit()
+                if not deleted:
+                    break
+                self.metrics['archive_purged'] += deleted
+                self._after_batch()
+                if deleted < self.batch_size:
+                    break
+        except Exception:
+            self.db.rollback()
+            raise
+        finally:
+            cursor.close()
+        return self.metrics['archive_purged']
+
+    def prepare_partitions(self, months_ahead: int = 3):
+        cursor = self.db.cursor()
+        try:
+            if self.apply:
+                self.metrics['partitions_created'] = ensure_partitions(cursor, months_ahead)
+        finally:
+            cursor.close()
+
+    def finish(self, error: Exception = None):
+        self.metrics['state'] = 'failed' if error else 'done'
+        self.metrics['error'] = str(error) if error else None
+        self.metrics['finished_at'] = datetime.now().isoformat(timespec='seconds')
+        self._write_status()
+        return self.metrics
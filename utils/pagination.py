@@ -0,0 +1,205 @@
+"""
+Keyset Pagination Module
+Cursor pagination for the admin list endpoints.
+
+A page is ``ORDER BY <sort> <dir>, <id> <dir> LIMIT n`` and the next page
+continues after the last row's (sort value, id) instead of using OFFSET, so
+page 500 costs the same as page 1 and rows inserted meanwhile don't shift
+pages. Only sort columns that have an index (created_at, id, ...) are
+offered; filters are column = value / range conditions that the composite
+indexes in migrations/add_admin_list_indexes.sql can serve.
+
+Query parameters understood by every list:
+    limit          rows per page (default 50, max 200)
+    sort, order    one of the list's sort keys, asc | desc (default created_at desc)
+    cursor         next_cursor from the previous page
+    q              substring search over the list's text columns
+    created_from   YYYY-MM-DD (inclusive)
+    created_to     YYYY-MM-DD (inclusive)
+    ...plus the list's own filters
+"""
+
+import base64
+import json
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Callable, Dict, List, Sequence, Tuple
+
+
+class PaginationError(ValueError):
+    """Invalid list parameter; the message is shown to the admin"""
+
+
+# ----------------------------------------------------------------------------
+# Filter value parsers
+# ----------------------------------------------------------------------------
+
+def as_int(value: str) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise PaginationError(f"'{value}' bukan angka")
+
+
+def as_decimal(value: str) -> Decimal:
+    try:
+        return Decimal(value)
+    except (ArithmeticError, TypeError, ValueError):
+        raise PaginationError(f"'{value}' bukan angka")
+
+
+def as_bool(value: str) -> bool:
+    lowered = str(value).lower()
+    if lowered in ('true', '1', 'yes'):
+        return True
+    if lowered in ('false', '0', 'no'):
+        return False
+    raise PaginationError(f"'{value}' harus true atau false")
+
+
+def one_of(*choices: str) -> Callable[[str], str]:
+    def parse(value: str) -> str:
+        if value not in choices:
+            raise PaginationError(f"'{value}' tidak valid. Pilihan: {', '.join(choices)}")
+        return value
+    return parse
+
+
+def as_date(value: str) -> datetime:
+    try:
+        return datetime.strptime(value, '%Y-%m-%d')
+    except (TypeError, ValueError):
+        raise PaginationError(f"Tanggal '{value}' harus berformat YYYY-MM-DD")
+
+
+def as_date_end(value: str) -> datetime:
+    """Inclusive end date -> start of the following day (used with <)"""
+    return as_date(value) + timedelta(days=1)
+
+
+# ----------------------------------------------------------------------------
+# Cursor encoding
+# ----------------------------------------------------------------------------
+
+def _to_json_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.strftime('%Y-%m-%d %H:%M:%S') if isinstance(value, datetime) else value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def encode_cursor(sort: str, order: str, sort_value, row_id) -> str:
+    raw = json.dumps([sort, order, _to_json_value(sort_value), row_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token: str, sort: str, order: str) -> Tuple:
+    """(sort value, id) of the row the previous page ended with"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        cursor_sort, cursor_order, sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError):
+        raise PaginationError("Cursor tidak valid")
+    if not isinstance(row_id, int) or sort_value is None:
+        raise PaginationError("Cursor tidak valid")
+    if cursor_sort != sort or cursor_order != order:
+        raise PaginationError("Cursor tidak cocok dengan sort / order")
+    return sort_value, row_id
+
+
+# ----------------------------------------------------------------------------
+# List definition
+# ----------------------------------------------------------------------------
+
+class KeysetList:
+    """
+    One admin list.
+
+    select_sql   SELECT ... FROM ... JOIN ... (no WHERE / ORDER BY)
+    id_column    unique tie-breaker, e.g. 'u.id' (row key 'id')
+    sorts        {name: (sql expression, row key)}; expressions must be NOT NULL
+    filters      {param: (sql condition with one %s, parser)}
+    search       text columns matched by ?q=
+    created_column  column behind created_from / created_to
+    """
+
+    def __init__(self, select_sql: str, id_column: str, sorts: Dict[str, Tuple[str, str]],
+                 filters: Dict[str, Tuple[str, Callable]] = None, search: Sequence[str] = (),
+                 created_column: str = None, default_sort: str = 'created_at',
+                 default_limit: int = 50, max_limit: int = 200):
+        self.select_sql = select_sql
+        self.id_column = id_column
+        self.sorts = sorts
+        self.filters = dict(filters or {})
+        if created_column:
+            self.filters.setdefault('created_from', (f"{created_column} >= %s", as_date))
+            self.filters.setdefault('created_to', (f"{created_column} < %s", as_date_end))
+        self.search = search
+        self.default_sort = default_sort
+        self.default_limit = default_limit
+        self.max_limit = max_limit
+
+    @staticmethod
+    def _parse(name: str, value, parse: Callable):
+        try:
+            return parse(value)
+        except PaginationError as e:
+            raise PaginationError(f"{name}: {e}")
+
+    def fetch(self, cursor, args) -> Tuple[List[Dict], Dict]:
+        """Run the page query for request args; returns (rows, pagination)"""
+        sort = args.get('sort', self.default_sort)
+        if sort not in self.sorts:
+            raise PaginationError(f"sort tidak valid. Pilihan: {', '.join(self.sorts)}")
+        order = args.get('order', 'desc').lower()
+        if order not in ('asc', 'desc'):
+            raise PaginationError("order harus asc atau desc")
+        limit = min(max(self._parse('limit', args.get('limit', self.default_limit), as_int), 1), self.max_limit)
+
+        conditions, params = [], []
+        for name, (condition, parse) in self.filters.items():
+            value = args.get(name)
+            if value not in (None, ''):
+                conditions.append(condition)
+                params.append(self._parse(name, value, parse))
+
+        term = (args.get('q') or '').strip()
+        if term and self.search:
+            conditions.append('(' + ' OR '.join(f"{column} LIKE %s" for column in self.search) + ')')
+            pattern = '%' + term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+            params.extend([pattern] * len(self.search))
+
+        sort_expr, sort_key = self.sorts[sort]
+        token = args.get('cursor')
+        if token:
+            sort_value, row_id = decode_cursor(token, sort, order)
+            op = '<' if order == 'desc' else '>'
+            if sort_expr == self.id_column:
+                conditions.append(f"{self.id_column} {op} %s")
+                params.append(row_id)
+            else:
+                conditions.append(f"({sort_expr} {op} %s OR ({sort_expr} = %s AND {self.id_column} {op} %s))")
+                params.extend([sort_value, sort_value, row_id])
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        direction = order.upper()
+        order_by = f"{sort_expr} {direction}" if sort_expr == self.id_column \
+            else f"{sort_expr} {direction}, {self.id_column} {direction}"
+        cursor.execute(f"{self.select_sql} {where} ORDER BY {order_by} LIMIT %s", (*params, limit + 1))
+        rows = cursor.fetchall()
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        next_cursor = None
+        if has_more:
+            last = rows[-1]
+            next_cursor = encode_cursor(sort, order, last[sort_key], last['id'])
+
+        return rows, {
+            "limit": limit,
+            "sort": sort,
+            "order": order,
+            "has_more": has_more,
+            "next_cursor": next_cursor,
+        }
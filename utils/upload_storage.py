@@ -0,0 +1,264 @@
+"""
+Content-Addressed Upload Storage
+Uploaded images are stored under their SHA-256 digest in sharded
+subdirectories, so identical uploads share one file and every stored
+file is immutable (safe to cache forever):
+
+    uploads/ab/cd/abcd1234...ef.jpg
+
+posts.image / campaigns.image hold that relative path. The upload_files
+table (migrations/add_upload_files.sql) counts how many rows reference
+each path; files whose count drops to zero are left for the orphan GC.
+"""
+
+import hashlib
+import os
+import re
+import threading
+from typing import Dict, Optional, Tuple
+
+import mysql.connector
+
+CHUNK_SIZE = 1024 * 1024
+SNIFF_BYTES = 16
+INCOMING_DIR = '.incoming'  # temp files live on the same filesystem so rename is atomic
+
+_CAS_NAME = re.compile(r'^[0-9a-f]{2}/[0-9a-f]{2}/([0-9a-f]{64})\.[a-z0-9]+$')
+_EXT_ALIASES = {'jpeg': 'jpg'}
+
+_missing_table_warned = False
+
+
+def normalize_ext(filename: str) -> str:
+    ext = filename.rsplit('.', 1)[1].lower() if '.' in filename else 'bin'
+    return _EXT_ALIASES.get(ext, ext)
+
+
+def sniff_image_type(head: bytes) -> Optional[str]:
+    """Image type from magic bytes ('jpg', 'png', 'gif', 'webp', 'bmp'), else None"""
+    if head.startswith(b'\xff\xd8\xff'):
+        return 'jpg'
+    if head.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'png'
+    if head.startswith((b'GIF87a', b'GIF89a')):
+        return 'gif'
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'webp'
+    if head.startswith(b'BM'):
+        return 'bmp'
+    return None
+
+
+def stored_ext(head: bytes, filename: str) -> str:
+    """Sniffed type wins over the file name's extension so equal bytes get equal names"""
+    return sniff_image_type(head) or normalize_ext(filename)
+
+
+def cas_name(digest: str, ext: str) -> str:
+    """Relative path for a digest: 'ab/cd/<digest>.<ext>'"""
+    return f"{digest[:2]}/{digest[2:4]}/{digest}.{ext}"
+
+
+def is_content_addressed(filename: Optional[str]) -> bool:
+    return bool(filename) and _CAS_NAME.match(filename) is not None
+
+
+def content_digest(filename: Optional[str]) -> Optional[str]:
+    """SHA-256 hex digest encoded in a content-addressed name, else None"""
+    match = _CAS_NAME.match(filename) if filename else None
+    return match.group(1) if match else None
+
+
+def fsync_dir(directory: str):
+    if hasattr(os, 'O_DIRECTORY'):
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def new_incoming_path(upload_dir: str) -> str:
+    incoming = os.path.join(upload_dir, INCOMING_DIR)
+    os.makedirs(incoming, exist_ok=True)
+    return os.path.join(incoming, f"{os.getpid()}_{threading.get_ident()}_{os.urandom(4).hex()}.part")
+
+
+def _commit_temp(upload_dir: str, tmp_path: str, digest: str, ext: str) -> Tuple[str, bool]:
+    """Move a fully written temp file to its content address; (name, created)"""
+    name = cas_name(digest, ext)
+    dest = os.path.join(upload_dir, name)
+    if os.path.exists(dest):
+        os.remove(tmp_path)  # same bytes already stored
+        # Refresh mtime so the orphan GC's grace period covers the new reference
+        os.utime(dest)
+        return name, False
+
+    os.makedirs(os.path.dirname(dest), exist_ok=True)
+    # Concurrent identical uploads just replace the file with the same bytes
+    os.replace(tmp_path, dest)
+    fsync_dir(os.path.dirname(dest))
+    return name, True
+
+
+def store_upload(file_storage, upload_dir: str, original_filename: str = None) -> Tuple[str, bool]:
+    """
+    Durably store an uploaded file by content.
+    Streamed uploads (utils/upload_stream.py) are already hashed and on disk,
+    so they are only renamed into place; anything else is hashed while being
+    copied to a temp file, fsynced, then renamed.
+    Returns (relative path, created) - created is False for duplicates.
+    """
+    stream = file_storage.stream
+    if getattr(stream, 'upload_dir', None) == upload_dir and hasattr(stream, 'finish'):
+        if stream.finish():
+            raise ValueError(f"Upload rejected: {stream.error}")
+        stream.flush()
+        stream.committed = True
+        # Sniffed type wins over the client's extension so equal bytes get equal names
+        return _commit_temp(upload_dir, stream.path, stream.digest,
+                            stream.image_type or normalize_ext(original_filename or file_storage.filename or ''))
+
+    tmp_path = new_incoming_path(upload_dir)
+    sha256 = hashlib.sha256()
+    head = b''
+    try:
+        with open(tmp_path, 'wb') as f:
+            while True:
+                chunk = stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                if len(head) < SNIFF_BYTES:
+                    head += chunk[:SNIFF_BYTES - len(head)]
+                sha256.update(chunk)
+                f.write(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+        ext = stored_ext(head, original_filename or file_storage.filename or '')
+        return _commit_temp(upload_dir, tmp_path, sha256.hexdigest(), ext)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def file_digest(path: str) -> str:
+    sha256 = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def existing_file_ext(path: str) -> str:
+    """Extension an existing file is stored under (same rule as uploads)"""
+    with open(path, 'rb') as f:
+        head = f.read(SNIFF_BYTES)
+    return stored_ext(head, os.path.basename(path))
+
+
+def store_existing_file(path: str, upload_dir: str) -> Tuple[str, bool]:
+    """Copy an existing file into content-addressed storage (used by the migration)"""
+    digest = file_digest(path)
+    ext = existing_file_ext(path)
+    name = cas_name(digest, ext)
+    if os.path.exists(os.path.join(upload_dir, name)):
+        return name, False
+
+    tmp_path = new_incoming_path(upload_dir)
+    try:
+        with open(path, 'rb') as src, open(tmp_path, 'wb') as dst:
+            for chunk in iter(lambda: src.read(CHUNK_SIZE), b''):
+                dst.write(chunk)
+            dst.flush()
+            os.fsync(dst.fileno())
+        return _commit_temp(upload_dir, tmp_path, digest, ext)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+# ============================================================================
+# Reference counting (upload_files table)
+# ============================================================================
+
+def _run_refcount_query(cursor, query, params):
+    """
+    Ref counts are bookkeeping for the GC: a missing upload_files table
+    (migration not applied yet) must not break post/campaign writes.
+    """
+    global _missing_table_warned
+    try:
+        cursor.execute(query, params)
+        return True
+    except mysql.connector.Error as e:
+        if e.errno != 1146:  # ER_NO_SUCH_TABLE
+            raise
+        if not _missing_table_warned:
+            print("⚠️ Table upload_files not found - run migrations/add_upload_files.sql")
+            _missing_table_warned = True
+        return False
+
+
+def add_reference(cursor, filename: Optional[str], upload_dir: str = None):
+    """Count one more row referencing filename (call inside the same transaction)"""
+    if not filename:
+        return
+    size = None
+    if upload_dir and os.path.isfile(os.path.join(upload_dir, filename)):
+        size = os.path.getsize(os.path.join(upload_dir, filename))
+    _run_refcount_query(cursor, """
+        INSERT INTO upload_files (path, size_bytes, ref_count)
+        VALUES (%s, %s, 1)
+        ON DUPLICATE KEY UPDATE ref_count = ref_count + 1,
+                                size_bytes = COALESCE(VALUES(size_bytes), size_bytes)
+    """, (filename, size))
+
+
+def release_reference(cursor, filename: Optional[str]):
+    """Count one fewer row referencing filename; the file itself is left for the GC"""
+    if not filename:
+        return
+    _run_refcount_query(cursor, """
+        UPDATE upload_files SET ref_count = GREATEST(ref_count - 1, 0)
+        WHERE path = %s
+    """, (filename,))
+
+
+def recount_references(cursor):
+    """Rebuild every ref_count from posts.image and campaigns.image"""
+    _run_refcount_query(cursor, "UPDATE upload_files SET ref_count = 0", ())
+    _run_refcount_query(cursor, """
+        INSERT INTO upload_files (path, ref_count)
+        SELECT image, COUNT(*) FROM (
+            SELECT image FROM posts WHERE image IS NOT NULL AND image <> ''
+            UNION ALL
+            SELECT image FROM campaigns WHERE image IS NOT NULL AND image <> ''
+        ) refs
+        GROUP BY image
+        ON DUPLICATE KEY UPDATE ref_count = VALUES(ref_count)
+    """, ())
+
+
+def lock_ref_counts(cursor, paths) -> Optional[Dict[str, int]]:
+    """
+    {path: ref_count} for the upload_files rows of paths, locked FOR UPDATE
+    until the transaction ends (add_reference for them waits). None without
+    the table.
+    """
+    if not paths:
+        return {}
+    placeholders = ', '.join(['%s'] * len(paths))
+    if not _run_refcount_query(cursor, f"""
+        SELECT path, ref_count FROM upload_files WHERE path IN ({placeholders}) FOR UPDATE
+    """, tuple(paths)):
+        return None
+    return {row[0]: row[1] for row in cursor.fetchall()}
+
+
+def forget_files(cursor, paths):
+    """Drop upload_files rows for files the GC deleted (only while still unreferenced)"""
+    if not paths:
+        return
+    placeholders = ', '.join(['%s'] * len(paths))
+    _run_refcount_query(cursor, f"DELETE FROM upload_files WHERE path IN ({placeholders}) AND ref_count = 0",
+                        tuple(paths))
@@ -0,0 +1,158 @@
+"""
+Streaming Upload Module
+Multipart file parts are written straight into uploads/.incoming while
+being hashed and sniffed, instead of Werkzeug's default BytesIO / /tmp
+spool. Oversized or non-image parts stop being written as soon as they
+are detected; store_upload() then only has to rename the temp file to
+its content address (same filesystem, atomic).
+
+Enabled with ``app.request_class = StreamingUploadRequest``.
+"""
+
+import hashlib
+import os
+from typing import Optional
+
+from flask import Request, current_app
+
+from utils.upload_storage import SNIFF_BYTES, new_incoming_path, sniff_image_type
+
+# Error codes set on a stream; routes map them to their own messages
+ERROR_TOO_LARGE = 'too_large'
+ERROR_NOT_IMAGE = 'not_image'
+
+# (message, HTTP status) used by the post / campaign routes
+UPLOAD_ERROR_RESPONSES = {
+    ERROR_TOO_LARGE: ("Image is too large", 413),
+    ERROR_NOT_IMAGE: ("File is not a valid image (JPG, PNG, GIF, WEBP or BMP)", 400),
+}
+
+
+class HashingUploadStream:
+    """
+    Writable/readable temp file for one multipart part.
+    Tracks SHA-256, size and the sniffed image type while Werkzeug writes.
+    """
+
+    def __init__(self, upload_dir: str, max_bytes: int = None):
+        self.upload_dir = upload_dir
+        self.max_bytes = max_bytes
+        self.path = new_incoming_path(upload_dir)
+        self.size = 0
+        self.image_type = None
+        self.error = None
+        self.committed = False
+        self._finished = False
+        self._sha256 = hashlib.sha256()
+        self._head = b''
+        self._file = open(self.path, 'w+b')
+
+    # --- written by the multipart parser -------------------------------------
+    def write(self, data: bytes) -> int:
+        if self.error:
+            return len(data)  # already rejected: drain the request without storing it
+
+        self.size += len(data)
+        if self.max_bytes is not None and self.size > self.max_bytes:
+            self._reject(ERROR_TOO_LARGE)
+            return len(data)
+
+        if len(self._head) < SNIFF_BYTES:
+            self._head += data[:SNIFF_BYTES - len(self._head)]
+            if len(self._head) >= SNIFF_BYTES:
+                self.image_type = sniff_image_type(self._head)
+                if self.image_type is None:
+                    self._reject(ERROR_NOT_IMAGE)
+                    return len(data)
+
+        self._sha256.update(data)
+        return self._file.write(data)
+
+    def _reject(self, error: str):
+        self.error = error
+        self._file.truncate(0)
+
+    @property
+    def digest(self) -> str:
+        return self._sha256.hexdigest()
+
+    def finish(self) -> Optional[str]:
+        """Flush to disk and return the error code, if any"""
+        if self._finished:
+            return self.error
+        self._finished = True
+        if not self.error and self.image_type is None:
+            # Shorter than SNIFF_BYTES: sniff what we have
+            self.image_type = sniff_image_type(self._head)
+            if self.image_type is None:
+                self._reject(ERROR_NOT_IMAGE)
+        if not self.error:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        return self.error
+
+    # --- read back by FileStorage.save / PIL ---------------------------------
+    def read(self, size: int = -1) -> bytes:
+        return self._file.read(size)
+
+    def readline(self, size: int = -1) -> bytes:
+        return self._file.readline(size)
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        return self._file.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self._file.tell()
+
+    def flush(self):
+        self._file.flush()
+
+    def fileno(self) -> int:
+        return self._file.fileno()
+
+    def readable(self) -> bool:
+        return True
+
+    def writable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    @property
+    def closed(self) -> bool:
+        return self._file.closed
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+        # Anything not moved to its content address is discarded
+        if not self.committed and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def upload_error(file_storage) -> Optional[str]:
+    """ERROR_TOO_LARGE / ERROR_NOT_IMAGE for a streamed upload, None if it's fine"""
+    stream = getattr(file_storage, 'stream', None)
+    if isinstance(stream, HashingUploadStream):
+        return stream.finish()
+    return None
+
+
+class StreamingUploadRequest(Request):
+    """Flask request class that streams file parts into uploads/.incoming"""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        upload_dir = current_app.config['UPLOAD_FOLDER']
+        max_bytes = current_app.config.get('MAX_UPLOAD_FILE_SIZE')
+        stream = HashingUploadStream(upload_dir, max_bytes)
+        # Tracked here too: parts of a request that fails mid-parse never reach request.files
+        if not hasattr(self, '_upload_streams'):
+            self._upload_streams = []
+        self._upload_streams.append(stream)
+        return stream
+
+    def close(self):
+        super().close()
+        for stream in getattr(self, '_upload_streams', ()):
+            stream.close()
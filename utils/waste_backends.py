@@ -0,0 +1,215 @@
+"""
+Inference Backends for Waste Detection
+Keras (reference), tf.function graph, and TFLite (float / int8) backends
+for MobileNetV2, all exposing the same ``predict(batch) -> np.ndarray``
+"""
+
+import os
+import glob
+import queue
+
+import numpy as np
+
+try:
+    import tensorflow as tf
+    from tensorflow.keras.applications.mobilenet_v2 import MobileNetV2, preprocess_input, decode_predictions
+    TF_AVAILABLE = True
+except Exception:
+    TF_AVAILABLE = False
+
+INPUT_SHAPE = (224, 224, 3)
+
+# Where exported TFLite models are cached between restarts
+MODEL_CACHE_DIR = os.getenv(
+    'WASTE_MODEL_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'ml_cache')
+)
+
+# Images used to calibrate int8 activations (falls back to random noise)
+CALIBRATION_DIR = os.getenv(
+    'WASTE_TFLITE_CALIBRATION_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'uploads')
+)
+
+BACKEND_NAMES = ('keras', 'graph', 'tflite', 'tflite_int8')
+
+
+def _build_keras_model():
+    return MobileNetV2(weights='imagenet', include_top=True)
+
+
+def imagenet_labels():
+    """The 1000 ImageNet class names, in model output order"""
+    # Strictly decreasing scores -> decode_predictions returns classes in index order
+    ordered_scores = np.linspace(1.0, 0.0, 1000, dtype=np.float32)[np.newaxis, :]
+    return [pred[1] for pred in decode_predictions(ordered_scores, top=1000)[0]]
+
+
+class _Backend:
+    name = None
+
+    def labels(self):
+        return imagenet_labels()
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+
+class KerasBackend(_Backend):
+    """Full-precision Keras model via model.predict (reference path)"""
+
+    name = 'keras'
+
+    def __init__(self, keras_model=None):
+        self.model = keras_model or _build_keras_model()
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        return self.model.predict(batch, verbose=0)
+
+
+class GraphBackend(_Backend):
+    """
+    Keras model traced once into a tf.function graph.
+    Skips model.predict's per-call data-adapter / callback setup.
+    """
+
+    name = 'graph'
+
+    def __init__(self, keras_model=None, jit_compile: bool = False):
+        self.model = keras_model or _build_keras_model()
+        self._fn = tf.function(
+            lambda x: self.model(x, training=False),
+            input_signature=[tf.TensorSpec(shape=(None,) + INPUT_SHAPE, dtype=tf.float32)],
+            jit_compile=jit_compile,
+        )
+        # Trace once up front so the first request doesn't pay for it
+        self._fn(tf.zeros((1,) + INPUT_SHAPE, dtype=tf.float32))
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        return self._fn(tf.convert_to_tensor(batch, dtype=tf.float32)).numpy()
+
+
+def _representative_dataset(limit: int = 100):
+    """Yield preprocessed sample images for int8 calibration"""
+    from PIL import Image
+
+    paths = []
+    for pattern in ('*.jpg', '*.jpeg', '*.png', '*.JPG', '*.PNG'):
+        paths.extend(glob.glob(os.path.join(CALIBRATION_DIR, pattern)))
+    paths = sorted(paths)[:limit]
+
+    if not paths:
+        print("⚠️ No calibration images found, using random data for int8 calibration")
+        rng = np.random.default_rng(0)
+        for _ in range(limit):
+            sample = rng.uniform(-1.0, 1.0, size=(1,) + INPUT_SHAPE).astype(np.float32)
+            yield [sample]
+        return
+
+    for path in paths:
+        try:
+            img = Image.open(path).convert('RGB').resize(INPUT_SHAPE[:2])
+        except Exception:
+            continue
+        arr = preprocess_input(np.asarray(img, dtype=np.float32))
+        yield [arr[np.newaxis, ...]]
+
+
+def export_tflite(path: str, quantize_int8: bool = False, keras_model=None) -> str:
+    """Convert MobileNetV2 to a .tflite file (once) and return its path"""
+    if os.path.exists(path):
+        return path
+
+    model = keras_model or _build_keras_model()
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    if quantize_int8:
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = _representative_dataset
+
+    tflite_bytes = converter.convert()
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Unique per process: several workers may export the same missing model at once
+    tmp_path = f"{path}.{os.getpid()}_{os.urandom(4).hex()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(tflite_bytes)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    print(f"✅ Exported TFLite model: {path} ({len(tflite_bytes) / 1e6:.1f} MB)")
+    return path
+
+
+class _PooledInterpreter:
+    """One tf.lite.Interpreter plus the batch size it's currently allocated for"""
+
+    def __init__(self, model_path: str, num_threads: int):
+        self.interpreter = tf.lite.Interpreter(model_path=model_path, num_threads=num_threads)
+        self.interpreter.allocate_tensors()
+        self.input_index = self.interpreter.get_input_details()[0]['index']
+        self.output_index = self.interpreter.get_output_details()[0]['index']
+        self.batch_size = 1
+
+    def run(self, batch: np.ndarray) -> np.ndarray:
+        if batch.shape[0] != self.batch_size:
+            self.interpreter.resize_tensor_input(self.input_index, batch.shape)
+            self.interpreter.allocate_tensors()
+            self.batch_size = batch.shape[0]
+        self.interpreter.set_tensor(self.input_index, batch.astype(np.float32, copy=False))
+        self.interpreter.invoke()
+        return self.interpreter.get_tensor(self.output_index).copy()
+
+
+class TFLiteBackend(_Backend):
+    """
+    TFLite model served by a pool of interpreters.
+    Interpreters aren't thread-safe, so each call checks one out of the pool.
+    """
+
+    def __init__(self, quantize_int8: bool = False, pool_size: int = None,
+                 num_threads: int = None, model_path: str = None, keras_model=None):
+        self.name = 'tflite_int8' if quantize_int8 else 'tflite'
+        filename = 'mobilenet_v2_int8.tflite' if quantize_int8 else 'mobilenet_v2.tflite'
+        self.model_path = export_tflite(
+            model_path or os.path.join(MODEL_CACHE_DIR, filename),
+            quantize_int8=quantize_int8,
+            keras_model=keras_model,
+        )
+
+        pool_size = pool_size or int(os.getenv('WASTE_TFLITE_POOL_SIZE', 2))
+        num_threads = num_threads or int(os.getenv('WASTE_TFLITE_THREADS', 2))
+        self._pool = queue.Queue()
+        for _ in range(pool_size):
+            self._pool.put(_PooledInterpreter(self.model_path, num_threads))
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        interpreter = self._pool.get()
+        try:
+            return interpreter.run(batch)
+        finally:
+            self._pool.put(interpreter)
+
+
+def load_backend(name: str = None):
+    """
+    Build the backend selected by name or WASTE_ML_BACKEND env var
+    (keras | graph | tflite | tflite_int8). Unknown names fall back to keras.
+    """
+    if not TF_AVAILABLE:
+        raise RuntimeError("TensorFlow is not installed")
+
+    name = (name or os.getenv('WASTE_ML_BACKEND', 'keras')).lower()
+    if name not in BACKEND_NAMES:
+        print(f"⚠️ Unknown WASTE_ML_BACKEND '{name}', using keras")
+        name = 'keras'
+
+    if name == 'graph':
+        return GraphBackend(jit_compile=os.getenv('WASTE_GRAPH_JIT', 'false').lower() in ('true', '1', 't'))
+    if name == 'tflite':
+        return TFLiteBackend(quantize_int8=False)
+    if name == 'tflite_int8':
+        return TFLiteBackend(quantize_int8=True)
+    return KerasBackend()
@@ -0,0 +1,57 @@
+"""
+ImageNet Class -> Waste Category Table
+Curated list of the MobileNetV2 (ImageNet-1k) classes that are plausibly
+waste of a given category. Every other class stays unmapped and adds nothing
+to the category scores.
+
+Class names are compared whole after normalize_class_name (lower case,
+'_' -> ' '), so 'water_bottle' and 'water bottle' both match while 'toucan',
+'candle' or 'wire-haired fox terrier' never do.
+"""
+
+from typing import Dict
+
+WASTE_CLASS_NAMES = {
+    'organik': (
+        'granny smith', 'strawberry', 'orange', 'lemon', 'fig', 'pineapple', 'banana',
+        'jackfruit', 'custard apple', 'pomegranate', 'head cabbage', 'broccoli',
+        'cauliflower', 'zucchini', 'spaghetti squash', 'acorn squash', 'butternut squash',
+        'cucumber', 'artichoke', 'bell pepper', 'cardoon', 'mushroom', 'corn', 'ear',
+        'acorn', 'hip', 'buckeye', 'bagel', 'pretzel', 'cheeseburger', 'hotdog',
+        'mashed potato', 'french loaf', 'guacamole', 'trifle', 'meat loaf', 'pizza',
+        'potpie', 'burrito', 'carbonara', 'dough', 'hay',
+    ),
+    'anorganik': (
+        'water bottle', 'pop bottle', 'plastic bag', 'water jug', 'packet',
+        'soap dispenser', 'lotion', 'sunscreen', 'shower cap', 'diaper', 'band aid',
+    ),
+    'kertas': (
+        'envelope', 'carton', 'paper towel', 'toilet tissue', 'book jacket',
+        'comic book', 'crossword puzzle', 'menu',
+    ),
+    'kaca': (
+        'beer bottle', 'wine bottle', 'beer glass', 'goblet', 'perfume', 'beaker',
+    ),
+    'logam': (
+        'nail', 'screw', 'chain', 'safety pin', 'padlock', 'frying pan', 'wok', 'caldron',
+        'dutch oven', 'ladle', 'strainer', 'milk can', 'bucket', 'steel drum',
+        'can opener', 'corkscrew',
+    ),
+    'b3': (
+        'table lamp', 'spotlight', 'pill bottle', 'syringe', 'hair spray', 'lighter',
+        'cellular telephone', 'ipod', 'remote control',
+    ),
+}
+
+
+def normalize_class_name(name: str) -> str:
+    return str(name).lower().replace('_', ' ').strip()
+
+
+def class_category_map() -> Dict[str, str]:
+    """{normalized ImageNet class name: waste category}"""
+    return {
+        class_name: category
+        for category, class_names in WASTE_CLASS_NAMES.items()
+        for class_name in class_names
+    }